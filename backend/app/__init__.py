@@ -1,9 +1,11 @@
 from flask import Flask
 from .utils import setup_logging
-from .db import db
+from .db import db, pool_stats
+from .config import get_engine_options, get_pool_wait_warning_ms, get_price_cap_link_interval
+from .commands import register_commands
+from .profiling import register_profiling
 from flask_migrate import Migrate
 from dotenv import load_dotenv
-from .services.composition_service import update_composition_id_in_price_cap
 import os
 
 load_dotenv()
@@ -13,6 +15,11 @@ def create_app():
     app = Flask(__name__)
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("SQLALCHEMY_DATABASE_URI")
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Raises ValueError on invalid pool settings so a misconfigured worker fails at boot
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = get_engine_options(
+        app.config["SQLALCHEMY_DATABASE_URI"]
+    )
+    pool_stats.wait_warning_ms = get_pool_wait_warning_ms()
 
     db.init_app(app)
 
@@ -34,16 +41,38 @@ def create_app():
     from .routes.composition_routes import composition_bp
     from .routes.common_routes import common_bp
     from .routes.implant_routes import implant_bp
+    from .routes.price_cap_routes import price_cap_bp
 
     app.register_blueprint(common_bp)
     app.register_blueprint(composition_bp)
     app.register_blueprint(implant_bp)
+    app.register_blueprint(price_cap_bp)
+
+    register_commands(app)
 
-    # Use this function when the composition id is null in the live DB ::: TEMP: WILL REMOVE LATER.
-    # with app.app_context():
-    #     update_composition_id_in_price_cap()
+    # Opt-in cProfile / tracemalloc reports, only hooked in when configured
+    register_profiling(app)
 
-    with app.app_context():
-        db.create_all()
+    # The schema is managed by `flask db upgrade` (or `flask create-schema` for a fresh
+    # database), so booting a worker does not touch the database
 
     return app
+
+
+def start_background_jobs(app):
+    """
+    Start the background threads of a process that serves requests. Not done by create_app:
+    with gunicorn the app is created in the master, whose threads do not survive the fork, so
+    every worker starts them after forking (gunicorn.conf.py post_fork); run.py starts them
+    for the development server.
+
+    Args:
+        app (Flask): The application.
+    """
+    # Link price caps in the background only when configured, never at boot. Every worker
+    # runs the job; its advisory lock lets only one of them link at a time.
+    price_cap_link_interval = get_price_cap_link_interval()
+    if price_cap_link_interval:
+        from .services.price_cap_service import start_price_cap_link_scheduler
+
+        start_price_cap_link_scheduler(app, price_cap_link_interval)
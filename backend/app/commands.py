@@ -0,0 +1,141 @@
+import click
+from .constants import (
+    PRICE_CAP_TYPE_COMPOSITIONS,
+    PRICE_CAP_TYPE_IMPLANTS,
+    CATALOG_COMPOSITIONS,
+    CATALOG_IMPLANTS,
+)
+
+
+def register_commands(app):
+    """
+    Register the maintenance commands on the Flask CLI (run with `flask <command>` from backend/).
+
+    Args:
+        app (Flask): The application.
+    """
+
+    @app.cli.command("create-schema")
+    def create_schema_command():
+        """Create the schema of a fresh database and stamp it at the latest migration."""
+        from flask_migrate import stamp
+        from sqlalchemy import inspect
+        from .db import db
+        from . import models  # noqa: F401, registers the tables on the metadata
+
+        # Stamping a database that already has migration history would skip its pending migrations
+        if inspect(db.engine).has_table("alembic_version"):
+            raise click.ClickException(
+                "The database already has migration history; run `flask db upgrade` instead"
+            )
+
+        db.create_all()
+        # The tables match the current models, so record the head revision; otherwise the
+        # next `flask db upgrade` would try to create them again
+        stamp(revision="head")
+        click.echo("Schema created and stamped at the latest migration")
+
+    @app.cli.command("check-indexes")
+    def check_indexes_command():
+        """EXPLAIN the match and price cap lookups and fail if one does not use its index."""
+        from .services.index_check import check_index_usage
+
+        missing = []
+        for result in check_index_usage():
+            status = "ok" if result["used"] else "NOT USED"
+            click.echo(f"{status:>8}  {result['index']}  (plan: {', '.join(result['indexes']) or 'no index'})")
+            if not result["used"]:
+                missing.append(result["index"])
+        if missing:
+            raise click.ClickException(f"{len(missing)} index(es) not used; run `flask db upgrade`?")
+
+    @app.cli.command("snapshot-catalogs")
+    @click.option(
+        "--type",
+        "catalog",
+        type=click.Choice(["all", CATALOG_COMPOSITIONS, CATALOG_IMPLANTS]),
+        default="all",
+        show_default=True,
+        help="Which catalog to snapshot.",
+    )
+    def snapshot_catalogs_command(catalog):
+        """Write the approved catalog to the memory-mapped snapshot opened by the workers."""
+        from .services.match_catalog import write_match_catalog_snapshot, get_catalog_snapshot_path
+
+        selected = [CATALOG_COMPOSITIONS, CATALOG_IMPLANTS] if catalog == "all" else [catalog]
+        for name in selected:
+            match_catalog = write_match_catalog_snapshot(name)
+            click.echo(
+                f"{name}: wrote {len(match_catalog)} entries at version {match_catalog.version} "
+                f"to {get_catalog_snapshot_path(name)}"
+            )
+
+    @app.cli.command("prune-match-runs")
+    @click.option("--days", type=click.IntRange(min=0), default=90, show_default=True)
+    def prune_match_runs_command(days):
+        """Delete the persisted match runs (and their rows) older than --days days."""
+        from .services.match_run_service import prune_match_runs
+
+        click.echo(f"Deleted {prune_match_runs(days)} match run(s)")
+
+    @app.cli.command("import-price-caps")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option(
+        "--type",
+        "price_cap_type",
+        type=click.Choice(["compositions", "implants"]),
+        default="compositions",
+        show_default=True,
+        help="Which price cap table the sheet belongs to.",
+    )
+    def import_price_caps_command(path, price_cap_type):
+        """Import a price cap sheet (.xlsx or .csv) with COPY and link it to the catalog."""
+        from .services.price_cap_service import import_price_caps, PriceCapImportError
+
+        price_cap_types = {
+            "compositions": PRICE_CAP_TYPE_COMPOSITIONS,
+            "implants": PRICE_CAP_TYPE_IMPLANTS,
+        }
+        try:
+            with open(path, "rb") as file:
+                summary = import_price_caps(file, path, price_cap_types[price_cap_type])
+        except PriceCapImportError as e:
+            raise click.ClickException(str(e))
+
+        click.echo(
+            ", ".join(f"{key.replace('_', ' ')}: {value}" for key, value in summary.items())
+        )
+
+    @app.cli.command("link-price-caps")
+    @click.option(
+        "--type",
+        "price_cap_type",
+        type=click.Choice(["all", "compositions", "implants"]),
+        default="all",
+        show_default=True,
+        help="Which price cap table to link.",
+    )
+    @click.option("--batch-size", type=click.IntRange(min=1), default=5000, show_default=True)
+    @click.option(
+        "--start-after",
+        type=click.IntRange(min=0),
+        default=0,
+        help="Resume after this price cap id (the last id logged by an interrupted run).",
+    )
+    def link_price_caps_command(price_cap_type, batch_size, start_after):
+        """Link unlinked price caps to compositions / implants in committed batches."""
+        from .services.price_cap_service import link_price_cap_batches
+
+        price_cap_types = {
+            "compositions": PRICE_CAP_TYPE_COMPOSITIONS,
+            "implants": PRICE_CAP_TYPE_IMPLANTS,
+        }
+        selected = price_cap_types if price_cap_type == "all" else {
+            price_cap_type: price_cap_types[price_cap_type]
+        }
+        for name, type_value in selected.items():
+            stats = link_price_cap_batches(type_value, batch_size=batch_size, start_after=start_after)
+            click.echo(
+                f"{name}: linked {stats['linked']} of {stats['scanned']} unlinked rows "
+                f"in {stats['batches']} batches (last id {stats['last_id']})"
+            )
@@ -0,0 +1,268 @@
+import os
+from .db import InstrumentedQueuePool
+from .constants import (
+    MATCH_CANDIDATE_LIMIT_DEFAULT,
+    MATCH_CANDIDATE_LIMIT_MAX,
+    MATCH_THRESHOLD_DEFAULT,
+)
+
+# psycopg2 executemany modes supported by SQLAlchemy 2.0
+EXECUTEMANY_MODES = ("values_only", "values_plus_batch")
+
+
+def _env_int(name, default, minimum=0):
+    """
+    Read an integer setting from the environment.
+
+    Raises:
+        ValueError: If the value is not an integer or is below the minimum.
+    """
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {raw!r}")
+    if value < minimum:
+        raise ValueError(f"{name} must be >= {minimum}, got {value}")
+    return value
+
+
+def _env_bool(name, default):
+    """
+    Read a boolean setting (true/false, 1/0, yes/no) from the environment.
+
+    Raises:
+        ValueError: If the value is not a recognised boolean.
+    """
+    raw = os.getenv(name)
+    if raw is None or raw.strip() == "":
+        return default
+    value = raw.strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    raise ValueError(f"{name} must be a boolean, got {raw!r}")
+
+
+def get_engine_options(database_uri):
+    """
+    Build SQLALCHEMY_ENGINE_OPTIONS from the environment, validating every value.
+
+    Pool and psycopg2 options are only applied to PostgreSQL URIs, other databases
+    (e.g. SQLite for local testing) keep the SQLAlchemy defaults.
+
+    Environment:
+        DB_POOL_SIZE (int): Connections kept open per process. Defaults to 5.
+        DB_MAX_OVERFLOW (int): Extra connections allowed above the pool size. Defaults to 10.
+        DB_POOL_TIMEOUT (int): Seconds to wait for a connection before failing. Defaults to 30.
+        DB_POOL_RECYCLE (int): Seconds after which a connection is replaced, -1 to disable. Defaults to 1800.
+        DB_POOL_PRE_PING (bool): Test connections on checkout. Defaults to true.
+        DB_STATEMENT_TIMEOUT_MS (int): Server-side statement timeout, 0 to disable. Defaults to 0.
+        DB_EXECUTEMANY_MODE (str): psycopg2 executemany mode. Defaults to "values_plus_batch".
+
+    Args:
+        database_uri (str): The SQLALCHEMY_DATABASE_URI.
+
+    Returns:
+        dict: Keyword arguments for create_engine.
+
+    Raises:
+        ValueError: If any setting is invalid.
+    """
+    if not database_uri:
+        raise ValueError("SQLALCHEMY_DATABASE_URI is not set")
+
+    if not database_uri.startswith("postgresql"):
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": _env_int("DB_POOL_SIZE", 5, minimum=1),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30, minimum=1),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800, minimum=-1),
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", True),
+    }
+
+    executemany_mode = os.getenv("DB_EXECUTEMANY_MODE", "values_plus_batch")
+    if executemany_mode not in EXECUTEMANY_MODES:
+        raise ValueError(
+            f"DB_EXECUTEMANY_MODE must be one of {', '.join(EXECUTEMANY_MODES)}, got {executemany_mode!r}"
+        )
+    if database_uri.startswith(("postgresql://", "postgresql+psycopg2://")):
+        options["executemany_mode"] = executemany_mode
+
+    statement_timeout = _env_int("DB_STATEMENT_TIMEOUT_MS", 0)
+    if statement_timeout:
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout}"}
+
+    return options
+
+
+def get_pool_wait_warning_ms():
+    """
+    Checkout wait (in milliseconds) above which a warning is logged, from DB_POOL_WAIT_WARN_MS.
+
+    Returns:
+        int: The threshold. Defaults to 100.
+    """
+    return _env_int("DB_POOL_WAIT_WARN_MS", 100)
+
+
+def get_price_cap_link_interval():
+    """
+    Seconds between two runs of the background price cap linking job, from PRICE_CAP_LINK_INTERVAL.
+
+    Returns:
+        int: The interval, 0 (the default) when the job only runs from `flask link-price-caps`.
+    """
+    return _env_int("PRICE_CAP_LINK_INTERVAL", 0)
+
+
+def get_match_results_dir():
+    """
+    Directory holding the stored /match-file results, shared by all workers of the host, from MATCH_RESULTS_DIR.
+
+    Returns:
+        str: The directory. Defaults to "match_results".
+    """
+    return os.getenv("MATCH_RESULTS_DIR", "match_results")
+
+
+def get_match_result_ttl():
+    """
+    Seconds a stored match result stays addressable after it was created, from MATCH_RESULT_TTL.
+
+    Returns:
+        int: The TTL, at least 1. Defaults to 86400 (one day).
+    """
+    return _env_int("MATCH_RESULT_TTL", 24 * 60 * 60, minimum=1)
+
+
+def get_server_settings():
+    """
+    Production server settings, read by gunicorn.conf.py.
+
+    Environment:
+        SERVER_BIND (str): Address to listen on. Defaults to "0.0.0.0:5000".
+        SERVER_WORKERS (int): Worker processes. Defaults to 2 x CPUs + 1.
+        SERVER_THREADS (int): Threads per worker. Defaults to 1.
+        SERVER_TIMEOUT (int): Seconds before a silent worker is restarted. Defaults to 300,
+            large files take minutes to match.
+        MATCH_CATALOG_PRELOAD (bool): Build the in-memory matching catalogs in the master
+            before forking. Defaults to true.
+
+    Returns:
+        dict: bind, workers, threads, timeout and preload_catalog.
+
+    Raises:
+        ValueError: If any setting is invalid.
+    """
+    return {
+        "bind": os.getenv("SERVER_BIND", "0.0.0.0:5000"),
+        "workers": _env_int("SERVER_WORKERS", 2 * (os.cpu_count() or 1) + 1, minimum=1),
+        "threads": _env_int("SERVER_THREADS", 1, minimum=1),
+        "timeout": _env_int("SERVER_TIMEOUT", 300),
+        "preload_catalog": _env_bool("MATCH_CATALOG_PRELOAD", True),
+    }
+
+
+def get_catalog_snapshot_dir():
+    """
+    Directory of the catalog snapshot files written by `flask snapshot-catalogs`, from CATALOG_SNAPSHOT_DIR.
+
+    Returns:
+        str: The directory. Defaults to "catalog_snapshots".
+    """
+    return os.getenv("CATALOG_SNAPSHOT_DIR", "catalog_snapshots")
+
+
+def get_catalog_check_interval():
+    """
+    Seconds between two version checks of the in-memory catalogs, from CATALOG_CHECK_INTERVAL.
+
+    Changes normally arrive through LISTEN/NOTIFY; the check catches missed notifications.
+
+    Returns:
+        int: The interval, 0 to run neither the listener nor the check. Defaults to 60.
+    """
+    return _env_int("CATALOG_CHECK_INTERVAL", 60)
+
+
+def get_dosage_form_blocking():
+    """
+    Whether compositions are first matched among the catalog entries of the row's dosage form,
+    from DOSAGE_FORM_BLOCKING.
+
+    Returns:
+        bool: Defaults to false (every row is searched against the whole catalog).
+    """
+    return _env_bool("DOSAGE_FORM_BLOCKING", False)
+
+
+def get_match_rescore_days():
+    """
+    Age in days of the oldest match run whose unmatched rows are re-scored in the background
+    when compositions or implants are approved, from MATCH_RESCORE_DAYS.
+
+    Returns:
+        int: The age, 0 to disable re-scoring. Defaults to 30.
+    """
+    return _env_int("MATCH_RESCORE_DAYS", 30)
+
+
+def get_match_candidate_limit():
+    """
+    Catalog candidates retrieved and scored per bid row, from MATCH_CANDIDATE_LIMIT. The
+    unmatched rows list this many similar items. /match-file can override it per request.
+
+    Returns:
+        int: The limit, 1 to MATCH_CANDIDATE_LIMIT_MAX. Defaults to 20.
+
+    Raises:
+        ValueError: If the value is out of range.
+    """
+    limit = _env_int("MATCH_CANDIDATE_LIMIT", MATCH_CANDIDATE_LIMIT_DEFAULT, minimum=1)
+    if limit > MATCH_CANDIDATE_LIMIT_MAX:
+        raise ValueError(f"MATCH_CANDIDATE_LIMIT must be <= {MATCH_CANDIDATE_LIMIT_MAX}, got {limit}")
+    return limit
+
+
+def get_match_threshold():
+    """
+    Similarity score (0-100) a candidate needs to be a match, from MATCH_THRESHOLD.
+    /match-file can override it per request.
+
+    Returns:
+        int: The threshold, 1 to 100. Defaults to 99.
+
+    Raises:
+        ValueError: If the value is out of range.
+    """
+    threshold = _env_int("MATCH_THRESHOLD", MATCH_THRESHOLD_DEFAULT, minimum=1)
+    if threshold > 100:
+        raise ValueError(f"MATCH_THRESHOLD must be <= 100, got {threshold}")
+    return threshold
+
+
+def get_profiling_settings():
+    """
+    Read the request profiling settings from the environment.
+
+    Environment:
+        PROFILE_REQUESTS (bool): Profile every /match-file and CRUD request. Defaults to false.
+        PROFILE_ADMIN_TOKEN (str): Token an admin sends in the X-Profile-Token header to profile
+            a single request. Defaults to unset (no per-request profiling).
+        PROFILE_TOP (int): Functions and allocation sites listed in a report. Defaults to 40.
+
+    Returns:
+        dict: 'always', 'admin_token' and 'top'.
+    """
+    return {
+        "always": _env_bool("PROFILE_REQUESTS", False),
+        "admin_token": os.getenv("PROFILE_ADMIN_TOKEN") or None,
+        "top": _env_int("PROFILE_TOP", 40, minimum=1),
+    }
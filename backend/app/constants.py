@@ -4,3 +4,29 @@
 STATUS_PENDING = 0  # Pending Approval
 STATUS_APPROVED = 1  # Approved
 STATUS_REJECTED = 2  # Rejected or Soft Delete
+
+### Catalog names used for catalog versioning
+CATALOG_COMPOSITIONS = "compositions"
+CATALOG_IMPLANTS = "implants"
+
+### Maximum number of entries accepted by one bulk CRUD request
+BULK_MAX_ITEMS = 1000
+
+### Bid file types accepted by /match-file
+BID_FILE_TYPE_COMPOSITIONS = 1  # Normal Price Bid File
+BID_FILE_TYPE_IMPLANTS = 2  # Implant Price Bid File
+
+### Price cap sheet types accepted by the price cap import
+PRICE_CAP_TYPE_COMPOSITIONS = 1
+PRICE_CAP_TYPE_IMPLANTS = 2
+
+### Maximum number of similar items per unmatched row whose prices can be prefetched
+PREFETCH_TOP_K_MAX = 20
+
+### Maximum number of rows per page of a stored match result
+RESULT_PAGE_SIZE_MAX = 500
+
+### Catalog candidates scored per bid row, and the score (0-100) a candidate needs to match
+MATCH_CANDIDATE_LIMIT_DEFAULT = 20
+MATCH_CANDIDATE_LIMIT_MAX = 200
+MATCH_THRESHOLD_DEFAULT = 99
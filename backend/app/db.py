@@ -1,3 +1,91 @@
+import logging
+import threading
+import time
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 
 db = SQLAlchemy()
+
+server_logger = logging.getLogger("app")
+
+
+class PoolStats:
+    """
+    Connection pool checkout statistics of this process, used to size the pool for the
+    number of gunicorn workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_warning_ms = 100
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+            self.peak_checked_out = 0
+
+    def record_checkout(self, wait, checked_out):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+        if wait * 1000 > self.wait_warning_ms:
+            server_logger.warning(
+                f"Waited {wait * 1000:.1f} ms for a database connection ({checked_out} checked out)"
+            )
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def report(self, pool):
+        """
+        Build a snapshot of the pool utilization and checkout wait times.
+
+        Args:
+            pool (QueuePool): The engine's pool.
+
+        Returns:
+            dict: Pool size, usage and wait statistics (wait times in milliseconds).
+        """
+        with self._lock:
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            checked_out = pool.checkedout()
+            return {
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": checked_out,
+                "overflow": pool.overflow(),
+                "utilization": round(checked_out / capacity, 3) if capacity else None,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3)
+                if self.checkouts
+                else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+pool_stats = PoolStats()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record_timeout()
+            raise
+        pool_stats.record_checkout(time.perf_counter() - start, self.checkedout())
+        return connection
@@ -9,6 +9,16 @@ class Compositions(db.Model):
     dosage_form = db.Column(db.String(50), default="", nullable=True)
     status = db.Column(db.Integer, nullable=False, default=0)
 
+    __table_args__ = (
+        db.Index("ix_compositions_status_id", "status", "id"),
+        db.Index("ix_compositions_approved", "id", postgresql_where=db.text("status = 1")),
+        db.Index(
+            "ix_compositions_approved_dosage_form",
+            db.text("regexp_replace(lower(trim(dosage_form)), '\\s+', ' ', 'g')"),
+            postgresql_where=db.text("status = 1"),
+        ),
+    )
+
 
 class PriceCapCompositions(db.Model):
     __tablename__ = 'price_cap_compositions'
@@ -22,6 +32,10 @@ class PriceCapCompositions(db.Model):
     compositions_striped = db.Column(db.String, nullable=True)
     composition_id = db.Column(db.Integer, db.ForeignKey('compositions.id'), nullable=True)
 
+    __table_args__ = (
+        db.Index("ix_price_cap_compositions_composition_id", "composition_id"),
+    )
+
 
 class Implants(db.Model):
     __tablename__ = 'implants'
@@ -29,13 +43,67 @@ class Implants(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     item_code = db.Column(db.String(255), nullable=True)
     product_description = db.Column(db.String(255), nullable=True)
+    product_description_normalized = db.Column(db.String(255), nullable=True)
     status = db.Column(db.Integer, nullable=True, default=0)
 
+    __table_args__ = (
+        db.Index("ix_implants_status_id", "status", "id"),
+        db.Index("ix_implants_approved", "id", postgresql_where=db.text("status = 1")),
+    )
+
 
 class PriceCapImplants(db.Model):
     __tablename__ = 'price_cap_implants'
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     implant_id = db.Column(db.Integer, db.ForeignKey('implants.id'), nullable=True)
+    product_description = db.Column(db.String(255), nullable=True)
     variant = db.Column(db.String(255), nullable=True)
-    price_cap = db.Column(db.Numeric, nullable=True)
\ No newline at end of file
+    price_cap = db.Column(db.Numeric, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_price_cap_implants_implant_id", "implant_id"),
+    )
+
+
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_versions'
+
+    catalog = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+
+class MatchRun(db.Model):
+    __tablename__ = 'match_runs'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    tender_ref = db.Column(db.String(255), nullable=True)
+    file_type = db.Column(db.Integer, nullable=False)
+    filename = db.Column(db.String(255), nullable=True)
+    catalog_version = db.Column(db.Integer, nullable=False, default=0)
+    settings = db.Column(db.JSON, nullable=False, default=dict)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    matched_count = db.Column(db.Integer, nullable=False, default=0)
+    reused_count = db.Column(db.Integer, nullable=False, default=0)
+    result_id = db.Column(db.String(32), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+    __table_args__ = (
+        db.Index("ix_match_runs_tender_ref_file_type_id", "tender_ref", "file_type", "id"),
+    )
+
+
+class MatchRunRow(db.Model):
+    __tablename__ = 'match_run_rows'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('match_runs.id', ondelete='CASCADE'), nullable=False)
+    input_hash = db.Column(db.String(64), nullable=False)
+    matched = db.Column(db.Boolean, nullable=False)
+    item_id = db.Column(db.Integer, nullable=True)
+    match_key = db.Column(db.Text, nullable=True)
+    result = db.Column(db.JSON, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_match_run_rows_run_id", "run_id"),
+    )
@@ -0,0 +1,184 @@
+import hmac
+import io
+import logging
+import os
+import threading
+import time
+import uuid
+from flask import g, request
+from .config import get_profiling_settings
+
+server_logger = logging.getLogger(__name__)
+
+# Reports are written next to the other logs, one text report and one pstats dump per request
+PROFILE_DIR = os.path.join("logs", "profiles")
+
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Stack frames kept per allocation by tracemalloc
+PROFILE_TRACEMALLOC_FRAMES = 10
+
+# Blueprints whose routes can be profiled (/match-file and the CRUD routes), minus monitoring routes
+PROFILED_BLUEPRINTS = ("common", "composition", "implant")
+PROFILE_EXCLUDED_ENDPOINTS = ("common.pool_status_api",)
+
+# cProfile and tracemalloc are process-wide, so one request is profiled at a time per worker
+_profile_lock = threading.Lock()
+
+
+def _wants_profile(settings: dict) -> bool:
+    """Whether the current request should be profiled: always, or when it carries the admin token."""
+    if request.blueprint not in PROFILED_BLUEPRINTS or request.endpoint in PROFILE_EXCLUDED_ENDPOINTS:
+        return False
+    if settings["always"]:
+        return True
+    token = request.headers.get(PROFILE_TOKEN_HEADER)
+    return bool(
+        token
+        and settings["admin_token"]
+        and hmac.compare_digest(token.encode(), settings["admin_token"].encode())
+    )
+
+
+def write_profile_report(profile_id: str, profiler, snapshot, memory: tuple, summary: dict, top: int) -> str:
+    """
+    Write the hot functions and allocation sites of a profiled request to PROFILE_DIR.
+
+    Args:
+        profile_id (str): The id returned in the X-Profile-Id header.
+        profiler (cProfile.Profile): The stopped profiler.
+        snapshot (tracemalloc.Snapshot): Allocations still held at the end of the request.
+        memory (tuple): Traced (current, peak) memory in bytes.
+        summary (dict): Request details written at the top of the report.
+        top (int): Functions and allocation sites listed.
+
+    Returns:
+        str: The path of the text report.
+    """
+    import pstats
+    import tracemalloc
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{profile_id}.txt")
+    profiler.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+
+    stream = io.StringIO()
+    for key, value in summary.items():
+        stream.write(f"{key}: {value}\n")
+    stream.write(f"traced memory: current {memory[0] / 1024:.1f} KiB, peak {memory[1] / 1024:.1f} KiB\n")
+
+    stats = pstats.Stats(profiler, stream=stream)
+    stream.write(f"\n=== Top {top} functions by cumulative time ===\n")
+    stats.sort_stats("cumulative").print_stats(top)
+    stream.write(f"\n=== Top {top} functions by own time ===\n")
+    stats.sort_stats("tottime").print_stats(top)
+
+    stream.write(f"\n=== Top {top} allocation sites still held at the end of the request ===\n")
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        )
+    )
+    for statistic in snapshot.statistics("lineno")[:top]:
+        stream.write(f"{statistic}\n")
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(stream.getvalue())
+    return path
+
+
+def _stop_profile(state: dict):
+    """Stop the profiler and tracemalloc of a request; returns the allocation snapshot and memory."""
+    import tracemalloc
+
+    state["profiler"].disable()
+    snapshot = tracemalloc.take_snapshot()
+    memory = tracemalloc.get_traced_memory()
+    if state["started_tracing"]:
+        tracemalloc.stop()
+    return snapshot, memory
+
+
+def register_profiling(app):
+    """
+    Profile /match-file and the CRUD routes with cProfile and tracemalloc when enabled, either
+    for every request (PROFILE_REQUESTS) or for requests carrying PROFILE_ADMIN_TOKEN in the
+    X-Profile-Token header. The report is written to logs/profiles/<id>.txt (with the raw
+    pstats dump in <id>.prof) and its id returned in the X-Profile-Id response header.
+
+    Nothing is registered when profiling is not configured.
+
+    Args:
+        app (Flask): The application.
+    """
+    settings = get_profiling_settings()
+    if not settings["always"] and not settings["admin_token"]:
+        return
+
+    @app.before_request
+    def start_profile():
+        if not _wants_profile(settings):
+            return
+        if not _profile_lock.acquire(blocking=False):
+            server_logger.warning(f"Profiling skipped for {request.path}: another request is being profiled")
+            return
+
+        import cProfile
+        import tracemalloc
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+        else:
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        g._profile = {
+            "profiler": profiler,
+            "started_tracing": started_tracing,
+            "started": time.perf_counter(),
+        }
+        profiler.enable()
+
+    @app.after_request
+    def finish_profile(response):
+        state = g.pop("_profile", None)
+        if state is None:
+            return response
+
+        try:
+            snapshot, memory = _stop_profile(state)
+            profile_id = uuid.uuid4().hex
+            path = write_profile_report(
+                profile_id,
+                state["profiler"],
+                snapshot,
+                memory,
+                {
+                    "request": f"{request.method} {request.full_path.rstrip('?')}",
+                    "endpoint": request.endpoint,
+                    "status": response.status_code,
+                    "wall time": f"{(time.perf_counter() - state['started']) * 1000:.1f} ms",
+                },
+                settings["top"],
+            )
+            response.headers[PROFILE_ID_HEADER] = profile_id
+            server_logger.info(f"Profiled {request.method} {request.path}: {path}")
+        except Exception as e:
+            server_logger.error(f"Error writing profile report: {e}")
+        finally:
+            _profile_lock.release()
+        return response
+
+    @app.teardown_request
+    def abort_profile(exception=None):
+        # Reached with a profile still running only when the request failed before after_request
+        state = g.pop("_profile", None)
+        if state is None:
+            return
+        try:
+            _stop_profile(state)
+        finally:
+            _profile_lock.release()
@@ -1,10 +1,41 @@
-from flask import Blueprint, request, jsonify, Response
-import pandas as pd
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 import logging
 from app.services.composition_service import match_compositions
 from app.services.implant_service import match_implants
-from ..utils import replace_nan_with_none
-import json
+from ..utils import sanitize_dataframe, json_response
+from ..db import db, pool_stats
+from ..config import get_match_candidate_limit, get_match_threshold
+from ..constants import (
+    PREFETCH_TOP_K_MAX,
+    MATCH_CANDIDATE_LIMIT_MAX,
+    RESULT_PAGE_SIZE_MAX,
+    BID_FILE_TYPE_COMPOSITIONS,
+    BID_FILE_TYPE_IMPLANTS,
+)
+from ..services.bid_file_service import (
+    read_bid_file,
+    validate_bid_file,
+    hash_bid_rows,
+    BidFileError,
+)
+from ..services.match_run_service import (
+    get_match_settings,
+    get_run_catalog_version,
+    load_reusable_rows,
+    save_match_run,
+)
+from ..services.result_store import (
+    save_match_result,
+    get_match_result_page,
+    load_match_result,
+    RESULT_SECTIONS,
+)
+from ..services.result_export import (
+    stream_match_result_export,
+    EXPORT_FORMATS,
+    EXPORT_SIMILAR_ITEMS,
+)
+from sqlalchemy.pool import QueuePool
 
 common_bp = Blueprint("common", __name__)
 
@@ -14,62 +45,267 @@ def match_file_api():
     """
     API route to match file data with predefined compositions or implants based on file type.
     
-    This route handles the upload of an Excel file, reads its content into a pandas DataFrame,
+    This route handles the upload of a bid file, reads its content into a pandas DataFrame,
     and performs string matching to determine matched and unmatched compositions or implants.
 
     Request Parameters:
-    - file: The Excel file to be uploaded (required).
+    - file: The bid file to be uploaded, .xlsx, .csv or .parquet (required).
     - file_type: An integer indicating the type of file (optional, defaults to 1).
+    - prefetch_top_k: Embed the price comparison of this many similar items of every unmatched
+      row, so reviewing needs no compare-price calls (optional, 0 to 20, defaults to 0).
+    - page_size: Only return the first page_size matched and unmatched rows; the rest is fetched
+      from /match-results/<result_id> (optional, 1 to 500, defaults to returning every row).
+    - tender_ref: The tender the file belongs to; rows unchanged since the tender's previous run
+      reuse their stored result instead of being matched again (optional, defaults to the file name).
+    - reuse: Set to "false" to match every row again (optional, defaults to true).
+    - candidate_limit: Catalog candidates scored per row, also the number of similar items listed
+      for an unmatched row (optional, 1 to 200, defaults to MATCH_CANDIDATE_LIMIT).
+    - match_threshold: Similarity score (1 to 100) a candidate needs to match (optional, defaults
+      to MATCH_THRESHOLD).
 
     Returns:
-    - 200: JSON response containing the matched and unmatched compositions/implants.
-    - 400: If no file is uploaded or an invalid file type is provided.
-    - 500: If there is an error reading the Excel file or processing the data.
+    - 200: JSON response containing the matched and unmatched compositions/implants, the result_id
+           under which the result can be paged through, the run_id of the persisted run and the
+           number of reused rows.
+    - 400: If no file is uploaded, an invalid file type is provided or the file cannot be read
+           (unsupported format, missing columns), with 'errors' listing every invalid cell
+           (non-numeric prices, empty required cells).
+    - 500: If there is an error reading the file or processing the data.
     """
 
     file = request.files.get("file")
     file_type = request.args.get("file_type", default=1, type=int)
+    prefetch_top_k = request.args.get("prefetch_top_k", default=0, type=int)
+    page_size = request.args.get("page_size", default=None, type=int)
+    reuse = request.args.get("reuse", default="true").lower() != "false"
+    candidate_limit = request.args.get("candidate_limit", default=get_match_candidate_limit(), type=int)
+    match_threshold = request.args.get("match_threshold", default=get_match_threshold(), type=int)
 
     if not file:
         logging.getLogger(__name__).error("File not uploaded")
         return jsonify({"error": "No file uploaded"}), 400
 
-    try:
-        df = pd.read_excel(file, engine="openpyxl")
-    except Exception as e:
-        logging.getLogger(__name__).error(f"Error reading Excel file: {e}")
-        return jsonify({"error": "Error reading Excel file"}), 500
+    if not 0 <= prefetch_top_k <= PREFETCH_TOP_K_MAX:
+        return jsonify({"error": f"prefetch_top_k must be between 0 and {PREFETCH_TOP_K_MAX}"}), 400
+
+    if page_size is not None and not 1 <= page_size <= RESULT_PAGE_SIZE_MAX:
+        return jsonify({"error": f"page_size must be between 1 and {RESULT_PAGE_SIZE_MAX}"}), 400
+
+    if not 1 <= candidate_limit <= MATCH_CANDIDATE_LIMIT_MAX:
+        return jsonify({"error": f"candidate_limit must be between 1 and {MATCH_CANDIDATE_LIMIT_MAX}"}), 400
+
+    if not 1 <= match_threshold <= 100:
+        return jsonify({"error": "match_threshold must be between 1 and 100"}), 400
 
     file_type_to_function = {
-        1: match_compositions,  # Normal Price Bid File
-        2: match_implants,  # Implant Price Bid File
+        BID_FILE_TYPE_COMPOSITIONS: match_compositions,  # Normal Price Bid File
+        BID_FILE_TYPE_IMPLANTS: match_implants,  # Implant Price Bid File
     }
+    if file_type not in file_type_to_function:
+        logging.getLogger(__name__).error("Invalid file type, No Matching function found")
+        return jsonify({"error": "Invalid file type, Error performing string matching"}), 400
 
     try:
-        # Retrieve the function based on the file_type
-        match_function = file_type_to_function.get(file_type)
-
-        if match_function:
-            matched, unmatched = match_function(df)
-        else:
-            logging.getLogger(__name__).error("Invalid file type, No Matching function found")
-            return jsonify({"error": "Invalid file type, Error performing string matching"}), 400
+        df, errors = validate_bid_file(read_bid_file(file, file.filename, file_type), file_type)
+    except BidFileError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error reading bid file: {e}")
+        return jsonify({"error": "Error reading file"}), 500
+
+    # Every invalid cell of the file is reported at once, before any database work
+    if errors:
+        return json_response(
+            {"error": f"The file has {len(errors)} invalid cell(s)", "errors": errors}, status=400
+        )
+    df["input_hash"] = hash_bid_rows(df, file_type)
+    df = sanitize_dataframe(df)
+
+    tender_ref = (request.args.get("tender_ref") or file.filename or "").strip()[:255] or None
+    settings = get_match_settings(file_type, candidate_limit, match_threshold)
+    catalog_version = get_run_catalog_version(file_type)
+    stored_results = load_reusable_rows(tender_ref, file_type, settings, catalog_version) if reuse else {}
+
+    try:
+        match_function = file_type_to_function[file_type]
+        matched, unmatched = match_function(
+            df,
+            prefetch_top_k=prefetch_top_k,
+            stored_results=stored_results,
+            candidate_limit=candidate_limit,
+            match_threshold=match_threshold,
+        )
     except Exception as e:
         logging.getLogger(__name__).error(f"Invalid file type, Error performing string matching: {e}")
         return jsonify({"error": f"Invalid file type, Error performing string matching"}), 500
 
-    data = {
-        "matched": matched,
-        "unmatched": unmatched,
-    }
+    # The input hashes are only kept with the match run, not in the stored result or the response
+    matched_hashes = [row.pop("input_hash", None) for row in matched]
+    unmatched_hashes = [row.pop("input_hash", None) for row in unmatched]
 
     try:
-        clean_data = replace_nan_with_none(data)
-        json_data = json.dumps(clean_data, indent=4)
+        result_id = save_match_result(file_type, matched, unmatched)
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error storing match result: {e}")
+        result_id = None
+
+    reused_count = sum(input_hash in stored_results for input_hash in matched_hashes + unmatched_hashes)
+    run_id = save_match_run(
+        tender_ref,
+        file_type,
+        file.filename,
+        settings,
+        matched,
+        unmatched,
+        matched_hashes,
+        unmatched_hashes,
+        reused_count=reused_count,
+        result_id=result_id,
+        catalog_version=catalog_version,
+    )
 
-        return Response(json_data, mimetype="application/json")
+    if page_size is not None and result_id:
+        data = {
+            "result_id": result_id,
+            "run_id": run_id,
+            "reused": reused_count,
+            "page_size": page_size,
+            "counts": {"matched": len(matched), "unmatched": len(unmatched)},
+            "matched": matched[:page_size],
+            "unmatched": unmatched[:page_size],
+        }
+    else:
+        data = {
+            "result_id": result_id,
+            "run_id": run_id,
+            "reused": reused_count,
+            "matched": matched,
+            "unmatched": unmatched,
+        }
+
+    try:
+        return json_response(data)
     except Exception as e:
         logging.getLogger(__name__).error(f"Error processing response data: {e}")
-        error_data = {"error": str(e)}
-        json_error_data = json.dumps(error_data)
-        return Response(json_error_data, mimetype="application/json"), 500
+        return json_response({"error": str(e)}, status=500)
+
+
+@common_bp.route("/match-results/<result_id>")
+def match_result_page_api(result_id):
+    """
+    API route to fetch one page of a stored match result.
+
+    Query Parameters:
+    - section: str, optional, "matched" or "unmatched" (default is "matched").
+    - page: int, optional, the page number, starting at 1 (default is 1).
+    - page_size: int, optional, rows per page, 1 to 500 (default is 50).
+    - price_status: str, optional, only return matched rows whose price comparison has this status
+      (e.g. "Above", "Below", "No Price Found").
+
+    Returns:
+    - 200: JSON response with the page 'items' and the 'total' number of rows after filtering.
+    - 400: If the section, page or page_size is invalid.
+    - 404: If no result exists with this id or it expired.
+    """
+    section = request.args.get("section", default="matched", type=str)
+    page = request.args.get("page", default=1, type=int)
+    page_size = request.args.get("page_size", default=50, type=int)
+    price_status = request.args.get("price_status", default=None, type=str)
+
+    if section not in RESULT_SECTIONS:
+        return jsonify({"error": "section must be 'matched' or 'unmatched'"}), 400
+    if page < 1 or not 1 <= page_size <= RESULT_PAGE_SIZE_MAX:
+        return jsonify({"error": f"page must be >= 1 and page_size between 1 and {RESULT_PAGE_SIZE_MAX}"}), 400
+
+    try:
+        result_page = get_match_result_page(result_id, section, page, page_size, price_status)
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error reading match result {result_id}: {e}")
+        return jsonify({"error": "Error reading match result"}), 500
+
+    if result_page is None:
+        return jsonify({"error": "Match result not found or expired"}), 404
+    return json_response(result_page)
+
+
+EXPORT_MIMETYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+}
+
+
+@common_bp.route("/match-results/<result_id>/export")
+def export_match_result_api(result_id):
+    """
+    API route to download a stored match result as a spreadsheet, streamed to the client.
+
+    Query Parameters:
+    - format: str, optional, "xlsx" or "csv" (default is "xlsx").
+    - section: str, optional, "matched" or "unmatched". XLSX exports both sections as two
+      sheets by default; CSV exports one section (default is "matched").
+    - price_status: str, optional, only export matched rows whose price comparison has this status.
+    - similar_items: int, optional, similar items exported per unmatched row, 0 to 20 (default is 3).
+
+    Returns:
+    - 200: The XLSX or CSV file as an attachment.
+    - 400: If the format, section or similar_items is invalid.
+    - 404: If no result exists with this id or it expired.
+    """
+    export_format = request.args.get("format", default="xlsx", type=str)
+    section = request.args.get("section", default=None, type=str)
+    price_status = request.args.get("price_status", default=None, type=str)
+    similar_items = request.args.get("similar_items", default=EXPORT_SIMILAR_ITEMS, type=int)
+
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be 'xlsx' or 'csv'"}), 400
+    if section is not None and section not in RESULT_SECTIONS:
+        return jsonify({"error": "section must be 'matched' or 'unmatched'"}), 400
+    if not 0 <= similar_items <= PREFETCH_TOP_K_MAX:
+        return jsonify({"error": f"similar_items must be between 0 and {PREFETCH_TOP_K_MAX}"}), 400
+
+    try:
+        result = load_match_result(result_id)
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error reading match result {result_id}: {e}")
+        return jsonify({"error": "Error reading match result"}), 500
+    if result is None:
+        return jsonify({"error": "Match result not found or expired"}), 404
+
+    if section:
+        sections = [section]
+    else:
+        sections = list(RESULT_SECTIONS) if export_format == "xlsx" else ["matched"]
+    filename = f"match_result_{result_id[:8]}{'_' + section if section else ''}.{export_format}"
+
+    return Response(
+        stream_with_context(
+            stream_match_result_export(result, export_format, sections, similar_items, price_status)
+        ),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@common_bp.route("/pool-status")
+def pool_status_api():
+    """
+    API route to report the database connection pool utilization of the serving worker.
+
+    Used to size DB_POOL_SIZE / DB_MAX_OVERFLOW for the number of gunicorn workers: every
+    worker has its own pool, so the database sees up to workers * (pool_size + max_overflow)
+    connections.
+
+    Query Parameters:
+    - reset: bool, optional, reset the wait statistics after reporting them (default is false).
+
+    Returns:
+    - 200: JSON response with pool size, checked out connections, utilization and checkout wait times.
+    """
+    pool = db.engine.pool
+    if not isinstance(pool, QueuePool):
+        return jsonify({"pool": type(pool).__name__})
+
+    report = pool_stats.report(pool)
+    if request.args.get("reset", default="false").lower() == "true":
+        pool_stats.reset()
+    return jsonify(report)
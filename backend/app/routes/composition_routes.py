@@ -1,18 +1,21 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify
 from ..services.composition_service import (
     sort_and_strip_composition,
     match_price_cap_composition,
+    match_price_cap_compositions_bulk,
     get_all_compositions,
     add_composition,
     update_composition_status,
     delete_composition,
     get_composition,
     update_composition,
+    bulk_add_compositions,
+    bulk_update_composition_status,
+    bulk_delete_compositions,
 )
 import logging
-from ..utils import replace_nan_with_none
-import json
-from ..constants import STATUS_REJECTED, STATUS_PENDING, STATUS_APPROVED
+from ..utils import json_response, parse_id_list
+from ..constants import STATUS_REJECTED, STATUS_PENDING, STATUS_APPROVED, BULK_MAX_ITEMS
 
 composition_bp = Blueprint("composition", __name__)
 
@@ -62,22 +65,76 @@ def compare_price_similar_items_compositions_route():
                 similar_composition_id, composition
             )
 
-            clean_data = replace_nan_with_none(composition)
-            json_data = json.dumps(clean_data, indent=4)
-            return Response(json_data, mimetype="application/json")
+            return json_response(composition)
 
         except Exception as e:
             logging.getLogger("price_cap").error(
                 f"Error comparing price for similar item: {e}"
             )
-            error_data = {"error": str(e)}
-            json_error_data = json.dumps(error_data)
-            return Response(json_error_data, mimetype="application/json")
+            return json_response({"error": str(e)})
     except Exception as e:
         logging.getLogger(__name__).error(f"Server Error : {e}")
-        error_data = {"error": str(e)}
-        json_error_data = json.dumps(error_data)
-        return Response(json_error_data, mimetype="application/json")
+        return json_response({"error": str(e)})
+
+
+@composition_bp.route("/similar-items/compare-price/batch", methods=["POST"])
+def compare_price_similar_items_compositions_batch_route():
+    """
+    API route to compare the prices of many (composition, similar item) selections at once.
+
+    All price caps are resolved with a single query, so a reviewer's picks for every unmatched
+    row can be sent in one request instead of one /similar-items/compare-price call each.
+
+    Request JSON Payload:
+    - items: list, required, objects with the same fields as /similar-items/compare-price:
+      similar_composition_id, composition and similar_item.
+
+    Returns:
+    - 200: JSON response with 'results', one entry per item in request order: the composition object
+           with its price comparison, or an object with an 'error' for an invalid item.
+    - 400: If the items list is missing, empty or too long.
+    - 500: If an error occurs while fetching the price caps.
+    """
+
+    try:
+        items = request.json.get("items")
+
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "A non-empty list of items is required"}), 400
+        if len(items) > BULK_MAX_ITEMS:
+            return jsonify({"error": f"At most {BULK_MAX_ITEMS} items can be sent in one request"}), 400
+
+        results = [None] * len(items)
+        pairs = []
+        positions = []
+        for index, item in enumerate(items):
+            try:
+                similar_composition_id = int(item["similar_composition_id"])
+                composition = item["composition"]
+                composition["df_compositions"] = item["similar_item"]
+                composition["df_unit_rate_to_hll_excl_of_tax"] = float(
+                    composition["df_unit_rate_to_hll_excl_of_tax"]
+                )
+            except Exception:
+                results[index] = {
+                    "error": "composition object and similar composition name and its id is required"
+                }
+                continue
+            pairs.append((similar_composition_id, composition))
+            positions.append(index)
+
+        price_comparisons = match_price_cap_compositions_bulk(pairs)
+        if price_comparisons is None:
+            return jsonify({"error": "Error comparing prices"}), 500
+
+        for index, (_, composition), price_comparison in zip(positions, pairs, price_comparisons):
+            composition["price_comparison"] = price_comparison
+            results[index] = composition
+
+        return json_response({"results": results})
+    except Exception as e:
+        logging.getLogger("price_cap").error(f"Error comparing prices in batch: {e}")
+        return json_response({"error": str(e)}, status=500)
 
 
 @composition_bp.route("/get-all-compositions/")
@@ -90,6 +147,9 @@ def get_all_compositions_route():
     Query Parameters:
     - page: int, optional, the page number for pagination (default is 1).
     - search_keyword: str, optional, a keyword to filter compositions by name (default is an empty string).
+    - approved_after: int, optional, the 'next_after' cursor of the approved list; takes precedence over page.
+    - pending_after: int, optional, the 'next_after' cursor of the pending list; takes precedence over page.
+    - estimate_counts: bool, optional, return estimated instead of exact counts (default is false).
 
     Returns:
     - 200: JSON response containing a paginated list of compositions, including both approved and pending statuses.
@@ -99,21 +159,31 @@ def get_all_compositions_route():
     # Retrieve query parameters from the request
     page = request.args.get("page", default=1, type=int)
     search_keyword = request.args.get("search_keyword", default="", type=str)
+    approved_after = request.args.get("approved_after", default=None, type=int)
+    pending_after = request.args.get("pending_after", default=None, type=int)
+    estimate_counts = request.args.get("estimate_counts", default="false").lower() == "true"
 
     limit = 10  # Define the number of records per page
     offset = (page - 1) * limit  # Calculate the offset based on the current page
+    after = {STATUS_APPROVED: approved_after, STATUS_PENDING: pending_after}
 
-    compositions = get_all_compositions(search_keyword, limit=limit, offset=offset)
+    compositions = get_all_compositions(
+        search_keyword,
+        limit=limit,
+        offset=offset,
+        after=after,
+        estimate_counts=estimate_counts,
+    )
 
     if compositions is not None:
         try:
             response = {
                 "compositions": {
                     "approved": compositions.get(
-                        STATUS_APPROVED, {"compositions": [], "count": 0}
+                        STATUS_APPROVED, {"compositions": [], "count": 0, "next_after": None}
                     ),
                     "pending": compositions.get(
-                        STATUS_PENDING, {"compositions": [], "count": 0}
+                        STATUS_PENDING, {"compositions": [], "count": 0, "next_after": None}
                     ),
                 }
             }
@@ -370,3 +440,122 @@ def approve_composition():
     except Exception as e:
         composition_crud_logger.error(f"Error approving composition: {e}")
         return jsonify({"error": str(e)}), 500
+
+
+@composition_bp.route("/bulk-add-compositions", methods=["POST"])
+def bulk_add_compositions_route():
+    """
+    API route to add many compositions in one request and one transaction.
+
+    Request JSON Payload:
+    - compositions: list, required, objects with composition_name (required), content_code and dosage_form.
+    - status: int, optional, 0 to request (pending) or 1 to add as approver (default is 0).
+
+    Returns:
+    - 200: JSON response with one outcome per composition, in request order.
+    - 400: If the list is missing, empty, too long or the status is invalid.
+    - 500: If the transaction failed; nothing is added in that case.
+    """
+
+    try:
+        items = request.json.get("compositions")
+        status = request.json.get("status", STATUS_PENDING)
+
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "A non-empty list of compositions is required"}), 400
+        if len(items) > BULK_MAX_ITEMS:
+            return jsonify({"error": f"At most {BULK_MAX_ITEMS} compositions can be sent in one request"}), 400
+        if status not in (STATUS_PENDING, STATUS_APPROVED):
+            return jsonify({"error": "Status must be 0 (pending) or 1 (approved)"}), 400
+
+        outcomes = bulk_add_compositions(items, status=status)
+        if outcomes is None:
+            return jsonify({"error": "Error adding compositions"}), 500
+
+        return jsonify(
+            {
+                "results": outcomes,
+                "added": sum(1 for outcome in outcomes if outcome["result"] == "added"),
+            }
+        )
+    except Exception as e:
+        composition_crud_logger.error(f"Error while adding compositions in bulk: {e}")
+        return jsonify({"error": "Server error"}), 500
+
+
+@composition_bp.route("/bulk-update-composition-status", methods=["PUT"])
+def bulk_update_composition_status_route():
+    """
+    API route to approve, reject or reset many compositions in one request and one transaction.
+
+    Request JSON Payload:
+    - composition_ids: list, required, the IDs of the compositions to update.
+    - status: int, required, the new status (0 pending, 1 approved, 2 rejected).
+
+    Returns:
+    - 200: JSON response with one outcome ("updated" or "not_found") per composition id.
+    - 400: If the ids or the status are invalid.
+    - 500: If the transaction failed; nothing is updated in that case.
+    """
+
+    try:
+        composition_ids, error = parse_id_list(
+            request.json.get("composition_ids"), BULK_MAX_ITEMS
+        )
+        status = request.json.get("status")
+
+        if error:
+            return jsonify({"error": error}), 400
+        if status not in (STATUS_PENDING, STATUS_APPROVED, STATUS_REJECTED):
+            return jsonify({"error": "Status must be 0 (pending), 1 (approved) or 2 (rejected)"}), 400
+
+        outcomes = bulk_update_composition_status(composition_ids, status)
+        if outcomes is None:
+            return jsonify({"error": "Error updating compositions"}), 500
+
+        return jsonify(
+            {
+                "results": outcomes,
+                "updated": sum(1 for outcome in outcomes if outcome["result"] == "updated"),
+                "status": status,
+            }
+        )
+    except Exception as e:
+        composition_crud_logger.error(f"Error while updating compositions in bulk: {e}")
+        return jsonify({"error": "Server error"}), 500
+
+
+@composition_bp.route("/bulk-delete-compositions", methods=["DELETE"])
+def bulk_delete_compositions_route():
+    """
+    API route to soft delete many compositions in one request and one transaction.
+
+    Request JSON Payload:
+    - composition_ids: list, required, the IDs of the compositions to delete.
+
+    Returns:
+    - 200: JSON response with one outcome ("updated" or "not_found") per composition id.
+    - 400: If the ids are invalid.
+    - 500: If the transaction failed; nothing is deleted in that case.
+    """
+
+    try:
+        composition_ids, error = parse_id_list(
+            request.json.get("composition_ids"), BULK_MAX_ITEMS
+        )
+        if error:
+            return jsonify({"error": error}), 400
+
+        outcomes = bulk_delete_compositions(composition_ids)
+        if outcomes is None:
+            return jsonify({"error": "Error deleting compositions"}), 500
+
+        return jsonify(
+            {
+                "results": outcomes,
+                "deleted": sum(1 for outcome in outcomes if outcome["result"] == "updated"),
+            }
+        )
+    except Exception as e:
+        composition_crud_logger.error(f"Error while deleting compositions in bulk: {e}")
+        return jsonify({"error": "Server error"}), 500
@@ -1,18 +1,20 @@
-from flask import Blueprint, request, jsonify, Response
-import pandas as pd
+from flask import Blueprint, request, jsonify
 import logging
 from ..services.implant_service import (
     match_price_cap_implant,
+    match_price_cap_implants_bulk,
     get_all_implants,
     add_implant,
     update_implant,
     update_implant_status,
     get_implant,
-    delete_implant
+    delete_implant,
+    bulk_add_implants,
+    bulk_update_implant_status,
+    bulk_delete_implants,
 )
-from ..utils import replace_nan_with_none
-import json
-from ..constants import STATUS_APPROVED, STATUS_PENDING, STATUS_REJECTED
+from ..utils import json_response, parse_id_list
+from ..constants import STATUS_APPROVED, STATUS_PENDING, STATUS_REJECTED, BULK_MAX_ITEMS
 
 implant_bp = Blueprint("implant", __name__)
 
@@ -58,22 +60,75 @@ def compare_price_similar_items_implants_route():
                 similar_implant_id, product_implant
             )
 
-            clean_data = replace_nan_with_none(product_implant)
-            json_data = json.dumps(clean_data, indent=4)
-            return Response(json_data, mimetype="application/json")
+            return json_response(product_implant)
 
         except Exception as e:
             logging.getLogger("price_cap").error(
                 f"Error comparing price for similar item: {e}"
             )
-            error_data = {"error": str(e)}
-            json_error_data = json.dumps(error_data)
-            return Response(json_error_data, mimetype="application/json")
+            return json_response({"error": str(e)})
     except Exception as e:
         logging.getLogger(__name__).error(f"Error : {e}")
-        error_data = {"error": str(e)}
-        json_error_data = json.dumps(error_data)
-        return Response(json_error_data, mimetype="application/json")
+        return json_response({"error": str(e)})
+
+
+@implant_bp.route("/similar-items-implants/compare-price/batch", methods=["POST"])
+def compare_price_similar_items_implants_batch_route():
+    """
+    API route to compare the prices of many (implant, similar item) selections at once.
+
+    All price caps are resolved with a single query instead of one
+    /similar-items-implants/compare-price call per selection.
+
+    Parameters:
+    - items (list): Required; objects with similar_implant_id, implant and similar_item.
+
+    Returns:
+    - 200: JSON response with 'results', one entry per item in request order: the implant object
+           with its price comparison, or an object with an 'error' for an invalid item.
+    - 400: JSON response with an error message if the items list is missing, empty or too long.
+    - 500: JSON response with an error message if fetching the price caps failed.
+    """
+
+    try:
+        items = request.json.get("items")
+
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "A non-empty list of items is required"}), 400
+        if len(items) > BULK_MAX_ITEMS:
+            return jsonify({"error": f"At most {BULK_MAX_ITEMS} items can be sent in one request"}), 400
+
+        results = [None] * len(items)
+        pairs = []
+        positions = []
+        for index, item in enumerate(items):
+            try:
+                similar_implant_id = int(item["similar_implant_id"])
+                product_implant = item["implant"]
+                product_implant["df_product_description_with_specification"] = item["similar_item"]
+                product_implant["df_unit_rate_to_hll_excl_of_tax"] = float(
+                    product_implant["df_unit_rate_to_hll_excl_of_tax"]
+                )
+            except Exception:
+                results[index] = {
+                    "error": "Implant object and similar Implant Name and its Id is required"
+                }
+                continue
+            pairs.append((similar_implant_id, product_implant))
+            positions.append(index)
+
+        price_comparisons = match_price_cap_implants_bulk(pairs)
+        if price_comparisons is None:
+            return jsonify({"error": "Error comparing prices"}), 500
+
+        for index, (_, product_implant), price_comparison in zip(positions, pairs, price_comparisons):
+            product_implant["price_comparison"] = price_comparison
+            results[index] = product_implant
+
+        return json_response({"results": results})
+    except Exception as e:
+        logging.getLogger("price_cap").error(f"Error comparing prices in batch: {e}")
+        return json_response({"error": str(e)}, status=500)
 
 
 @implant_bp.route("/get-all-implants/")
@@ -86,6 +141,9 @@ def get_all_implants_route():
     Parameters:
     - page (int): Optional; the page number to retrieve, default is 1.
     - search_keyword (str): Optional; a keyword to filter implants by name or description.
+    - approved_after (int): Optional; the 'next_after' cursor of the approved list, takes precedence over page.
+    - pending_after (int): Optional; the 'next_after' cursor of the pending list, takes precedence over page.
+    - estimate_counts (bool): Optional; return estimated instead of exact counts, default is false.
 
     Returns:
     - 200: JSON response containing the list of implants, separated into approved and pending.
@@ -95,18 +153,28 @@ def get_all_implants_route():
     # Retrieve query parameters from the request
     page = request.args.get("page", default=1, type=int)
     search_keyword = request.args.get("search_keyword", default="", type=str)
+    approved_after = request.args.get("approved_after", default=None, type=int)
+    pending_after = request.args.get("pending_after", default=None, type=int)
+    estimate_counts = request.args.get("estimate_counts", default="false").lower() == "true"
 
     limit = 10  # Define the number of records per page
     offset = (page - 1) * limit  # Calculate the offset based on the current page
+    after = {STATUS_APPROVED: approved_after, STATUS_PENDING: pending_after}
 
-    implants = get_all_implants(search_keyword, limit=limit, offset=offset)
+    implants = get_all_implants(
+        search_keyword,
+        limit=limit,
+        offset=offset,
+        after=after,
+        estimate_counts=estimate_counts,
+    )
 
     if implants is not None:
         try:
             response = {
                 "implants": {
-                    "approved": implants.get(STATUS_APPROVED, {"implants": [], "count": 0}),
-                    "pending": implants.get(STATUS_PENDING, {"implants": [], "count": 0}),
+                    "approved": implants.get(STATUS_APPROVED, {"implants": [], "count": 0, "next_after": None}),
+                    "pending": implants.get(STATUS_PENDING, {"implants": [], "count": 0, "next_after": None}),
                 }
             }
             return jsonify(response)
@@ -343,4 +411,119 @@ def approve_requested_implant_route():
 
     except Exception as e:
         composition_crud_logger.error(f"Error approving implant: {e}")
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+@implant_bp.route("/bulk-add-implants", methods=["POST"])
+def bulk_add_implants_route():
+    """
+    API route to add many implants in one request and one transaction.
+
+    Parameters:
+    - implants (list): Required; objects with product_description (required) and item_code.
+    - status (int): Optional; 0 to request (pending) or 1 to add as approver, default is 0.
+
+    Returns:
+    - 200: JSON response with one outcome per implant, in request order.
+    - 400: JSON response with an error message if the list is missing, empty, too long or the status is invalid.
+    - 500: JSON response with an error message if the transaction failed; nothing is added in that case.
+    """
+
+    try:
+        items = request.json.get("implants")
+        status = request.json.get("status", STATUS_PENDING)
+
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "A non-empty list of implants is required"}), 400
+        if len(items) > BULK_MAX_ITEMS:
+            return jsonify({"error": f"At most {BULK_MAX_ITEMS} implants can be sent in one request"}), 400
+        if status not in (STATUS_PENDING, STATUS_APPROVED):
+            return jsonify({"error": "Status must be 0 (pending) or 1 (approved)"}), 400
+
+        outcomes = bulk_add_implants(items, status=status)
+        if outcomes is None:
+            return jsonify({"error": "Error adding implants"}), 500
+
+        return jsonify(
+            {
+                "results": outcomes,
+                "added": sum(1 for outcome in outcomes if outcome["result"] == "added"),
+            }
+        )
+    except Exception as e:
+        composition_crud_logger.error(f"Error while adding implants in bulk: {e}")
+        return jsonify({"error": "Server error"}), 500
+
+
+@implant_bp.route("/bulk-update-implant-status", methods=["PUT"])
+def bulk_update_implant_status_route():
+    """
+    API route to approve, reject or reset many implants in one request and one transaction.
+
+    Parameters:
+    - implant_ids (list): Required; the IDs of the implants to update.
+    - status (int): Required; the new status (0 pending, 1 approved, 2 rejected).
+
+    Returns:
+    - 200: JSON response with one outcome ("updated" or "not_found") per implant id.
+    - 400: JSON response with an error message if the ids or the status are invalid.
+    - 500: JSON response with an error message if the transaction failed; nothing is updated in that case.
+    """
+
+    try:
+        implant_ids, error = parse_id_list(request.json.get("implant_ids"), BULK_MAX_ITEMS)
+        status = request.json.get("status")
+
+        if error:
+            return jsonify({"error": error}), 400
+        if status not in (STATUS_PENDING, STATUS_APPROVED, STATUS_REJECTED):
+            return jsonify({"error": "Status must be 0 (pending), 1 (approved) or 2 (rejected)"}), 400
+
+        outcomes = bulk_update_implant_status(implant_ids, status)
+        if outcomes is None:
+            return jsonify({"error": "Error updating implants"}), 500
+
+        return jsonify(
+            {
+                "results": outcomes,
+                "updated": sum(1 for outcome in outcomes if outcome["result"] == "updated"),
+                "status": status,
+            }
+        )
+    except Exception as e:
+        composition_crud_logger.error(f"Error while updating implants in bulk: {e}")
+        return jsonify({"error": "Server error"}), 500
+
+
+@implant_bp.route("/bulk-delete-implants", methods=["DELETE"])
+def bulk_delete_implants_route():
+    """
+    API route to soft delete many implants in one request and one transaction.
+
+    Parameters:
+    - implant_ids (list): Required; the IDs of the implants to delete.
+
+    Returns:
+    - 200: JSON response with one outcome ("updated" or "not_found") per implant id.
+    - 400: JSON response with an error message if the ids are invalid.
+    - 500: JSON response with an error message if the transaction failed; nothing is deleted in that case.
+    """
+
+    try:
+        implant_ids, error = parse_id_list(request.json.get("implant_ids"), BULK_MAX_ITEMS)
+        if error:
+            return jsonify({"error": error}), 400
+
+        outcomes = bulk_delete_implants(implant_ids)
+        if outcomes is None:
+            return jsonify({"error": "Error deleting implants"}), 500
+
+        return jsonify(
+            {
+                "results": outcomes,
+                "deleted": sum(1 for outcome in outcomes if outcome["result"] == "updated"),
+            }
+        )
+    except Exception as e:
+        composition_crud_logger.error(f"Error while deleting implants in bulk: {e}")
+        return jsonify({"error": "Server error"}), 500
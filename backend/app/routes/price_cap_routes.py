@@ -0,0 +1,50 @@
+from flask import Blueprint, request, jsonify
+import logging
+from sqlalchemy.exc import SQLAlchemyError
+from ..services.price_cap_service import import_price_caps, PriceCapImportError
+from ..constants import PRICE_CAP_TYPE_COMPOSITIONS
+
+price_cap_bp = Blueprint("price_cap", __name__)
+
+price_cap_logger = logging.getLogger("price_cap")
+
+
+@price_cap_bp.route("/import-price-caps", methods=["POST"])
+def import_price_caps_route():
+    """
+    API route to import a price cap sheet (e.g. an NPPA price list) into the price cap tables.
+
+    The sheet is streamed into the database with COPY, upserted into the price cap table and
+    linked to the compositions or implants catalog in one transaction.
+
+    Request Parameters:
+    - file: The .xlsx or .csv sheet to import (required).
+    - price_cap_type: int, optional, 1 for composition price caps, 2 for implant price caps (default is 1).
+
+    Returns:
+    - 200: JSON response with the number of rows read, skipped, inserted, updated and linked.
+    - 400: If no file is uploaded, the sheet format or columns are invalid, or the price cap type is invalid.
+    - 500: If the import failed; nothing is imported in that case.
+    """
+
+    file = request.files.get("file")
+    price_cap_type = request.args.get(
+        "price_cap_type", default=PRICE_CAP_TYPE_COMPOSITIONS, type=int
+    )
+
+    if not file:
+        price_cap_logger.error("Price cap file not uploaded")
+        return jsonify({"error": "No file uploaded"}), 400
+
+    try:
+        summary = import_price_caps(file.stream, file.filename or "", price_cap_type)
+        return jsonify({"message": "Price caps imported successfully", **summary})
+    except PriceCapImportError as e:
+        price_cap_logger.error(f"Invalid price cap sheet {file.filename}: {e}")
+        return jsonify({"error": str(e)}), 400
+    except SQLAlchemyError:
+        # Already logged to the critical log by the service
+        return jsonify({"error": "Error importing price caps"}), 500
+    except Exception as e:
+        price_cap_logger.error(f"Error importing price cap sheet {file.filename}: {e}")
+        return jsonify({"error": "Error importing price caps"}), 500
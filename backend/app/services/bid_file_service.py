@@ -0,0 +1,260 @@
+import hashlib
+import json
+from ..constants import BID_FILE_TYPE_COMPOSITIONS, BID_FILE_TYPE_IMPLANTS
+
+TEXT = "text"
+NUMBER = "number"
+
+# Columns read from a bid file of each type, with the kind of value they hold. Nothing else
+# in the sheet is read.
+BID_FILE_COLUMNS = {
+    BID_FILE_TYPE_COMPOSITIONS: {
+        "sl_no": TEXT,
+        "brand_name": TEXT,
+        "composition": TEXT,
+        "name_of_manufacturer": TEXT,
+        "u_o_m": TEXT,
+        "dosage_form": TEXT,
+        "packing_unit": TEXT,
+        "gst": NUMBER,
+        "mrp_incl_of_tax": NUMBER,
+        "unit_rate_to_hll_excl_of_tax": NUMBER,
+        "unit_rate_to_hll_incl_of_tax": NUMBER,
+        "hsn_code": TEXT,
+        "margin": NUMBER,
+    },
+    BID_FILE_TYPE_IMPLANTS: {
+        "sl_no": TEXT,
+        "item_code": TEXT,
+        "product_description_with_specification": TEXT,
+        "name_of_manufacturer": TEXT,
+        "gst": NUMBER,
+        "variants": TEXT,
+        "mrp_incl_of_tax": NUMBER,
+        "unit_rate_to_hll_excl_of_tax": NUMBER,
+        "unit_rate_to_hll_incl_of_tax": NUMBER,
+        "hsn_code": TEXT,
+        "margin": NUMBER,
+    },
+}
+
+# Columns a row cannot be matched without
+BID_FILE_REQUIRED_COLUMNS = {
+    BID_FILE_TYPE_COMPOSITIONS: ("composition",),
+    BID_FILE_TYPE_IMPLANTS: ("product_description_with_specification",),
+}
+
+# Text columns compared to price caps, stored once more as "<column>_normalized"
+# (lowercase, whitespace collapsed)
+BID_FILE_NORMALIZED_COLUMNS = {
+    BID_FILE_TYPE_COMPOSITIONS: ("dosage_form", "packing_unit"),
+    BID_FILE_TYPE_IMPLANTS: ("variants",),
+}
+
+BID_FILE_FORMATS = ("xlsx", "csv", "parquet")
+
+
+class BidFileError(ValueError):
+    """Raised when an uploaded bid file cannot be read (unknown format, missing columns)."""
+
+
+def detect_bid_file_format(filename: str, head: bytes) -> str:
+    """
+    Detect the format of an uploaded bid file from its extension, or its first bytes when
+    the extension is missing or unknown.
+
+    Args:
+        filename (str): The uploaded file name.
+        head (bytes): The first bytes of the file.
+
+    Returns:
+        str: "xlsx", "csv" or "parquet".
+
+    Raises:
+        BidFileError: If the format is not supported.
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if filename and "." in filename else ""
+    if extension in BID_FILE_FORMATS:
+        return extension
+    if head.startswith(b"PK\x03\x04"):
+        return "xlsx"
+    if head.startswith(b"PAR1"):
+        return "parquet"
+    if extension in ("", "txt"):
+        return "csv"
+    raise BidFileError(f"Unsupported file format '.{extension}', upload .xlsx, .csv or .parquet")
+
+
+def _to_text(series):
+    """
+    Convert a column to stripped strings (None when empty), writing whole numbers without a
+    decimal part, so "30049099", 30049099 and 30049099.0 read from different formats are equal.
+    """
+
+    def convert(value):
+        if value is None or value != value:  # None or NaN
+            return None
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        text = str(value).strip()
+        return text or None
+
+    return series.astype(object).map(convert).astype(object)
+
+
+def _read_columns(file, file_format: str, columns: dict):
+    """Read only the schema's columns of the file, without type guessing where the format allows it."""
+    import pandas as pd
+
+    def wanted(name):
+        return str(name).strip() in columns
+
+    if file_format == "xlsx":
+        return pd.read_excel(file, engine="openpyxl", usecols=wanted)
+
+    if file_format == "csv":
+        # Every cell as text: the C parser skips type inference, the schema converts below
+        return pd.read_csv(
+            file,
+            engine="c",
+            usecols=wanted,
+            dtype=object,
+            keep_default_na=False,
+            na_values=[""],
+            skipinitialspace=True,
+        )
+
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise BidFileError("Parquet uploads need the pyarrow package installed on the server")
+    parquet_file = pq.ParquetFile(file)
+    present = [name for name in parquet_file.schema_arrow.names if wanted(name)]
+    return parquet_file.read(columns=present).to_pandas()
+
+
+def read_bid_file(file, filename: str, file_type: int):
+    """
+    Read an uploaded bid file (.xlsx, .csv or .parquet) into a DataFrame of the schema's
+    columns, with the same values whatever the format.
+
+    Text columns hold stripped strings or None; number columns are left as read and are
+    converted by validate_bid_file.
+
+    Args:
+        file: The uploaded file (binary file object).
+        filename (str): The uploaded file name, used to detect the format.
+        file_type (int): BID_FILE_TYPE_COMPOSITIONS or BID_FILE_TYPE_IMPLANTS.
+
+    Returns:
+        pd.DataFrame: The bid rows.
+
+    Raises:
+        BidFileError: If the format is unsupported or required columns are missing.
+    """
+    columns = BID_FILE_COLUMNS.get(file_type)
+    if columns is None:
+        raise BidFileError("Invalid file type")
+
+    head = file.read(8)
+    file.seek(0)
+    file_format = detect_bid_file_format(filename, head)
+    df = _read_columns(file, file_format, columns)
+    df.columns = [str(name).strip() for name in df.columns]
+
+    missing = [name for name in columns if name not in df.columns]
+    if missing:
+        raise BidFileError(f"Missing required columns: {', '.join(missing)}")
+
+    df = df.loc[:, list(columns)]
+    for name, kind in columns.items():
+        if kind == TEXT:
+            df[name] = _to_text(df[name])
+    return df.reset_index(drop=True)
+
+
+def _sheet_rows(mask) -> list:
+    """Spreadsheet row numbers (the header being row 1) of the rows selected by a boolean mask."""
+    return [int(index) + 2 for index in mask[mask].index]
+
+
+def validate_bid_file(df, file_type: int) -> tuple:
+    """
+    Validate and coerce the rows of a bid file in one vectorized pass, before any matching.
+
+    Number columns are converted with pd.to_numeric (empty cells become NaN), required text
+    columns are checked for empty cells, and the columns compared to price caps are
+    normalized once into "<column>_normalized".
+
+    Args:
+        df (pd.DataFrame): The rows returned by read_bid_file.
+        file_type (int): BID_FILE_TYPE_COMPOSITIONS or BID_FILE_TYPE_IMPLANTS.
+
+    Returns:
+        Tuple: The coerced DataFrame and a list of errors, one per invalid cell, each with the
+        spreadsheet 'row', its 'sl_no', the 'column', the 'value' and a 'message'.
+    """
+    import pandas as pd
+
+    errors = []
+
+    def report(mask, column, message):
+        for row in _sheet_rows(mask):
+            index = row - 2
+            value = df.at[index, column]
+            errors.append(
+                {
+                    "row": row,
+                    "sl_no": df.at[index, "sl_no"],
+                    "column": column,
+                    "value": None if pd.isna(value) else str(value),
+                    "message": message,
+                }
+            )
+
+    for name, kind in BID_FILE_COLUMNS[file_type].items():
+        if kind != NUMBER:
+            continue
+        raw = df[name].map(lambda value: value.strip() if isinstance(value, str) else value)
+        raw = raw.mask(raw.eq(""))
+        numbers = pd.to_numeric(raw, errors="coerce").astype("float64")
+        report(raw.notna() & numbers.isna(), name, "must be a number")
+        df[name] = numbers
+
+    for name in BID_FILE_REQUIRED_COLUMNS[file_type]:
+        report(df[name].isna(), name, "is required")
+
+    for name in BID_FILE_NORMALIZED_COLUMNS[file_type]:
+        df[f"{name}_normalized"] = (
+            df[name].str.lower().str.split().str.join(" ").astype(object)
+        )
+
+    errors.sort(key=lambda error: error["row"])
+    return df, errors
+
+
+def hash_bid_rows(df, file_type: int) -> list:
+    """
+    Hash the input of every row of a validated bid file, so a row of a later upload can be
+    recognised as unchanged and reuse its stored match result.
+
+    Only the schema's columns are hashed, after coercion, so the same row hashes the same
+    whatever the file format.
+
+    Args:
+        df (pd.DataFrame): The rows returned by validate_bid_file.
+        file_type (int): BID_FILE_TYPE_COMPOSITIONS or BID_FILE_TYPE_IMPLANTS.
+
+    Returns:
+        list: One SHA-256 hex digest per row.
+    """
+    columns = list(BID_FILE_COLUMNS[file_type])
+    return [
+        hashlib.sha256(
+            json.dumps(
+                [file_type, *(None if value != value else value for value in values)],
+                default=str,
+            ).encode()
+        ).hexdigest()
+        for values in df[columns].astype(object).itertuples(index=False, name=None)
+    ]
@@ -0,0 +1,111 @@
+import json
+import logging
+import select
+import threading
+import time
+from ..db import db
+from .catalog_service import CATALOG_CHANNEL
+from .match_catalog import (
+    get_match_catalog,
+    apply_match_catalog_change,
+    check_match_catalog_versions,
+    catalog_listener_connected,
+)
+from ..constants import CATALOG_COMPOSITIONS, CATALOG_IMPLANTS
+
+server_logger = logging.getLogger("app")
+
+# Seconds to wait before reconnecting after the listening connection failed
+RECONNECT_DELAY = 5
+
+
+def _connect_listener(engine):
+    """
+    Open a dedicated autocommit connection listening on CATALOG_CHANNEL.
+
+    It is opened outside the pool, so the listener never holds one of the pooled connections.
+    """
+    cargs, cparams = engine.dialect.create_connect_args(engine.url)
+    connection = engine.dialect.connect(*cargs, **cparams)
+    connection.autocommit = True
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {CATALOG_CHANNEL}")
+    return connection
+
+
+def _apply_notification(payload: str) -> None:
+    try:
+        change = json.loads(payload)
+        catalog, version, changed_ids = change["catalog"], int(change["version"]), change.get("ids")
+    except (ValueError, KeyError, TypeError) as e:
+        server_logger.error(f"Ignoring malformed catalog notification {payload!r}: {e}")
+        return
+    apply_match_catalog_change(catalog, version, changed_ids)
+
+
+def _listen(app, check_interval):
+    """
+    Apply catalog notifications as they arrive and check the catalog versions every
+    check_interval seconds, reconnecting whenever the connection fails.
+    """
+    while True:
+        connection = None
+        try:
+            with app.app_context():
+                connection = _connect_listener(db.engine)
+                # Changes committed while not listening were missed, catch up first
+                check_match_catalog_versions()
+                catalog_listener_connected.set()
+                next_check = time.monotonic() + check_interval
+
+                while True:
+                    timeout = max(next_check - time.monotonic(), 0)
+                    readable, _, _ = select.select([connection], [], [], timeout)
+                    if readable:
+                        connection.poll()
+                        while connection.notifies:
+                            _apply_notification(connection.notifies.pop(0).payload)
+                    if time.monotonic() >= next_check:
+                        check_match_catalog_versions()
+                        next_check = time.monotonic() + check_interval
+                    db.session.remove()
+        except Exception as e:
+            server_logger.error(f"Catalog listener failed, reconnecting in {RECONNECT_DELAY}s: {e}")
+        finally:
+            catalog_listener_connected.clear()
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+        time.sleep(RECONNECT_DELAY)
+
+
+def start_catalog_listener(app, check_interval: int) -> threading.Thread | None:
+    """
+    Keep the in-memory catalogs of this process up to date in a background thread.
+
+    Threads do not survive a fork, so every gunicorn worker starts its own listener
+    (see post_fork in gunicorn.conf.py).
+
+    Args:
+        app (Flask): The application, for the database connection.
+        check_interval (int): Seconds between two version checks; 0 disables the listener.
+
+    Returns:
+        Thread: The listener thread, or None if it was not started.
+    """
+    loaded = [
+        catalog
+        for catalog in (CATALOG_COMPOSITIONS, CATALOG_IMPLANTS)
+        if get_match_catalog(catalog) is not None
+    ]
+    if not check_interval or not loaded:
+        return None
+
+    thread = threading.Thread(
+        target=_listen, args=(app, check_interval), name="catalog-listener", daemon=True
+    )
+    thread.start()
+    server_logger.info(f"Listening for changes to {', '.join(loaded)} on {CATALOG_CHANNEL}")
+    return thread
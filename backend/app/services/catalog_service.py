@@ -0,0 +1,134 @@
+import json
+import logging
+import threading
+from collections import OrderedDict
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from ..db import db
+from ..models import CatalogVersion
+
+server_logger = logging.getLogger(__name__)
+critical_logger = logging.getLogger("critical")
+
+# Maximum number of (catalog, keyword, version) entries kept in the count cache
+COUNT_CACHE_SIZE = 256
+
+# Channel on which every catalog write is announced to the worker processes
+CATALOG_CHANNEL = "catalog_changes"
+
+# NOTIFY payloads are limited to 8000 bytes; larger change sets are sent without their ids
+NOTIFY_PAYLOAD_LIMIT = 7900
+
+_count_cache = OrderedDict()
+_count_cache_lock = threading.Lock()
+
+
+def get_catalog_version(catalog: str) -> int:
+    """
+    Fetch the current version of a catalog (compositions or implants).
+
+    The version is bumped by every write to the catalog, so anything derived from the
+    catalog (cached counts, in-memory indexes) can be keyed by it.
+
+    Args:
+        catalog (str): The catalog name (CATALOG_COMPOSITIONS or CATALOG_IMPLANTS).
+
+    Returns:
+        int: The catalog version, 0 if the catalog has never been written to.
+    """
+    row = db.session.get(CatalogVersion, catalog)
+    return row.version if row else 0
+
+
+def bump_catalog_version(catalog: str, changed_ids=None) -> None:
+    """
+    Increment the version of a catalog within the current transaction and announce the
+    change on CATALOG_CHANNEL.
+
+    Does not commit; call it right before the commit of the write it belongs to so that
+    the new version becomes visible together with the changed rows. Postgres delivers the
+    notification on commit, and drops it on rollback.
+
+    Args:
+        catalog (str): The catalog name (CATALOG_COMPOSITIONS or CATALOG_IMPLANTS).
+        changed_ids (list, optional): IDs of the rows written. Without them listeners reload
+            the whole catalog.
+    """
+    version = db.session.execute(
+        text(
+            """
+            INSERT INTO catalog_versions (catalog, version) VALUES (:catalog, 1)
+            ON CONFLICT (catalog) DO UPDATE SET version = catalog_versions.version + 1
+            RETURNING version
+            """
+        ),
+        {"catalog": catalog},
+    ).scalar()
+
+    payload = json.dumps(
+        {
+            "catalog": catalog,
+            "version": version,
+            "ids": sorted(changed_ids) if changed_ids is not None else None,
+        }
+    )
+    if len(payload) > NOTIFY_PAYLOAD_LIMIT:
+        payload = json.dumps({"catalog": catalog, "version": version, "ids": None})
+    db.session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": CATALOG_CHANNEL, "payload": payload},
+    )
+
+
+def get_cached_counts(catalog: str, search_keyword: str, compute_counts) -> dict:
+    """
+    Return the per-status counts for a search, computing them only once per catalog version.
+
+    Args:
+        catalog (str): The catalog name (CATALOG_COMPOSITIONS or CATALOG_IMPLANTS).
+        search_keyword (str): The search keyword the counts belong to.
+        compute_counts (callable): Called without arguments on a cache miss, returns {status: count}.
+
+    Returns:
+        dict: Counts keyed by status.
+    """
+    key = (catalog, search_keyword, get_catalog_version(catalog))
+
+    with _count_cache_lock:
+        if key in _count_cache:
+            _count_cache.move_to_end(key)
+            return _count_cache[key]
+
+    counts = compute_counts()
+
+    with _count_cache_lock:
+        _count_cache[key] = counts
+        _count_cache.move_to_end(key)
+        while len(_count_cache) > COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+
+    return counts
+
+
+def estimate_row_count(query: str, params: dict) -> int:
+    """
+    Estimate the number of rows a query returns from the planner statistics, without running it.
+
+    Args:
+        query (str): The SELECT statement to estimate.
+        params (dict): Parameters bound to the query.
+
+    Returns:
+        int: The planner's row estimate, 0 if it could not be obtained.
+    """
+    try:
+        plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+    except Exception as e:
+        server_logger.error(f"Error estimating row count: {e}")
+    return 0
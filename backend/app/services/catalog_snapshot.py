@@ -0,0 +1,148 @@
+import mmap
+import os
+import struct
+from array import array
+
+# File layout (little endian, every section starts on an 8 byte boundary):
+#
+#   header      magic, catalog version, entry count, string field count, catalog name length
+#   name        catalog name (utf-8)
+#   ids         entry count x int64
+#   per string field, in the order of the entry type's fields after "id":
+#     nulls     entry count x uint8, 1 where the value is None
+#     offsets   (entry count + 1) x int64, byte offsets of every value in the blob
+#     blob      the values (utf-8), separated by NUL so the key blob splits in one call
+#
+# The file is opened with mmap, so the processes of a host share its pages, and values
+# are only decoded when an entry is read.
+SNAPSHOT_MAGIC = b"HLLCAT01"
+HEADER = struct.Struct("<8sqqqq")
+SEPARATOR = b"\0"
+
+
+class CatalogSnapshotError(ValueError):
+    """Raised when a catalog snapshot file is empty, truncated or of another format."""
+
+
+def _pad(size: int) -> int:
+    return -size % 8
+
+
+def write_catalog_snapshot(path: str, catalog: str, version: int, entry_type, entries: list) -> None:
+    """
+    Write the entries of a catalog to a snapshot file, replacing it atomically.
+
+    Args:
+        path (str): The snapshot file.
+        catalog (str): The catalog name.
+        version (int): The catalog version the entries were read at.
+        entry_type (type): The namedtuple type of the entries, its first field is the integer id.
+        entries (list): The catalog entries.
+    """
+    string_fields = entry_type._fields[1:]
+    name = catalog.encode("utf-8")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(HEADER.pack(SNAPSHOT_MAGIC, version, len(entries), len(string_fields), len(name)))
+        file.write(name + b"\0" * _pad(len(name)))
+        file.write(array("q", (entry[0] for entry in entries)).tobytes())
+
+        for field_index in range(1, len(entry_type._fields)):
+            values = [entry[field_index] for entry in entries]
+            nulls = bytes(value is None for value in values)
+            file.write(nulls + b"\0" * _pad(len(nulls)))
+
+            encoded = [(value or "").replace("\0", "").encode("utf-8") for value in values]
+            offsets = array("q", [0])
+            for value in encoded:
+                offsets.append(offsets[-1] + len(value) + len(SEPARATOR))
+            blob = SEPARATOR.join(encoded)
+            file.write(offsets.tobytes())
+            file.write(blob + b"\0" * _pad(len(blob)))
+    os.replace(temp_path, path)
+
+
+class SnapshotEntries:
+    """
+    Read-only sequence of catalog entries backed by a memory-mapped snapshot file.
+    """
+
+    def __init__(self, path: str, entry_type):
+        with open(path, "rb") as file:
+            try:
+                self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise CatalogSnapshotError(f"{path} is empty")
+
+        buffer = memoryview(self._mmap)
+        if len(buffer) < HEADER.size:
+            raise CatalogSnapshotError(f"{path} is truncated")
+        magic, self.version, self._count, field_count, name_length = HEADER.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC:
+            raise CatalogSnapshotError(f"{path} is not a catalog snapshot")
+        if field_count != len(entry_type._fields) - 1:
+            raise CatalogSnapshotError(f"{path} was written for another entry type")
+
+        position = HEADER.size
+
+        def take(size):
+            nonlocal position
+            if position + size > len(buffer):
+                raise CatalogSnapshotError(f"{path} is truncated")
+            section = buffer[position : position + size]
+            position += size + _pad(size)
+            return section
+
+        self.catalog = bytes(take(name_length)).decode("utf-8")
+        self._ids = take(8 * self._count).cast("q")
+        self._fields = []
+        for _ in range(field_count):
+            nulls = take(self._count)
+            offsets = take(8 * (self._count + 1)).cast("q")
+            blob = take(offsets[-1] - len(SEPARATOR) if self._count else 0)
+            self._fields.append((nulls, offsets, blob))
+
+        self._entry_type = entry_type
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def ids(self):
+        """The entry ids in file order (ascending), read from the mapped file without copying."""
+        return self._ids
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("catalog entry index out of range")
+        values = [self._ids[index]]
+        for nulls, offsets, blob in self._fields:
+            if nulls[index]:
+                values.append(None)
+            else:
+                start = offsets[index]
+                end = offsets[index + 1] - len(SEPARATOR)
+                values.append(bytes(blob[start:end]).decode("utf-8"))
+        return self._entry_type(*values)
+
+    def __iter__(self):
+        return (self[index] for index in range(self._count))
+
+    def field_values(self, field: str) -> list:
+        """
+        Decode every value of a string field at once (None values become "").
+
+        Args:
+            field (str): The entry field name.
+
+        Returns:
+            list: The values in entry order.
+        """
+        _, _, blob = self._fields[self._entry_type._fields.index(field) - 1]
+        if not self._count:
+            return []
+        return bytes(blob).decode("utf-8").split(SEPARATOR.decode())
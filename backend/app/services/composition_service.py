@@ -1,12 +1,27 @@
-import pandas as pd
-from fuzzywuzzy import fuzz
 import re
+import copy
 import logging
-from sqlalchemy import func, text
+from sqlalchemy import func, text, insert, update
 from sqlalchemy.exc import SQLAlchemyError
 from ..models import Compositions, PriceCapCompositions
 from ..db import db
-from ..constants import STATUS_APPROVED, STATUS_PENDING, STATUS_REJECTED
+from ..constants import (
+    STATUS_APPROVED,
+    STATUS_PENDING,
+    STATUS_REJECTED,
+    CATALOG_COMPOSITIONS,
+    MATCH_THRESHOLD_DEFAULT,
+)
+from .catalog_service import bump_catalog_version, get_cached_counts, estimate_row_count
+from .match_catalog import (
+    get_match_catalog,
+    ensure_fresh_match_catalog,
+    normalize_dosage_form,
+    SIMILAR_ITEMS_LIMIT,
+)
+from .price_comparison import compare_prices, PRICE_STATUS_ERROR
+from .rescore_service import schedule_rescore
+from ..config import get_dosage_form_blocking, get_match_candidate_limit, get_match_threshold
 
 server_logger = logging.getLogger(__name__)
 critical_logger = logging.getLogger("critical")
@@ -18,90 +33,144 @@ price_cap_logger = logging.getLogger("price_cap")
 composition_implant_crud_logger = logging.getLogger("composition_implant_crud")
 
 
-def get_all_compositions(search_keyword="", limit=10, offset=0):
+COMPOSITION_SEARCH_FILTER = "(compositions ILIKE :search_keyword OR content_code ILIKE :search_keyword)"
+
+
+def count_compositions_by_status(search_keyword="", estimate=False):
+    """
+    Count the compositions matching a search keyword, per status.
+
+    Exact counts are cached per (keyword, catalog version), so they are only recomputed
+    after the compositions table has been written to.
+
+    Args:
+        search_keyword (str): Keyword to search in 'compositions' and 'content_code' (case-insensitive).
+        estimate (bool): Use the planner's row estimate instead of an exact COUNT(*) (default: False).
+
+    Returns:
+        dict: Counts keyed by status.
+    """
+    params = {"search_keyword": f"%{search_keyword}%"}
+
+    if estimate:
+        return {
+            status: estimate_row_count(
+                f"SELECT id FROM compositions WHERE status = {int(status)} AND {COMPOSITION_SEARCH_FILTER}",
+                params,
+            )
+            for status in (STATUS_APPROVED, STATUS_PENDING)
+        }
+
+    def compute_counts():
+        result = db.session.execute(
+            text(
+                f"""
+                SELECT status, COUNT(*) FROM compositions
+                WHERE {COMPOSITION_SEARCH_FILTER}
+                GROUP BY status
+                """
+            ),
+            params,
+        ).all()
+        return {row[0]: row[1] for row in result}
+
+    return get_cached_counts(CATALOG_COMPOSITIONS, search_keyword, compute_counts)
+
+
+def get_all_compositions(
+    search_keyword="", limit=10, offset=0, after=None, estimate_counts=False
+):
     """
     Retrieve compositions from the database, grouped by status, with optional search functionality.
 
+    Each status is paginated on its own using the (status, id) index. Pass the 'next_after' id
+    of a status back in 'after' to fetch its next page (keyset pagination); 'offset' is only
+    used for statuses without a cursor.
+
     Args:
         search_keyword (str): Keyword to search in 'compositions' and 'content_code' (case-insensitive).
-        limit (int): Maximum number of records to return (default: 10).
-        offset (int): Number of records to skip before starting to return results (default: 0).
+        limit (int): Maximum number of records to return per status (default: 10).
+        offset (int): Number of records to skip for statuses without a cursor (default: 0).
+        after (dict): Last seen composition id keyed by status (default: None).
+        estimate_counts (bool): Return planner estimates instead of exact counts (default: False).
 
     Returns:
-        dict: Compositions grouped by status, with each status containing a list of compositions and their count.
+        dict: Compositions grouped by status, with each status containing a list of compositions,
+              their count and the cursor for the next page.
               Example: {
-                  "approved": {"compositions": [...], "count": 5},
-                  "pending": {"compositions": [...], "count": 2}
+                  1: {"compositions": [...], "count": 5, "next_after": 42},
+                  0: {"compositions": [...], "count": 2, "next_after": None}
               }
 
     Raises:
         Exception: Logs errors and returns None if an error occurs during query execution.
     """
     try:
+        after = after or {}
+        statuses = [STATUS_APPROVED, STATUS_PENDING]
+        after_ids = [int(after.get(status) or 0) for status in statuses]
+        offsets = [0 if after.get(status) else offset for status in statuses]
+
         query = text(
-            """
-            WITH filtered_compositions AS (
+            f"""
+            SELECT 
+                s.status,
+                c.id,
+                c.compositions,
+                c.compositions_striped,
+                c.content_code
+            FROM 
+                unnest(CAST(:statuses AS int[]), CAST(:after_ids AS int[]), CAST(:offsets AS int[]))
+                    AS s(status, after_id, row_offset)
+            CROSS JOIN LATERAL (
                 SELECT 
                     id,
-                    status,
                     compositions,
                     compositions_striped,
-                    content_code,
-                    ROW_NUMBER() OVER (PARTITION BY status ORDER BY id) AS row_num
+                    content_code
                 FROM 
                     compositions
                 WHERE
-                    compositions ILIKE :search_keyword OR content_code ILIKE :search_keyword
-            ),
-            paginated_compositions AS (
-                SELECT 
-                    status,
-                    json_agg(
-                        json_build_object(
-                            'id', id,
-                            'compositions', compositions,
-                            'compositions_striped', compositions_striped,
-                            'content_code', content_code
-                        )
-                    ) AS compositions
-                FROM 
-                    filtered_compositions
-                WHERE 
-                    row_num > :offset AND row_num <= :limit + :offset
-                GROUP BY 
-                    status
-            ),
-            total_counts AS (
-                SELECT 
-                    status,
-                    COUNT(*) AS count
-                FROM 
-                    filtered_compositions
-                GROUP BY 
-                    status
-            )
-            SELECT 
-                p.status,
-                json_build_object(
-                    'compositions', COALESCE(p.compositions, '[]'::json),
-                    'count', COALESCE(t.count, 0)
-                ) AS result
-            FROM 
-                paginated_compositions p
-            LEFT JOIN 
-                total_counts t
-            ON 
-                p.status = t.status
+                    status = s.status
+                    AND id > s.after_id
+                    AND {COMPOSITION_SEARCH_FILTER}
+                ORDER BY 
+                    id
+                LIMIT :limit OFFSET s.row_offset
+            ) c
             ORDER BY 
-                p.status;
+                s.status, c.id;
             """
-        ).params(search_keyword=f"%{search_keyword}%", limit=limit, offset=offset)
+        ).params(
+            search_keyword=f"%{search_keyword}%",
+            statuses=statuses,
+            after_ids=after_ids,
+            offsets=offsets,
+            limit=limit,
+        )
 
         # Execute the query and get the results
         result = db.session.execute(query).all()
 
+        counts = count_compositions_by_status(search_keyword, estimate=estimate_counts)
+
         # Construct the dictionary based on the fetched results
-        compositions_by_status = {row[0]: row[1] for row in result}
+        compositions_by_status = {
+            status: {"compositions": [], "count": counts.get(status, 0), "next_after": None}
+            for status in statuses
+        }
+        for status, composition_id, compositions, compositions_striped, content_code in result:
+            compositions_by_status[status]["compositions"].append(
+                {
+                    "id": composition_id,
+                    "compositions": compositions,
+                    "compositions_striped": compositions_striped,
+                    "content_code": content_code,
+                }
+            )
+        for page in compositions_by_status.values():
+            if len(page["compositions"]) == limit:
+                page["next_after"] = page["compositions"][-1]["id"]
 
         return compositions_by_status
     except SQLAlchemyError as e:
@@ -243,24 +312,36 @@ def preprocess_dataframe(df):
         raise
 
 
-def fetch_similar_compositions(striped_composition):
+def fetch_similar_compositions(striped_composition, dosage_form=None, limit=SIMILAR_ITEMS_LIMIT):
     """
-    Fetch similar compositions from the database.
+    Fetch similar compositions, from the in-memory catalog when it is loaded, else from the database.
 
     Args:
         striped_composition (str): The stripped composition string from the dataframe.
+        dosage_form (str, optional): Only search compositions of this normalized dosage form.
+        limit (int): Number of compositions to fetch. Defaults to SIMILAR_ITEMS_LIMIT.
 
     Returns:
-        List: A list of similar compositions from the database.
+        List: A list of similar compositions.
     """
+    match_catalog = get_match_catalog(CATALOG_COMPOSITIONS)
+    if match_catalog is not None:
+        return match_catalog.similar(striped_composition, limit=limit, partition=dosage_form)
+
     try:
+        query = db.session.query(Compositions).filter(Compositions.status == STATUS_APPROVED)
+        if dosage_form:
+            query = query.filter(
+                func.regexp_replace(
+                    func.lower(func.trim(Compositions.dosage_form)), r"\s+", " ", "g"
+                )
+                == dosage_form
+            )
         query = (
-            db.session.query(Compositions)
-            .filter(Compositions.status == STATUS_APPROVED)
-            .order_by(
+            query.order_by(
                 func.levenshtein(Compositions.compositions_striped, striped_composition)
             )
-            .limit(20)
+            .limit(limit)
         )
         return query.all()
     except SQLAlchemyError as e:
@@ -281,6 +362,8 @@ def calculate_similarity(striped_composition, db_composition_striped):
     Returns:
         int: Similarity score.
     """
+    from fuzzywuzzy import fuzz  # Imported on first use to keep it off the startup path
+
     return fuzz.token_sort_ratio(striped_composition, db_composition_striped)
 
 
@@ -288,6 +371,9 @@ def find_best_match(similar_items, striped_composition):
     """
     Find the best match from a list of similar items.
 
+    Scoring stops at the first candidate with a perfect score that passes is_match, since no
+    other candidate can beat it.
+
     Args:
         similar_items (List): List of similar compositions from the database.
         striped_composition (str): The stripped composition string from the dataframe.
@@ -310,10 +396,61 @@ def find_best_match(similar_items, striped_composition):
             striped_composition, res.compositions_striped
         ):
             best_match = res
+            if similarity == 100:
+                break
 
     return best_match, max_similarity
 
 
+def fetch_price_caps_by_composition(composition_ids):
+    """
+    Fetch the price caps of many compositions with a single query.
+
+    Args:
+        composition_ids (iterable): IDs of the compositions.
+
+    Returns:
+        List: (composition_id, price_cap, dosage_form, packing_unit) tuples in ID order.
+    """
+    composition_ids = list(set(composition_ids))
+    if not composition_ids:
+        return []
+
+    return (
+        db.session.query(
+            PriceCapCompositions.composition_id,
+            PriceCapCompositions.price_cap,
+            PriceCapCompositions.dosage_form,
+            PriceCapCompositions.packing_unit,
+        )
+        .filter(PriceCapCompositions.composition_id.in_(composition_ids))
+        .order_by(PriceCapCompositions.id)
+        .all()
+    )
+
+
+def compare_composition_prices(pairs):
+    """
+    Compare many compositions with their price caps: one query for the price caps, then one
+    vectorized comparison on the dosage form and packing unit.
+
+    Args:
+        pairs (List): Tuples of (composition_id, composition dict).
+
+    Returns:
+        List: Price comparison results in the order of the pairs.
+    """
+    return compare_prices(
+        [composition_id for composition_id, _ in pairs],
+        [composition["df_unit_rate_to_hll_excl_of_tax"] for _, composition in pairs],
+        {
+            "dosage_form": [composition["df_dosage_form"] for _, composition in pairs],
+            "packing_unit": [composition["df_packing_unit"] for _, composition in pairs],
+        },
+        fetch_price_caps_by_composition(composition_id for composition_id, _ in pairs),
+    )
+
+
 def match_price_cap_composition(composition_id, composition):
     """
     Match the composition with the price cap data and calculate price difference.
@@ -321,53 +458,12 @@ def match_price_cap_composition(composition_id, composition):
     Args:
         composition_id (int): The ID of the composition to match.
         composition (dict): The composition details from the dataframe.
-        striped_composition (str): The stripped composition string from the dataframe.
 
     Returns:
         dict: Price comparison result.
     """
     try:
-
-        price_cap_query = db.session.query(PriceCapCompositions).filter(
-            PriceCapCompositions.composition_id == composition_id
-        )
-
-        price_cap_results = price_cap_query.all()
-
-        if price_cap_results:
-            best_match = None
-            for price_cap_result in price_cap_results:
-                df_dosage_form = composition["df_dosage_form"].lower().strip()
-                df_packing_unit = composition["df_packing_unit"].lower().strip()
-
-                if (
-                    df_dosage_form == price_cap_result.dosage_form.lower().strip()
-                    and df_packing_unit == price_cap_result.packing_unit.lower().strip()
-                ):
-                    best_match = price_cap_result
-                    break  # Break on the first successful match
-
-            if best_match:
-                original_price = float(best_match.price_cap)
-                price_diff = float(
-                    original_price
-                    - float(composition["df_unit_rate_to_hll_excl_of_tax"])
-                )
-                status = "Below" if price_diff > 0 else "Above"
-
-                return {
-                    "price": original_price,
-                    "price_diff": price_diff,
-                    "status": status,
-                }
-            else:
-                return {
-                    "price": None,
-                    "price_diff": None,
-                    "status": "No Match on Dosage or Packing Unit",
-                }
-        else:
-            return {"price": None, "price_diff": None, "status": "No Price Found"}
+        return compare_composition_prices([(composition_id, composition)])[0]
     except SQLAlchemyError as e:
         critical_logger.critical(f"Critical database error: {e}", exc_info=True)
     except Exception as e:
@@ -375,19 +471,46 @@ def match_price_cap_composition(composition_id, composition):
         return {
             "price": None,
             "price_diff": None,
-            "status": "Error while fetching price",
+            "status": PRICE_STATUS_ERROR,
         }
 
 
-def match_single_composition(row):
+def match_price_cap_compositions_bulk(pairs):
+    """
+    Match many compositions with their price caps, resolving all price caps with one query.
+
+    Args:
+        pairs (List): Tuples of (composition_id, composition dict).
+
+    Returns:
+        List: Price comparison results in the order of the pairs, or None on a database error.
+    """
+    try:
+        return compare_composition_prices(pairs)
+    except SQLAlchemyError as e:
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
+
+
+def match_single_composition(
+    row,
+    dosage_form_blocking=False,
+    candidate_limit=SIMILAR_ITEMS_LIMIT,
+    match_threshold=MATCH_THRESHOLD_DEFAULT,
+):
     """
     Match a single composition from the dataframe with the database.
 
     Args:
         row (pd.Series): A row from the dataframe.
+        dosage_form_blocking (bool): Search the compositions of the row's dosage form first and
+            only fall back to the whole catalog when none of them matches.
+        candidate_limit (int): Number of catalog candidates scored (and listed when unmatched).
+        match_threshold (int): Similarity score a candidate needs to match.
 
     Returns:
-        Tuple: Matched composition data and list of unmatched compositions.
+        Tuple: Matched composition data and list of unmatched compositions. The matched
+        composition is priced afterwards, for the whole file at once, by match_compositions.
     """
     composition = {
         "df_sl_no": row["sl_no"],
@@ -406,14 +529,22 @@ def match_single_composition(row):
     }
 
     striped_composition = composition["df_compositions"].replace(" ", "")
-    similar_items = fetch_similar_compositions(striped_composition)
-    best_match, max_similarity = find_best_match(similar_items, striped_composition)
-    if best_match and max_similarity > 98:
-        composition["df_compositions"] = best_match.compositions
-        composition_id = best_match.id
-        composition["price_comparison"] = match_price_cap_composition(
-            composition_id, composition
+    dosage_form = ""
+    if dosage_form_blocking:
+        # Normalized once for the whole file by validate_bid_file
+        dosage_form = row.get("dosage_form_normalized") or normalize_dosage_form(
+            composition["df_dosage_form"]
         )
+    if dosage_form:
+        similar_items = fetch_similar_compositions(striped_composition, dosage_form, candidate_limit)
+        best_match, max_similarity = find_best_match(similar_items, striped_composition)
+    if not dosage_form or not (best_match and max_similarity >= match_threshold):
+        similar_items = fetch_similar_compositions(striped_composition, limit=candidate_limit)
+        best_match, max_similarity = find_best_match(similar_items, striped_composition)
+
+    if best_match and max_similarity >= match_threshold:
+        composition["df_compositions"] = best_match.compositions
+        composition["db_composition_id"] = best_match.id
         composition_implant_match_logger.info(
             f"User-entered composition: {composition['df_compositions']}, Matched composition: {best_match.compositions}, Match score: {max_similarity}"
         )
@@ -441,12 +572,46 @@ def match_single_composition(row):
         }
 
 
-def match_compositions(df):
+def prefetch_similar_item_prices(unmatched_compositions, top_k):
+    """
+    Embed the price comparison of the top-k similar items of every unmatched composition,
+    resolving the price caps of the whole file with one query.
+
+    Args:
+        unmatched_compositions (List): Unmatched results from match_single_composition.
+        top_k (int): Number of similar items (by similarity score) to price per row.
+    """
+    similar_items = [
+        (similar_item, unmatched["user_composition"])
+        for unmatched in unmatched_compositions
+        for similar_item in unmatched["similar_items"][:top_k]
+    ]
+    price_comparisons = compare_composition_prices(
+        [(similar_item["db_composition_id"], composition) for similar_item, composition in similar_items]
+    )
+    for (similar_item, _), price_comparison in zip(similar_items, price_comparisons):
+        similar_item["price_comparison"] = price_comparison
+
+
+def match_compositions(
+    df, prefetch_top_k=0, stored_results=None, candidate_limit=None, match_threshold=None
+):
     """
     Checks the compositions in the dataframe and matches them with the DB.
 
     Args:
         df (pd.DataFrame): Data from the Excel sheet.
+        prefetch_top_k (int): Embed price comparisons for this many similar items of every
+            unmatched composition (default: 0, disabled).
+        stored_results (dict, optional): Stored (matched, unmatched) results keyed by input hash
+            (match_run_service.load_reusable_rows). Rows of the dataframe whose 'input_hash' has
+            one reuse it instead of being matched again; every matched row is priced again.
+            Every returned row carries its 'input_hash', which the caller removes before
+            storing or returning the rows.
+        candidate_limit (int, optional): Catalog candidates scored per row. Defaults to
+            MATCH_CANDIDATE_LIMIT.
+        match_threshold (int, optional): Similarity score a candidate needs to match. Defaults
+            to MATCH_THRESHOLD.
 
     Returns:
         dict: API response containing matched and unmatched compositions with separate indexes.
@@ -458,6 +623,10 @@ def match_compositions(df):
 
     # ::: REMOVE LATER when CRUD implemented for the tables
     preprocess_compositions_in_db("Compositions")
+    ensure_fresh_match_catalog(CATALOG_COMPOSITIONS)
+    dosage_form_blocking = get_dosage_form_blocking()
+    candidate_limit = candidate_limit or get_match_candidate_limit()
+    match_threshold = match_threshold or get_match_threshold()
 
     matched_compositions = []
     unmatched_compositions = []
@@ -468,7 +637,15 @@ def match_compositions(df):
 
     # Iterate through the dataframe and match each composition
     for _, row in df.iterrows():
-        matched, unmatched = match_single_composition(row)
+        input_hash = row.get("input_hash")
+        if stored_results and input_hash in stored_results:
+            matched, unmatched = copy.deepcopy(stored_results[input_hash])
+        else:
+            matched, unmatched = match_single_composition(
+                row, dosage_form_blocking, candidate_limit, match_threshold
+            )
+        if input_hash:
+            (matched or unmatched)["input_hash"] = input_hash
         if matched:
             matched["index"] = matched_index 
             matched_compositions.append(matched)
@@ -478,9 +655,38 @@ def match_compositions(df):
             unmatched_compositions.append(unmatched)
             unmatched_index += 1 
 
+    # Price the matched rows of the whole file in one pass
+    price_comparisons = match_price_cap_compositions_bulk(
+        [(matched["db_composition_id"], matched) for matched in matched_compositions]
+    )
+    for matched, price_comparison in zip(
+        matched_compositions, price_comparisons or [None] * len(matched_compositions)
+    ):
+        matched["price_comparison"] = price_comparison
+
+    if prefetch_top_k:
+        try:
+            prefetch_similar_item_prices(unmatched_compositions, prefetch_top_k)
+        except SQLAlchemyError as e:
+            critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+
     return matched_compositions, unmatched_compositions
 
 
+def _schedule_rescore(composition_ids) -> None:
+    """
+    Queue the re-scoring of stored unmatched rows for committed, approved compositions.
+    Best effort: a failure is only logged and never undoes the committed change.
+
+    Args:
+        composition_ids (iterable): IDs of the approved compositions.
+    """
+    try:
+        schedule_rescore(CATALOG_COMPOSITIONS, composition_ids)
+    except Exception as e:
+        server_logger.error(f"Error scheduling the re-scoring of compositions: {e}")
+
+
 def add_composition(
     composition_name: str,
     content_code: str = None,
@@ -507,15 +713,21 @@ def add_composition(
             status=status,
         )
         db.session.add(new_composition)
+        db.session.flush()
+        bump_catalog_version(CATALOG_COMPOSITIONS, [new_composition.id])
         db.session.commit()
-        return new_composition
     except SQLAlchemyError as e:
         critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
     except Exception as e:
         db.session.rollback()
         composition_implant_crud_logger.error(f"Error adding new composition: {e}")
         return None
 
+    if status == STATUS_APPROVED:
+        _schedule_rescore([new_composition.id])
+    return new_composition
+
 
 def get_composition(composition_id: int) -> Compositions:
     """
@@ -557,15 +769,21 @@ def update_composition_fields(composition_id: int, **fields) -> Compositions:
             if value is not None:  # Update only if the field is provided
                 setattr(composition, field, value)
 
+        bump_catalog_version(CATALOG_COMPOSITIONS, [composition.id])
         db.session.commit()
-        return composition
     except SQLAlchemyError as e:
         critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
     except Exception as e:
         db.session.rollback()
         composition_implant_crud_logger.error(f"Error updating composition fields: {e}")
         return None
 
+    # Approving, or editing an approved composition, can make stored unmatched rows match
+    if composition.status == STATUS_APPROVED:
+        _schedule_rescore([composition.id])
+    return composition
+
 
 def update_composition(
     composition_id: int,
@@ -624,28 +842,116 @@ def delete_composition(composition_id: int) -> Compositions:
         return None
 
 
-def update_composition_id_in_price_cap() -> None:
+def bulk_add_compositions(items: list, status: int = STATUS_PENDING) -> list:
     """
-    Update PriceCapCompositions with matching composition_id from Compositions.
-    Only updates entries in PriceCapCompositions where composition_id is NULL.
+    Add many compositions in a single multi-row INSERT and one transaction.
+
+    Args:
+        items (list): Dicts with 'composition_name' (required), 'content_code' and 'dosage_form'.
+        status (int): The status of the new compositions. Defaults to STATUS_PENDING.
+
+    Returns:
+        list: One outcome per item, in request order, or None if the transaction failed.
+              Example: [{"index": 0, "id": 12, "result": "added"},
+                        {"index": 1, "id": None, "result": "error", "error": "..."}]
+    """
+    outcomes = []
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get("composition_name"):
+            outcomes.append(
+                {"index": index, "id": None, "result": "error", "error": "Composition name is required"}
+            )
+            continue
+        outcomes.append({"index": index, "id": None, "result": "added"})
+        rows.append(
+            {
+                "content_code": item.get("content_code"),
+                "compositions": item["composition_name"],
+                "dosage_form": item.get("dosage_form"),
+                "status": status,
+            }
+        )
+
+    if not rows:
+        return outcomes
+
+    try:
+        new_ids = db.session.scalars(
+            insert(Compositions).returning(Compositions.id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        bump_catalog_version(CATALOG_COMPOSITIONS, new_ids)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
+    except Exception as e:
+        db.session.rollback()
+        composition_implant_crud_logger.error(f"Error adding compositions in bulk: {e}")
+        return None
+
+    if status == STATUS_APPROVED:
+        _schedule_rescore(new_ids)
+
+    added = iter(new_ids)
+    for outcome in outcomes:
+        if outcome["result"] == "added":
+            outcome["id"] = next(added)
+    return outcomes
+
+
+def bulk_update_composition_status(composition_ids: list, status: int) -> list:
+    """
+    Set the status of many compositions with a single set-based UPDATE and one transaction.
+
+    Args:
+        composition_ids (list): IDs of the compositions to update.
+        status (int): New status to set for the compositions.
+
+    Returns:
+        list: One outcome per id ("updated" or "not_found"), or None if the transaction failed.
     """
     try:
-        # Update PriceCapCompositions with matching composition_id
-        db.session.query(PriceCapCompositions).filter(
-            PriceCapCompositions.compositions_striped
-            == Compositions.compositions_striped,
-            PriceCapCompositions.composition_id.is_(
-                None
-            ),  # Only update if composition_id is NULL
-        ).update(
-            {PriceCapCompositions.composition_id: Compositions.id},
-            synchronize_session="fetch",  # Synchronize session to reflect changes
+        updated_ids = set(
+            db.session.scalars(
+                update(Compositions)
+                .where(Compositions.id.in_(composition_ids))
+                .values(status=status)
+                .returning(Compositions.id)
+                .execution_options(synchronize_session=False)
+            ).all()
         )
-
+        if updated_ids:
+            bump_catalog_version(CATALOG_COMPOSITIONS, updated_ids)
         db.session.commit()
-        server_logger.info("Successfully updated composition_id in PriceCap.")
     except SQLAlchemyError as e:
+        db.session.rollback()
         critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
     except Exception as e:
         db.session.rollback()
-        server_logger.error(f"Error updating composition_id in PriceCap: {e}")
+        composition_implant_crud_logger.error(f"Error updating composition status in bulk: {e}")
+        return None
+
+    if status == STATUS_APPROVED:
+        _schedule_rescore(updated_ids)
+
+    return [
+        {"id": composition_id, "result": "updated" if composition_id in updated_ids else "not_found"}
+        for composition_id in composition_ids
+    ]
+
+
+def bulk_delete_compositions(composition_ids: list) -> list:
+    """
+    Mark many compositions as deleted by updating their status to rejected.
+
+    Args:
+        composition_ids (list): IDs of the compositions to delete.
+
+    Returns:
+        list: One outcome per id ("updated" or "not_found"), or None if the transaction failed.
+    """
+    return bulk_update_composition_status(composition_ids, STATUS_REJECTED)
@@ -1,12 +1,22 @@
-import pandas as pd
-from fuzzywuzzy import fuzz
 import re
+import copy
 import logging
-from sqlalchemy import func, text
+from sqlalchemy import func, text, insert, update
 from sqlalchemy.exc import SQLAlchemyError
 from ..models import Implants, PriceCapImplants
 from ..db import db
-from ..constants import STATUS_APPROVED, STATUS_PENDING, STATUS_REJECTED
+from ..constants import (
+    STATUS_APPROVED,
+    STATUS_PENDING,
+    STATUS_REJECTED,
+    CATALOG_IMPLANTS,
+    MATCH_THRESHOLD_DEFAULT,
+)
+from ..config import get_match_candidate_limit, get_match_threshold
+from .catalog_service import bump_catalog_version, get_cached_counts, estimate_row_count
+from .match_catalog import get_match_catalog, ensure_fresh_match_catalog, SIMILAR_ITEMS_LIMIT
+from .price_comparison import compare_prices, PRICE_STATUS_ERROR
+from .rescore_service import schedule_rescore
 
 server_logger = logging.getLogger(__name__)
 critical_logger = logging.getLogger("critical")
@@ -19,17 +29,36 @@ parse_composition_logger = logging.getLogger("parse_composition")
 price_cap_logger = logging.getLogger("price_cap")
 composition_implant_crud_logger = logging.getLogger("composition_implant_crud")
 
+def normalize_implant_description(product_description):
+    """
+    Normalize an implant description for retrieval and scoring: lowercase, punctuation
+    stripped and whitespace collapsed. Stored in Implants.product_description_normalized.
+
+    Args:
+        product_description (str): The product description, may be None.
+
+    Returns:
+        str: The normalized description, or None if nothing is left.
+    """
+    if not isinstance(product_description, str):
+        return None
+    normalized = " ".join(re.sub(r"[^\w\s]", "", product_description.lower()).split())
+    return normalized or None
+
+
 def calculate_similarity(product_implant, db_product_description):
     """
     Calculate the similarity between two implants.
 
     Args:
-        product_implant (str): The user entered implant from the dataframe.
-        db_product_description (str): The product description (or implant name) from the database.
+        product_implant (str): The normalized implant from the dataframe.
+        db_product_description (str): The normalized product description from the database.
 
     Returns:
         int: Similarity score.
     """
+    from fuzzywuzzy import fuzz  # Imported on first use to keep it off the startup path
+
     return fuzz.token_sort_ratio(product_implant, db_product_description)
 
 
@@ -37,9 +66,11 @@ def find_best_match(similar_items, product_implant):
     """
     Find the best match from a list of similar items.
 
+    Scoring stops at the first candidate with a perfect score, since no other candidate can beat it.
+
     Args:
         similar_items (List): List of similar implants from the database.
-        product_implant (str): The product description (implant name) from the dataframe.
+        product_implant (str): The normalized product description (implant name) from the dataframe.
 
     Returns:
         Tuple: Best match and maximum similarity score.
@@ -48,7 +79,7 @@ def find_best_match(similar_items, product_implant):
     max_similarity = 0
 
     for res in similar_items:
-        similarity = calculate_similarity(product_implant, res.product_description)
+        similarity = calculate_similarity(product_implant, res.product_description_normalized)
         rough_compositions_implants_logger.info(
             f"Striped User-Input: {product_implant}; DB Implant: {res.product_description} with similarity score: {similarity}"
         )
@@ -56,26 +87,33 @@ def find_best_match(similar_items, product_implant):
         if similarity > max_similarity:
             max_similarity = similarity
             best_match = res
+            if similarity == 100:
+                break
 
     return best_match, max_similarity
 
 
-def fetch_similar_implants(product_implant):
+def fetch_similar_implants(product_implant, limit=SIMILAR_ITEMS_LIMIT):
     """
-    Fetch similar implants from the database.
+    Fetch similar implants, from the in-memory catalog when it is loaded, else from the database.
 
     Args:
-        product_implant (str): The product description to be compared against the Database.
+        product_implant (str): The normalized product description to be compared against the Database.
+        limit (int): Number of implants to fetch. Defaults to SIMILAR_ITEMS_LIMIT.
 
     Returns:
-        List: A list of similar implant products from the database.
+        List: A list of similar implant products.
     """
+    match_catalog = get_match_catalog(CATALOG_IMPLANTS)
+    if match_catalog is not None:
+        return match_catalog.similar(product_implant, limit=limit)
+
     try:
         query = (
             db.session.query(Implants)
             .filter(Implants.status == STATUS_APPROVED)
-            .order_by(func.levenshtein(Implants.product_description, product_implant))
-            .limit(20)
+            .order_by(func.levenshtein(Implants.product_description_normalized, product_implant))
+            .limit(limit)
         )
         return query.all()
     except SQLAlchemyError as e:
@@ -85,6 +123,51 @@ def fetch_similar_implants(product_implant):
         return []
 
 
+def fetch_price_caps_by_implant(implant_ids):
+    """
+    Fetch the price caps of many implants with a single query.
+
+    Args:
+        implant_ids (iterable): IDs of the implants.
+
+    Returns:
+        List: (implant_id, price_cap, variant) tuples in ID order.
+    """
+    implant_ids = list(set(implant_ids))
+    if not implant_ids:
+        return []
+
+    return (
+        db.session.query(
+            PriceCapImplants.implant_id,
+            PriceCapImplants.price_cap,
+            PriceCapImplants.variant,
+        )
+        .filter(PriceCapImplants.implant_id.in_(implant_ids))
+        .order_by(PriceCapImplants.id)
+        .all()
+    )
+
+
+def compare_implant_prices(pairs):
+    """
+    Compare many implants with their price caps: one query for the price caps, then one
+    vectorized comparison on the variant.
+
+    Args:
+        pairs (List): Tuples of (implant_id, implant dict).
+
+    Returns:
+        List: Price comparison results in the order of the pairs.
+    """
+    return compare_prices(
+        [implant_id for implant_id, _ in pairs],
+        [implant["df_unit_rate_to_hll_excl_of_tax"] for _, implant in pairs],
+        {"variant": [implant["df_variant"] for _, implant in pairs]},
+        fetch_price_caps_by_implant(implant_id for implant_id, _ in pairs),
+    )
+
+
 def match_price_cap_implant(implant_id, implant):
     """
     Match the implant with the price cap data and calculate the price difference.
@@ -97,39 +180,7 @@ def match_price_cap_implant(implant_id, implant):
         dict: Price comparison result, including price difference and status.
     """
     try:
-        price_cap_query = db.session.query(PriceCapImplants).filter(
-            PriceCapImplants.implant_id == implant_id
-        )
-        price_cap_results = price_cap_query.all()
-
-        if price_cap_results:
-            best_match = None
-            for price_cap_result in price_cap_results:
-                df_variant = implant["df_variant"].lower().strip()
-
-                if df_variant == price_cap_result.variant.lower().strip():
-                    best_match = price_cap_result
-                    break  # Break on the first successful match
-            if best_match:
-                original_price = float(best_match.price_cap)
-                price_diff = float(
-                    original_price - float(implant["df_unit_rate_to_hll_excl_of_tax"])
-                )
-                status = "Below" if price_diff > 0 else "Above"
-
-                return {
-                    "price": original_price,
-                    "price_diff": price_diff,
-                    "status": status,
-                }
-            else:
-                return {
-                    "price": None,
-                    "price_diff": None,
-                    "status": "No Match on Dosage or Packing Unit",
-                }
-        else:
-            return {"price": None, "price_diff": None, "status": "No Price Found"}
+        return compare_implant_prices([(implant_id, implant)])[0]
     except SQLAlchemyError as e:
         critical_logger.critical(f"Critical database error: {e}", exc_info=True)
     except Exception as e:
@@ -137,19 +188,39 @@ def match_price_cap_implant(implant_id, implant):
         return {
             "price": None,
             "price_diff": None,
-            "status": "Error while fetching price",
+            "status": PRICE_STATUS_ERROR,
         }
 
 
-def match_single_implant(row):
+def match_price_cap_implants_bulk(pairs):
+    """
+    Match many implants with their price caps, resolving all price caps with one query.
+
+    Args:
+        pairs (List): Tuples of (implant_id, implant dict).
+
+    Returns:
+        List: Price comparison results in the order of the pairs, or None on a database error.
+    """
+    try:
+        return compare_implant_prices(pairs)
+    except SQLAlchemyError as e:
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
+
+
+def match_single_implant(row, candidate_limit=SIMILAR_ITEMS_LIMIT, match_threshold=MATCH_THRESHOLD_DEFAULT):
     """
     Match a single implant from the dataframe with the database.
 
     Args:
         row (pd.Series): A row from the dataframe containing implant details.
+        candidate_limit (int): Number of catalog candidates scored (and listed when unmatched).
+        match_threshold (int): Similarity score a candidate needs to match.
 
     Returns:
         Tuple: A dictionary of matched implant data and a dictionary of unmatched compositions with similar items and their similarity scores.
+        The matched implant is priced afterwards, for the whole file at once, by match_implants.
     """
     implant = {
         "df_sl_no": row["sl_no"],
@@ -167,16 +238,15 @@ def match_single_implant(row):
         "df_margin_percent_incl_of_tax": row["margin"],
     }
 
-    product_implant = implant["df_product_description_with_specification"].lower()
-    similar_items = fetch_similar_implants(product_implant)
+    product_implant = normalize_implant_description(implant["df_product_description_with_specification"]) or ""
+    similar_items = fetch_similar_implants(product_implant, candidate_limit)
     best_match, max_similarity = find_best_match(similar_items, product_implant)
 
-    if best_match and max_similarity > 98:
+    if best_match and max_similarity >= match_threshold:
         implant["df_product_description_with_specification"] = (
             best_match.product_description
         )
-        implant_id = best_match.id
-        implant["price_comparison"] = match_price_cap_implant(implant_id, implant)
+        implant["db_implant_id"] = best_match.id
         composition_implant_match_logger.info(
             f"User-entered Implant: {implant['df_product_description_with_specification']}, Matched Implant: {best_match.product_description}, Match score: {max_similarity}"
         )
@@ -189,7 +259,7 @@ def match_single_implant(row):
                     "db_implant_id": res.id,
                     "db_implant": res.product_description,
                     "similarity_score": calculate_similarity(
-                        product_implant, res.product_description
+                        product_implant, res.product_description_normalized
                     ),
                 }
                 for res in similar_items
@@ -203,17 +273,55 @@ def match_single_implant(row):
         }
 
 
-def match_implants(df):
+def prefetch_similar_item_prices(unmatched_implants, top_k):
+    """
+    Embed the price comparison of the top-k similar items of every unmatched implant,
+    resolving the price caps of the whole file with one query.
+
+    Args:
+        unmatched_implants (List): Unmatched results from match_single_implant.
+        top_k (int): Number of similar items (by similarity score) to price per row.
+    """
+    similar_items = [
+        (similar_item, unmatched["user_implant"])
+        for unmatched in unmatched_implants
+        for similar_item in unmatched["similar_items"][:top_k]
+    ]
+    price_comparisons = compare_implant_prices(
+        [(similar_item["db_implant_id"], implant) for similar_item, implant in similar_items]
+    )
+    for (similar_item, _), price_comparison in zip(similar_items, price_comparisons):
+        similar_item["price_comparison"] = price_comparison
+
+
+def match_implants(
+    df, prefetch_top_k=0, stored_results=None, candidate_limit=None, match_threshold=None
+):
     """
     Checks the implants in the dataframe and checks if they match with the DB.
 
     Args:
         df (pd.DataFrame): Data from the Excel sheet.
+        prefetch_top_k (int): Embed price comparisons for this many similar items of every
+            unmatched implant (default: 0, disabled).
+        stored_results (dict, optional): Stored (matched, unmatched) results keyed by input hash
+            (match_run_service.load_reusable_rows). Rows of the dataframe whose 'input_hash' has
+            one reuse it instead of being matched again; every matched row is priced again.
+            Every returned row carries its 'input_hash', which the caller removes before
+            storing or returning the rows.
+        candidate_limit (int, optional): Catalog candidates scored per row. Defaults to
+            MATCH_CANDIDATE_LIMIT.
+        match_threshold (int, optional): Similarity score a candidate needs to match. Defaults
+            to MATCH_THRESHOLD.
 
     Returns:
         dict: API response containing matched and unmatched implants.
     """
 
+    ensure_fresh_match_catalog(CATALOG_IMPLANTS)
+    candidate_limit = candidate_limit or get_match_candidate_limit()
+    match_threshold = match_threshold or get_match_threshold()
+
     matched_implants = []
     unmatched_implants = []
 
@@ -223,7 +331,13 @@ def match_implants(df):
 
     # Iterate through the dataframe and match each implant
     for _, row in df.iterrows():
-        matched, unmatched = match_single_implant(row)
+        input_hash = row.get("input_hash")
+        if stored_results and input_hash in stored_results:
+            matched, unmatched = copy.deepcopy(stored_results[input_hash])
+        else:
+            matched, unmatched = match_single_implant(row, candidate_limit, match_threshold)
+        if input_hash:
+            (matched or unmatched)["input_hash"] = input_hash
         if matched:
             matched["index"] = matched_index  # Assign unique matched index
             matched_implants.append(matched)
@@ -233,85 +347,151 @@ def match_implants(df):
             unmatched_implants.append(unmatched)
             unmatched_index += 1  # Increment unmatched index
 
+    # Price the matched rows of the whole file in one pass
+    price_comparisons = match_price_cap_implants_bulk(
+        [(matched["db_implant_id"], matched) for matched in matched_implants]
+    )
+    for matched, price_comparison in zip(
+        matched_implants, price_comparisons or [None] * len(matched_implants)
+    ):
+        matched["price_comparison"] = price_comparison
+
+    if prefetch_top_k:
+        try:
+            prefetch_similar_item_prices(unmatched_implants, prefetch_top_k)
+        except SQLAlchemyError as e:
+            critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+
     return matched_implants, unmatched_implants
 
 
-def get_all_implants(search_keyword="", limit=10, offset=0):
+IMPLANT_SEARCH_FILTER = "(product_description ILIKE :search_keyword OR item_code ILIKE :search_keyword)"
+
+
+def count_implants_by_status(search_keyword="", estimate=False):
+    """
+    Count the implants matching a search keyword, per status.
+
+    Exact counts are cached per (keyword, catalog version), so they are only recomputed
+    after the implants table has been written to.
+
+    Args:
+        search_keyword (str): Keyword to search in product_description and item_code.
+        estimate (bool): Use the planner's row estimate instead of an exact COUNT(*).
+
+    Returns:
+        dict: Counts keyed by status.
+    """
+    params = {"search_keyword": f"%{search_keyword}%"}
+
+    if estimate:
+        return {
+            status: estimate_row_count(
+                f"SELECT id FROM implants WHERE status = {int(status)} AND {IMPLANT_SEARCH_FILTER}",
+                params,
+            )
+            for status in (STATUS_APPROVED, STATUS_PENDING)
+        }
+
+    def compute_counts():
+        result = db.session.execute(
+            text(
+                f"""
+                SELECT status, COUNT(*) FROM implants
+                WHERE {IMPLANT_SEARCH_FILTER}
+                GROUP BY status
+                """
+            ),
+            params,
+        ).all()
+        return {row[0]: row[1] for row in result}
+
+    return get_cached_counts(CATALOG_IMPLANTS, search_keyword, compute_counts)
+
+
+def get_all_implants(
+    search_keyword="", limit=10, offset=0, after=None, estimate_counts=False
+):
     """
-    Executes a raw SQL query to get all implants with their status,
-    aggregated and grouped by status, including search functionality.
+    Get the implants grouped by status, including search functionality.
+
+    Each status is paginated on its own using the (status, id) index. Pass the 'next_after' id
+    of a status back in 'after' to fetch its next page (keyset pagination); 'offset' is only
+    used for statuses without a cursor.
 
     Args:
         search_keyword (str): Keyword to search in product_description and item_code.
         limit (int): The number of records to return per page.
-        offset (int): The number of records to skip before starting to return results.
+        offset (int): The number of records to skip for statuses without a cursor.
+        after (dict): Last seen implant id keyed by status.
+        estimate_counts (bool): Return planner estimates instead of exact counts.
 
     Returns:
-        dict: A dictionary containing the implants grouped by status.
+        dict: A dictionary containing the implants, their count and the next page cursor grouped by status.
     """
     try:
+        after = after or {}
+        statuses = [STATUS_APPROVED, STATUS_PENDING]
+        after_ids = [int(after.get(status) or 0) for status in statuses]
+        offsets = [0 if after.get(status) else offset for status in statuses]
+
         query = text(
-            """
-            WITH filtered_implants AS (
+            f"""
+            SELECT 
+                s.status,
+                i.id,
+                i.product_description,
+                i.item_code
+            FROM 
+                unnest(CAST(:statuses AS int[]), CAST(:after_ids AS int[]), CAST(:offsets AS int[]))
+                    AS s(status, after_id, row_offset)
+            CROSS JOIN LATERAL (
                 SELECT 
                     id,
-                    item_code,
                     product_description,
-                    status,
-                    ROW_NUMBER() OVER (PARTITION BY status ORDER BY id) AS row_num
+                    item_code
                 FROM 
                     implants
                 WHERE
-                    product_description ILIKE :search_keyword OR item_code ILIKE :search_keyword
-            ),
-            paginated_implants AS (
-                SELECT 
-                    status,
-                    json_agg(
-                        json_build_object(
-                            'id', id,
-                            'product_description', product_description,
-                            'item_code', item_code
-                        )
-                    ) AS implants_data
-                FROM 
-                    filtered_implants
-                WHERE 
-                    row_num > :offset AND row_num <= :limit + :offset
-                GROUP BY 
-                    status
-            ),
-            total_counts AS (
-                SELECT 
-                    status,
-                    COUNT(*) AS count
-                FROM 
-                    filtered_implants
-                GROUP BY 
-                    status
-            )
-            SELECT 
-                p.status,
-                json_build_object(
-                    'implants', COALESCE(p.implants_data, '[]'::json),
-                    'count', COALESCE(t.count, 0)
-                ) AS result
-            FROM 
-                paginated_implants p
-            LEFT JOIN 
-                total_counts t
-            ON 
-                p.status = t.status
+                    status = s.status
+                    AND id > s.after_id
+                    AND {IMPLANT_SEARCH_FILTER}
+                ORDER BY 
+                    id
+                LIMIT :limit OFFSET s.row_offset
+            ) i
             ORDER BY 
-                p.status;
+                s.status, i.id;
             """
-        ).params(search_keyword=f"%{search_keyword}%", limit=limit, offset=offset)
+        ).params(
+            search_keyword=f"%{search_keyword}%",
+            statuses=statuses,
+            after_ids=after_ids,
+            offsets=offsets,
+            limit=limit,
+        )
 
         # Execute the query and get the results
         result = db.session.execute(query).all()
 
+        counts = count_implants_by_status(search_keyword, estimate=estimate_counts)
+
         # Construct the dictionary based on the fetched results
-        implants_by_status = {row[0]: row[1] for row in result}
+        implants_by_status = {
+            status: {"implants": [], "count": counts.get(status, 0), "next_after": None}
+            for status in statuses
+        }
+        for status, implant_id, product_description, item_code in result:
+            implants_by_status[status]["implants"].append(
+                {
+                    "id": implant_id,
+                    "product_description": product_description,
+                    "item_code": item_code,
+                }
+            )
+        for page in implants_by_status.values():
+            if len(page["implants"]) == limit:
+                page["next_after"] = page["implants"][-1]["id"]
 
         return implants_by_status
     except SQLAlchemyError as e:
@@ -324,6 +504,20 @@ def get_all_implants(search_keyword="", limit=10, offset=0):
         return None
 
 
+def _schedule_rescore(implant_ids) -> None:
+    """
+    Queue the re-scoring of stored unmatched rows for committed, approved implants.
+    Best effort: a failure is only logged and never undoes the committed change.
+
+    Args:
+        implant_ids (iterable): IDs of the approved implants.
+    """
+    try:
+        schedule_rescore(CATALOG_IMPLANTS, implant_ids)
+    except Exception as e:
+        server_logger.error(f"Error scheduling the re-scoring of implants: {e}")
+
+
 def add_implant(product_description, item_code=None, status=STATUS_PENDING):
     """
     Adds a new implant to the database.
@@ -340,18 +534,25 @@ def add_implant(product_description, item_code=None, status=STATUS_PENDING):
         new_implant = Implants(
             item_code=item_code,
             product_description=product_description,
+            product_description_normalized=normalize_implant_description(product_description),
             status=status,
         )
         db.session.add(new_implant)
+        db.session.flush()
+        bump_catalog_version(CATALOG_IMPLANTS, [new_implant.id])
         db.session.commit()
-        return new_implant
     except SQLAlchemyError as e:
         critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
     except Exception as e:
         db.session.rollback()
         composition_implant_crud_logger.error(f"Error adding new Implant: {e}")
         return None
 
+    if status == STATUS_APPROVED:
+        _schedule_rescore([new_implant.id])
+    return new_implant
+
 
 def get_implant(implant_id):
     """
@@ -392,16 +593,26 @@ def update_implant_fields(implant_id: int, **fields: dict) -> Implants | None:
         for field, value in fields.items():
             if value is not None:
                 setattr(implant, field, value)
+        if fields.get("product_description") is not None:
+            implant.product_description_normalized = normalize_implant_description(
+                implant.product_description
+            )
 
+        bump_catalog_version(CATALOG_IMPLANTS, [implant.id])
         db.session.commit()
-        return implant
     except SQLAlchemyError as e:
         critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
     except Exception as e:
         db.session.rollback()
         composition_implant_crud_logger.error(f"Error updating implant fields: {e}")
         return None
 
+    # Approving, or editing an approved implant, can make stored unmatched rows match
+    if implant.status == STATUS_APPROVED:
+        _schedule_rescore([implant.id])
+    return implant
+
 
 def update_implant(
     implant_id: int, item_code: str = None, product_description: str = None
@@ -453,3 +664,118 @@ def delete_implant(implant_id: int) -> Implants | None:
     except Exception as e:
         composition_implant_crud_logger.error(f"Error marking implant as deleted: {e}")
         return None
+
+
+def bulk_add_implants(items: list, status: int = STATUS_PENDING) -> list | None:
+    """
+    Adds many implants in a single multi-row INSERT and one transaction.
+
+    Args:
+        items (list): Dicts with 'product_description' (required) and 'item_code'.
+        status (int, optional): Status of the new implants. Defaults to STATUS_PENDING.
+
+    Returns:
+        list: One outcome per item, in request order, or None if the transaction failed.
+    """
+    outcomes = []
+    rows = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get("product_description"):
+            outcomes.append(
+                {"index": index, "id": None, "result": "error", "error": "Product name (Implant) is required"}
+            )
+            continue
+        outcomes.append({"index": index, "id": None, "result": "added"})
+        rows.append(
+            {
+                "item_code": item.get("item_code"),
+                "product_description": item["product_description"],
+                "product_description_normalized": normalize_implant_description(
+                    item["product_description"]
+                ),
+                "status": status,
+            }
+        )
+
+    if not rows:
+        return outcomes
+
+    try:
+        new_ids = db.session.scalars(
+            insert(Implants).returning(Implants.id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+        bump_catalog_version(CATALOG_IMPLANTS, new_ids)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
+    except Exception as e:
+        db.session.rollback()
+        composition_implant_crud_logger.error(f"Error adding implants in bulk: {e}")
+        return None
+
+    if status == STATUS_APPROVED:
+        _schedule_rescore(new_ids)
+
+    added = iter(new_ids)
+    for outcome in outcomes:
+        if outcome["result"] == "added":
+            outcome["id"] = next(added)
+    return outcomes
+
+
+def bulk_update_implant_status(implant_ids: list, status: int) -> list | None:
+    """
+    Updates the status of many implants with a single set-based UPDATE and one transaction.
+
+    Args:
+        implant_ids (list): IDs of the implants to update.
+        status (int): New status value for the implants.
+
+    Returns:
+        list: One outcome per id ("updated" or "not_found"), or None if the transaction failed.
+    """
+    try:
+        updated_ids = set(
+            db.session.scalars(
+                update(Implants)
+                .where(Implants.id.in_(implant_ids))
+                .values(status=status)
+                .returning(Implants.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+        )
+        if updated_ids:
+            bump_catalog_version(CATALOG_IMPLANTS, updated_ids)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return None
+    except Exception as e:
+        db.session.rollback()
+        composition_implant_crud_logger.error(f"Error updating implant status in bulk: {e}")
+        return None
+
+    if status == STATUS_APPROVED:
+        _schedule_rescore(updated_ids)
+
+    return [
+        {"id": implant_id, "result": "updated" if implant_id in updated_ids else "not_found"}
+        for implant_id in implant_ids
+    ]
+
+
+def bulk_delete_implants(implant_ids: list) -> list | None:
+    """
+    Mark many implants as deleted by updating their status to STATUS_REJECTED.
+
+    Args:
+        implant_ids (list): IDs of the implants to delete.
+
+    Returns:
+        list: One outcome per id ("updated" or "not_found"), or None if the transaction failed.
+    """
+    return bulk_update_implant_status(implant_ids, STATUS_REJECTED)
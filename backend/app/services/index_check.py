@@ -0,0 +1,69 @@
+import json
+from sqlalchemy import text
+from ..db import db
+from ..constants import STATUS_APPROVED
+
+# The hot queries of matching and price cap comparison, each with the index it should use
+INDEX_CHECKS = [
+    (
+        "ix_compositions_approved",
+        "SELECT id FROM compositions WHERE status = :status ORDER BY id",
+        {"status": STATUS_APPROVED},
+    ),
+    (
+        "ix_implants_approved",
+        "SELECT id FROM implants WHERE status = :status ORDER BY id",
+        {"status": STATUS_APPROVED},
+    ),
+    (
+        "ix_compositions_approved_dosage_form",
+        "SELECT id FROM compositions WHERE status = :status "
+        "AND regexp_replace(lower(trim(dosage_form)), '\\s+', ' ', 'g') = :dosage_form",
+        {"status": STATUS_APPROVED, "dosage_form": "tablet"},
+    ),
+    (
+        "ix_price_cap_compositions_composition_id",
+        "SELECT * FROM price_cap_compositions WHERE composition_id IN (:first, :second)",
+        {"first": 1, "second": 2},
+    ),
+    (
+        "ix_price_cap_implants_implant_id",
+        "SELECT * FROM price_cap_implants WHERE implant_id IN (:first, :second)",
+        {"first": 1, "second": 2},
+    ),
+]
+
+
+def _plan_indexes(plan: dict) -> set:
+    """Collect the names of the indexes a JSON plan node and its children scan."""
+    indexes = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        indexes |= _plan_indexes(child)
+    return indexes
+
+
+def check_index_usage(checks=INDEX_CHECKS) -> list:
+    """
+    EXPLAIN each hot query and report whether the planner picks its index.
+
+    Sequential scans are disabled for the check, so that small development tables, which
+    the planner would rather read in full, still show whether the index is usable.
+
+    Args:
+        checks (list): (index name, query, params) tuples.
+
+    Returns:
+        list: One dict per check with 'index', 'used' and the 'indexes' the plan scans.
+    """
+    results = []
+    try:
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+        for index, query, params in checks:
+            plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            indexes = _plan_indexes(plan[0]["Plan"])
+            results.append({"index": index, "used": index in indexes, "indexes": sorted(indexes)})
+    finally:
+        db.session.rollback()
+    return results
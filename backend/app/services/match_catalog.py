@@ -0,0 +1,470 @@
+import bisect
+import copy
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from ..db import db
+from ..constants import (
+    STATUS_APPROVED,
+    CATALOG_COMPOSITIONS,
+    CATALOG_IMPLANTS,
+    MATCH_CANDIDATE_LIMIT_DEFAULT,
+)
+from ..config import get_catalog_snapshot_dir
+from .catalog_service import get_catalog_version
+from .catalog_snapshot import write_catalog_snapshot, SnapshotEntries, CatalogSnapshotError
+
+server_logger = logging.getLogger("app")
+critical_logger = logging.getLogger("critical")
+
+# Default number of candidates returned per lookup, same as the database retrieval
+SIMILAR_ITEMS_LIMIT = MATCH_CANDIDATE_LIMIT_DEFAULT
+
+# Catalog rows expose the attributes the matching code reads from the ORM objects
+CompositionEntry = namedtuple(
+    "CompositionEntry", ["id", "compositions", "compositions_striped", "dosage_form"]
+)
+ImplantEntry = namedtuple(
+    "ImplantEntry", ["id", "product_description", "product_description_normalized"]
+)
+
+# The key is what retrieval compares the input against: the normalized composition
+# (computed like the compositions_striped column) and the normalized implant description.
+CATALOG_QUERIES = {
+    CATALOG_COMPOSITIONS: (
+        CompositionEntry,
+        """
+        SELECT id, compositions, preprocess_composition(compositions) AS compositions_striped, dosage_form
+        FROM compositions
+        WHERE status = :status AND compositions IS NOT NULL
+        """,
+        "compositions_striped",
+    ),
+    CATALOG_IMPLANTS: (
+        ImplantEntry,
+        """
+        SELECT id, product_description, product_description_normalized
+        FROM implants
+        WHERE status = :status AND product_description_normalized IS NOT NULL
+        """,
+        "product_description_normalized",
+    ),
+}
+
+# Seconds a stale /match-file lookup waits for the catalog listener to apply a change that
+# was committed but not yet notified, before reloading the catalog itself
+CATALOG_CATCHUP_TIMEOUT = 2
+
+# Set while the catalog listener of this process is connected and applying notifications
+catalog_listener_connected = threading.Event()
+
+# Field whose normalized value partitions a catalog, so a row is first searched among the
+# entries of its own dosage form
+PARTITION_FIELDS = {CATALOG_COMPOSITIONS: "dosage_form"}
+
+
+def normalize_dosage_form(dosage_form) -> str:
+    """
+    Normalize a dosage form the way the price cap comparison does (trimmed, lowercase),
+    with inner whitespace collapsed.
+
+    Args:
+        dosage_form (str): The dosage form, may be None.
+
+    Returns:
+        str: The normalized dosage form, "" if there is none.
+    """
+    if not isinstance(dosage_form, str):
+        return ""
+    return " ".join(dosage_form.lower().split())
+
+
+class MatchCatalog:
+    """
+    Read-only in-memory copy of the approved rows of a catalog, used to retrieve the
+    candidates of a row without a levenshtein scan of the table.
+
+    Built once in the gunicorn master before forking, so the workers share its pages.
+    The base entries are either a list read from the database or a memory-mapped snapshot,
+    ordered by id. Catalogs with a partition field are also split into one block per
+    normalized value.
+
+    Changes applied afterwards are kept in an overlay (the base entries they replace or
+    remove, and the changed approved entries), so the shared base is never copied.
+    """
+
+    def __init__(self, name, entries, keys, version):
+        self.name = name
+        self.entries = entries
+        self.keys = keys
+        self.version = version
+        self.ids = entries.ids if isinstance(entries, SnapshotEntries) else [entry.id for entry in entries]
+        self.partitions = self._build_partitions(PARTITION_FIELDS.get(name))
+        # Overlay: indices of the base entries changed since, and the changed approved entries
+        self.removed = frozenset()
+        self.added = ()
+        self.added_partitions = {}
+
+    def _build_partitions(self, field):
+        if field is None:
+            return {}
+        if isinstance(self.entries, SnapshotEntries):
+            values = self.entries.field_values(field)
+        else:
+            values = [getattr(entry, field) for entry in self.entries]
+
+        partitions = {}
+        for index, value in enumerate(values):
+            indices, keys = partitions.setdefault(normalize_dosage_form(value), ([], []))
+            indices.append(index)
+            keys.append(self.keys[index])
+        partitions.pop("", None)  # Entries without a value are only found by the full search
+        return partitions
+
+    def _build_added_partitions(self, field):
+        if field is None:
+            return {}
+        partitions = {}
+        for entry, key in self.added:
+            partitions.setdefault(normalize_dosage_form(getattr(entry, field)), []).append((entry, key))
+        partitions.pop("", None)
+        return partitions
+
+    def _base_index(self, entry_id):
+        """Index of an id among the base entries (ordered by id), None if it is not one of them."""
+        index = bisect.bisect_left(self.ids, entry_id)
+        if index < len(self.ids) and self.ids[index] == entry_id:
+            return index
+        return None
+
+    def __len__(self):
+        return len(self.entries) - len(self.removed) + len(self.added)
+
+    def similar(self, query, limit=SIMILAR_ITEMS_LIMIT, partition=None):
+        """
+        Find the entries whose key has the smallest Levenshtein distance to the query.
+
+        Args:
+            query (str): The normalized input (stripped composition or implant description).
+            limit (int): Maximum number of entries to return.
+            partition (str, optional): Only search the entries of this normalized partition value.
+
+        Returns:
+            List: Entries ordered by increasing distance, empty if the partition has no entries.
+        """
+        from rapidfuzz import process
+        from rapidfuzz.distance import Levenshtein
+
+        if partition is None:
+            indices, keys, added = None, self.keys, self.added
+        else:
+            indices, keys = self.partitions.get(partition, ((), ()))
+            added = self.added_partitions.get(partition, ())
+
+        # Ask for as many more base entries as the overlay may have removed
+        candidates = []
+        for _, distance, index in process.extract(
+            query, keys, scorer=Levenshtein.distance, limit=limit + len(self.removed)
+        ):
+            base_index = index if indices is None else indices[index]
+            if base_index not in self.removed:
+                candidates.append((distance, 0, base_index))
+        if added:
+            for _, distance, index in process.extract(
+                query, [key for _, key in added], scorer=Levenshtein.distance, limit=limit
+            ):
+                candidates.append((distance, 1, index))
+
+        # Stable on ties: base entries first, in the order rapidfuzz returned them
+        candidates.sort(key=lambda candidate: candidate[:2])
+        return [
+            self.entries[index] if source == 0 else added[index][0]
+            for _, source, index in candidates[:limit]
+        ]
+
+    def with_changes(self, changed_ids, entries, keys, version):
+        """
+        Build the next version of the catalog from the rows changed since this one.
+
+        The catalog itself is never modified, so lookups running in other threads keep a
+        consistent view; the new catalog replaces it once complete. It shares the base
+        entries (and their partitions) with this one and only extends the overlay, so a
+        change costs the size of the change and of the overlay, not of the catalog.
+
+        Args:
+            changed_ids (set): IDs written since this version.
+            entries (list): The approved entries among the changed ids.
+            keys (list): The keys of these entries.
+            version (int): The version the changes lead to.
+
+        Returns:
+            MatchCatalog: The updated catalog.
+        """
+        removed = set(self.removed)
+        for entry_id in changed_ids:
+            index = self._base_index(entry_id)
+            if index is not None:
+                removed.add(index)
+
+        updated = copy.copy(self)
+        updated.version = version
+        updated.removed = frozenset(removed)
+        updated.added = tuple(
+            [(entry, key) for entry, key in self.added if entry.id not in changed_ids]
+            + list(zip(entries, keys))
+        )
+        updated.added_partitions = updated._build_added_partitions(PARTITION_FIELDS.get(self.name))
+        return updated
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+# Notified whenever a catalog is installed, for lookups waiting for the listener
+_catalogs_installed = threading.Condition(_catalogs_lock)
+
+
+def _install_match_catalog(match_catalog: MatchCatalog) -> bool:
+    """
+    Make a catalog the one used by this process, unless a newer version is installed already.
+    """
+    with _catalogs_lock:
+        current = _catalogs.get(match_catalog.name)
+        if current is not None and current.version > match_catalog.version:
+            return False
+        _catalogs[match_catalog.name] = match_catalog
+        _catalogs_installed.notify_all()
+        return True
+
+
+def _read_entries(catalog: str, ids=None) -> tuple:
+    """
+    Read the approved entries of a catalog, or of the given ids only, with their keys.
+    """
+    entry_type, query, key_field = CATALOG_QUERIES[catalog]
+    params = {"status": STATUS_APPROVED}
+    if ids is None:
+        query += " ORDER BY id"
+    else:
+        query += " AND id = ANY(:ids) ORDER BY id"
+        params["ids"] = list(ids)
+    rows = db.session.execute(text(query), params).all()
+
+    entries = []
+    keys = []
+    for row in rows:
+        entry = entry_type(*row)
+        key = getattr(entry, key_field)
+        if key is None:
+            continue
+        entries.append(entry)
+        keys.append(key)
+    return entries, keys
+
+
+def build_match_catalog(catalog: str) -> MatchCatalog:
+    """
+    Read the approved rows of a catalog into a MatchCatalog. Requires an app context.
+
+    Args:
+        catalog (str): CATALOG_COMPOSITIONS or CATALOG_IMPLANTS.
+
+    Returns:
+        MatchCatalog: The catalog, stamped with the version it was read at.
+    """
+    # Read the version first: a write racing the load leaves the catalog marked stale
+    version = get_catalog_version(catalog)
+    entries, keys = _read_entries(catalog)
+    db.session.commit()
+    return MatchCatalog(catalog, entries, keys, version)
+
+
+def get_catalog_snapshot_path(catalog: str) -> str:
+    return os.path.join(get_catalog_snapshot_dir(), f"{catalog}.bin")
+
+
+def write_match_catalog_snapshot(catalog: str) -> MatchCatalog:
+    """
+    Read a catalog from the database and write it to its snapshot file. Requires an app context.
+
+    Args:
+        catalog (str): CATALOG_COMPOSITIONS or CATALOG_IMPLANTS.
+
+    Returns:
+        MatchCatalog: The catalog that was written.
+    """
+    match_catalog = build_match_catalog(catalog)
+    write_catalog_snapshot(
+        get_catalog_snapshot_path(catalog),
+        catalog,
+        match_catalog.version,
+        CATALOG_QUERIES[catalog][0],
+        match_catalog.entries,
+    )
+    return match_catalog
+
+
+def open_match_catalog_snapshot(catalog: str) -> MatchCatalog | None:
+    """
+    Open the snapshot of a catalog if it is as recent as the database. Requires an app context.
+
+    Args:
+        catalog (str): CATALOG_COMPOSITIONS or CATALOG_IMPLANTS.
+
+    Returns:
+        MatchCatalog: The memory-mapped catalog, or None if there is no usable snapshot.
+    """
+    entry_type, _, key_field = CATALOG_QUERIES[catalog]
+    path = get_catalog_snapshot_path(catalog)
+    try:
+        entries = SnapshotEntries(path, entry_type)
+    except FileNotFoundError:
+        return None
+    except (OSError, CatalogSnapshotError) as e:
+        server_logger.error(f"Ignoring catalog snapshot {path}: {e}")
+        return None
+
+    version = get_catalog_version(catalog)
+    if entries.catalog != catalog or entries.version != version:
+        server_logger.info(
+            f"Catalog snapshot {path} is at version {entries.version}, database at {version}; "
+            f"run `flask snapshot-catalogs` to refresh it"
+        )
+        return None
+    return MatchCatalog(catalog, entries, entries.field_values(key_field), entries.version)
+
+
+def load_match_catalogs(catalogs=(CATALOG_COMPOSITIONS, CATALOG_IMPLANTS)) -> None:
+    """
+    Load the in-memory catalogs of this process, from their snapshot file when it is up to
+    date and from the database otherwise. Requires an app context.
+
+    A catalog that cannot be loaded keeps the version already installed, if any; otherwise it
+    is left out and retrieval falls back to the database.
+
+    Args:
+        catalogs (tuple): The catalogs to load.
+    """
+    for catalog in catalogs:
+        start = time.perf_counter()
+        try:
+            match_catalog = open_match_catalog_snapshot(catalog)
+            if match_catalog is None:
+                match_catalog = build_match_catalog(catalog)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+            continue
+        _install_match_catalog(match_catalog)
+        server_logger.info(
+            f"Loaded {len(match_catalog)} {catalog} (version {match_catalog.version}) "
+            f"from {'snapshot' if isinstance(match_catalog.entries, SnapshotEntries) else 'database'} "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+
+
+def get_match_catalog(catalog: str) -> MatchCatalog | None:
+    """
+    Return the in-memory catalog of this process without checking its version.
+
+    Args:
+        catalog (str): CATALOG_COMPOSITIONS or CATALOG_IMPLANTS.
+
+    Returns:
+        MatchCatalog: The catalog, or None if it is not loaded.
+    """
+    return _catalogs.get(catalog)
+
+
+def ensure_fresh_match_catalog(catalog: str, wait: bool = True) -> MatchCatalog | None:
+    """
+    Make sure the in-memory catalog matches the database before a file is matched against it.
+
+    Costs one version lookup per file. A change committed by another process is normally
+    applied by the catalog listener within moments of its notification, so a stale catalog
+    first waits up to CATALOG_CATCHUP_TIMEOUT for the listener (when it is connected), and
+    is only reloaded in this process if it is still behind. The stale catalog stays
+    installed while it is reloaded, and if the reload fails.
+
+    Args:
+        catalog (str): CATALOG_COMPOSITIONS or CATALOG_IMPLANTS.
+        wait (bool): Wait for the listener first. The listener itself checks without waiting.
+
+    Returns:
+        MatchCatalog: The installed catalog, or None if none is loaded.
+    """
+    match_catalog = _catalogs.get(catalog)
+    if match_catalog is None:
+        return None
+
+    try:
+        version = get_catalog_version(catalog)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return match_catalog
+    if version <= match_catalog.version:
+        return match_catalog
+
+    if wait and catalog_listener_connected.is_set():
+        with _catalogs_installed:
+            _catalogs_installed.wait_for(
+                lambda: _catalogs[catalog].version >= version, timeout=CATALOG_CATCHUP_TIMEOUT
+            )
+        match_catalog = _catalogs[catalog]
+        if match_catalog.version >= version:
+            return match_catalog
+
+    server_logger.info(
+        f"In-memory {catalog} is at version {match_catalog.version}, database at {version}; reloading"
+    )
+    load_match_catalogs((catalog,))
+    return _catalogs.get(catalog)
+
+
+def apply_match_catalog_change(catalog: str, version: int, changed_ids=None) -> None:
+    """
+    Apply a change announced by bump_catalog_version to the in-memory catalog. Requires an app context.
+
+    Only the changed rows are read when the change directly follows the loaded version and
+    its ids are known; after a gap (a missed notification) the catalog is reloaded.
+
+    Args:
+        catalog (str): CATALOG_COMPOSITIONS or CATALOG_IMPLANTS.
+        version (int): The catalog version the change produced.
+        changed_ids (list, optional): IDs of the rows written, None if unknown.
+    """
+    match_catalog = _catalogs.get(catalog)
+    if match_catalog is None or version <= match_catalog.version:
+        return
+
+    if changed_ids is None or version != match_catalog.version + 1:
+        server_logger.info(
+            f"In-memory {catalog} is at version {match_catalog.version}, change to {version}; reloading"
+        )
+        load_match_catalogs((catalog,))
+        return
+
+    try:
+        entries, keys = _read_entries(catalog, changed_ids)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        return
+
+    _install_match_catalog(match_catalog.with_changes(set(changed_ids), entries, keys, version))
+    server_logger.info(
+        f"Applied {len(changed_ids)} changed {catalog} to the in-memory catalog (version {version})"
+    )
+
+
+def check_match_catalog_versions() -> None:
+    """
+    Reload every loaded catalog that is behind the database. Requires an app context.
+    """
+    for catalog in list(_catalogs):
+        ensure_fresh_match_catalog(catalog, wait=False)
@@ -0,0 +1,259 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import insert, delete
+from sqlalchemy.exc import SQLAlchemyError
+from ..db import db
+from ..models import Compositions, Implants, MatchRun, MatchRunRow
+from ..constants import (
+    STATUS_APPROVED,
+    CATALOG_COMPOSITIONS,
+    CATALOG_IMPLANTS,
+    BID_FILE_TYPE_COMPOSITIONS,
+    BID_FILE_TYPE_IMPLANTS,
+)
+from ..config import get_dosage_form_blocking
+from .catalog_service import get_catalog_version
+from .implant_service import normalize_implant_description
+
+server_logger = logging.getLogger(__name__)
+critical_logger = logging.getLogger("critical")
+
+# Per file type: catalog model and name, key of the matched catalog id and of an unmatched row's input
+RUN_ITEMS = {
+    BID_FILE_TYPE_COMPOSITIONS: (Compositions, CATALOG_COMPOSITIONS, "db_composition_id", "user_composition"),
+    BID_FILE_TYPE_IMPLANTS: (Implants, CATALOG_IMPLANTS, "db_implant_id", "user_implant"),
+}
+
+# Keys added to a row after matching (pricing, numbering), not stored with its result
+RUN_ROW_DERIVED_KEYS = ("index", "price_comparison")
+
+
+def get_match_settings(file_type: int, candidate_limit: int, match_threshold: int) -> dict:
+    """
+    The settings a match result depends on besides the row and the catalog. A stored row is
+    only reused by runs with the same settings.
+
+    Args:
+        file_type (int): BID_FILE_TYPE_COMPOSITIONS or BID_FILE_TYPE_IMPLANTS.
+        candidate_limit (int): Catalog candidates scored per row.
+        match_threshold (int): Similarity score a candidate needs to match.
+
+    Returns:
+        dict: The settings.
+    """
+    settings = {"candidate_limit": candidate_limit, "match_threshold": match_threshold}
+    if file_type == BID_FILE_TYPE_COMPOSITIONS:
+        settings["dosage_form_blocking"] = get_dosage_form_blocking()
+    return settings
+
+
+def get_match_key(file_type: int, unmatched: dict):
+    """
+    The string an unmatched row is searched with: the stripped composition or the normalized
+    implant description.
+
+    Args:
+        file_type (int): BID_FILE_TYPE_COMPOSITIONS or BID_FILE_TYPE_IMPLANTS.
+        unmatched (dict): An unmatched row.
+
+    Returns:
+        str: The match key, or None.
+    """
+    if file_type == BID_FILE_TYPE_COMPOSITIONS:
+        composition = (unmatched.get("user_composition") or {}).get("df_compositions")
+        return composition.replace(" ", "") if composition else None
+    return normalize_implant_description(
+        (unmatched.get("user_implant") or {}).get("df_product_description_with_specification")
+    )
+
+
+def _stored_result(row: dict) -> dict:
+    """Copy of a matched or unmatched row without the keys recomputed by every run."""
+    stored = {key: value for key, value in row.items() if key not in RUN_ROW_DERIVED_KEYS}
+    if "similar_items" in stored:
+        stored["similar_items"] = [
+            {key: value for key, value in item.items() if key != "price_comparison"}
+            for item in stored["similar_items"]
+        ]
+    return stored
+
+
+def get_run_catalog_version(file_type: int) -> int | None:
+    """
+    The current version of the catalog a file type is matched against. Read before matching,
+    so a run is stamped with (at most) the catalog it was matched against: a change committed
+    during the run makes the run look stale, never up to date.
+
+    Args:
+        file_type (int): BID_FILE_TYPE_COMPOSITIONS or BID_FILE_TYPE_IMPLANTS.
+
+    Returns:
+        int: The catalog version, or None on a database error.
+    """
+    _, catalog, _, _ = RUN_ITEMS[file_type]
+    try:
+        return get_catalog_version(catalog)
+    except SQLAlchemyError as e:
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        db.session.rollback()
+        return None
+
+
+def load_reusable_rows(tender_ref: str, file_type: int, settings: dict, catalog_version: int | None) -> dict:
+    """
+    Load the stored row results of the latest run of a tender, to be reused for the rows of a
+    new upload whose input did not change.
+
+    Matched rows are reused while their catalog item is still approved; the others are matched
+    again. Unmatched rows (and their similar items) are only reused when the catalog has not
+    changed since the run: any newer version may hold an entry they match, so they are matched
+    again. This check alone keeps reuse correct; the background rescoring (rescore_service) is
+    a best-effort refresh of the stored rows and is not relied upon.
+
+    Args:
+        tender_ref (str): The tender the upload belongs to.
+        file_type (int): BID_FILE_TYPE_COMPOSITIONS or BID_FILE_TYPE_IMPLANTS.
+        settings (dict): The current match settings (get_match_settings).
+        catalog_version (int): The catalog version the upload is matched at
+            (get_run_catalog_version), None if unknown.
+
+    Returns:
+        dict: (matched, unmatched) result pairs keyed by input hash; empty if there is no
+        reusable run.
+    """
+    if not tender_ref:
+        return {}
+
+    model, _, _, _ = RUN_ITEMS[file_type]
+    try:
+        run = (
+            db.session.query(MatchRun)
+            .filter(MatchRun.tender_ref == tender_ref, MatchRun.file_type == file_type)
+            .order_by(MatchRun.id.desc())
+            .first()
+        )
+        if run is None or run.settings != settings:
+            return {}
+
+        rows = (
+            db.session.query(MatchRunRow.input_hash, MatchRunRow.matched, MatchRunRow.item_id, MatchRunRow.result)
+            .filter(MatchRunRow.run_id == run.id)
+            .all()
+        )
+        item_ids = {row.item_id for row in rows if row.matched}
+        approved_ids = set()
+        if item_ids:
+            approved_ids = {
+                item_id
+                for (item_id,) in db.session.query(model.id).filter(
+                    model.id.in_(item_ids), model.status == STATUS_APPROVED
+                )
+            }
+    except SQLAlchemyError as e:
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        db.session.rollback()
+        return {}
+
+    reuse_unmatched = catalog_version is not None and run.catalog_version == catalog_version
+    return {
+        row.input_hash: (row.result, None) if row.matched else (None, row.result)
+        for row in rows
+        if (row.item_id in approved_ids if row.matched else reuse_unmatched)
+    }
+
+
+def save_match_run(
+    tender_ref: str,
+    file_type: int,
+    filename: str,
+    settings: dict,
+    matched: list,
+    unmatched: list,
+    matched_hashes: list,
+    unmatched_hashes: list,
+    reused_count: int = 0,
+    result_id: str = None,
+    catalog_version: int | None = None,
+):
+    """
+    Persist a match run and the result of each of its rows.
+
+    Args:
+        tender_ref (str): The tender the upload belongs to.
+        file_type (int): BID_FILE_TYPE_COMPOSITIONS or BID_FILE_TYPE_IMPLANTS.
+        filename (str): The uploaded file name.
+        settings (dict): The match settings of the run.
+        matched (list): The matched rows.
+        unmatched (list): The unmatched rows.
+        matched_hashes (list): The input hash of each matched row, in the same order.
+        unmatched_hashes (list): The input hash of each unmatched row, in the same order.
+        reused_count (int): Number of rows whose stored result was reused.
+        result_id (str, optional): The id of the stored result (result_store).
+        catalog_version (int, optional): The catalog version read before matching
+            (get_run_catalog_version). Unknown versions are stored as -1, so the run's unmatched
+            rows are never reused.
+
+    Returns:
+        int: The run id, or None on a database error.
+    """
+    _, _, id_key, _ = RUN_ITEMS[file_type]
+    try:
+        run = MatchRun(
+            tender_ref=tender_ref,
+            file_type=file_type,
+            filename=filename,
+            catalog_version=-1 if catalog_version is None else catalog_version,
+            settings=settings,
+            row_count=len(matched) + len(unmatched),
+            matched_count=len(matched),
+            reused_count=reused_count,
+            result_id=result_id,
+        )
+        db.session.add(run)
+        db.session.flush()
+
+        rows = [
+            {
+                "run_id": run.id,
+                "input_hash": input_hash,
+                "matched": True,
+                "item_id": row.get(id_key),
+                "match_key": None,
+                "result": _stored_result(row),
+            }
+            for row, input_hash in zip(matched, matched_hashes)
+        ] + [
+            {
+                "run_id": run.id,
+                "input_hash": input_hash,
+                "matched": False,
+                "item_id": None,
+                "match_key": get_match_key(file_type, row),
+                "result": _stored_result(row),
+            }
+            for row, input_hash in zip(unmatched, unmatched_hashes)
+        ]
+        if rows:
+            db.session.execute(insert(MatchRunRow), rows)
+        db.session.commit()
+        return run.id
+    except SQLAlchemyError as e:
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        db.session.rollback()
+        return None
+
+
+def prune_match_runs(days: int) -> int:
+    """
+    Delete the match runs older than a number of days; their rows go with them (ON DELETE CASCADE).
+
+    Args:
+        days (int): Age in days of the oldest run kept.
+
+    Returns:
+        int: Number of runs deleted.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = db.session.execute(delete(MatchRun).where(MatchRun.created_at < cutoff)).rowcount
+    db.session.commit()
+    return deleted
@@ -0,0 +1,597 @@
+import csv
+import io
+import logging
+import re
+import threading
+import time
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from ..db import db
+from ..constants import PRICE_CAP_TYPE_COMPOSITIONS, PRICE_CAP_TYPE_IMPLANTS, STATUS_APPROVED
+
+server_logger = logging.getLogger(__name__)
+critical_logger = logging.getLogger("critical")
+price_cap_logger = logging.getLogger("price_cap")
+
+# Columns expected in the price cap sheets (headers are matched case-insensitively,
+# spaces and dashes are read as underscores)
+PRICE_CAP_COLUMNS = {
+    PRICE_CAP_TYPE_COMPOSITIONS: ["compositions", "strength", "dosage_form", "packing_unit", "price_cap"],
+    PRICE_CAP_TYPE_IMPLANTS: ["product_description", "variant", "price_cap"],
+}
+
+# Column whose empty value makes a row useless, per price cap type
+PRICE_CAP_KEY_COLUMN = {
+    PRICE_CAP_TYPE_COMPOSITIONS: "compositions",
+    PRICE_CAP_TYPE_IMPLANTS: "product_description",
+}
+
+# Size of the chunks handed to COPY FROM STDIN
+COPY_CHUNK_SIZE = 64 * 1024
+
+# Unlinked price cap rows processed per transaction by the linking job
+LINK_BATCH_SIZE = 5000
+
+# Advisory lock key that keeps two processes from running the linking job at once
+LINK_ADVISORY_LOCK_KEY = 730031
+
+
+class PriceCapImportError(ValueError):
+    """Raised when a price cap sheet cannot be imported (unknown format, missing columns)."""
+
+
+def normalize_header(header) -> str:
+    """
+    Normalize a sheet header to the snake_case column names used in the database.
+
+    Args:
+        header: The header cell value.
+
+    Returns:
+        str: The normalized header, e.g. 'Packing Unit' -> 'packing_unit'.
+    """
+    return re.sub(r"[\s\-]+", "_", str(header or "").strip().lower())
+
+
+def iter_sheet_rows(file, filename: str):
+    """
+    Stream the rows of an uploaded Excel or CSV sheet without loading the whole sheet.
+
+    Args:
+        file: A binary file object.
+        filename (str): The original file name, used to pick the reader.
+
+    Yields:
+        tuple: The cell values of each row, the header row first.
+
+    Raises:
+        PriceCapImportError: If the file is neither .xlsx nor .csv.
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+
+    if extension == "xlsx":
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            yield from workbook.active.iter_rows(values_only=True)
+        finally:
+            workbook.close()
+    elif extension == "csv":
+        yield from csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    else:
+        raise PriceCapImportError("Only .xlsx and .csv price cap sheets are supported")
+
+
+class CopyStream:
+    """
+    Read-only file object that renders rows as CSV on demand, so COPY FROM STDIN can
+    consume a sheet while it is being read.
+    """
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+        self._pending = ""
+
+    def read(self, size=-1):
+        size = COPY_CHUNK_SIZE if size is None or size < 0 else size
+        while len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
+
+    readline = read
+
+
+def _staging_rows(rows, price_cap_type, stats):
+    """
+    Validate the header of a sheet and map its rows to the staging columns.
+
+    Blank rows are skipped and counted in stats while the returned generator is consumed.
+
+    Raises:
+        PriceCapImportError: If the sheet is empty or a required column is missing.
+    """
+    columns = PRICE_CAP_COLUMNS[price_cap_type]
+    key_index = columns.index(PRICE_CAP_KEY_COLUMN[price_cap_type])
+
+    header = next(rows, None)
+    if header is None:
+        raise PriceCapImportError("The price cap sheet is empty")
+
+    positions = {normalize_header(cell): index for index, cell in enumerate(header)}
+    missing = [column for column in columns if column not in positions]
+    if missing:
+        raise PriceCapImportError(f"Missing columns in the price cap sheet: {', '.join(missing)}")
+
+    indexes = [positions[column] for column in columns]
+
+    def generate():
+        for row in rows:
+            stats["rows_read"] += 1
+            values = [
+                "" if index >= len(row) or row[index] is None else str(row[index]).strip()
+                for index in indexes
+            ]
+            if not values[key_index]:
+                stats["rows_skipped"] += 1
+                continue
+            yield values
+
+    return generate()
+
+
+def _copy_into_staging(staging_table, columns, rows):
+    """COPY the rows into the staging table through the session's DBAPI connection."""
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {staging_table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+            CopyStream(rows),
+            size=COPY_CHUNK_SIZE,
+        )
+    finally:
+        cursor.close()
+
+
+# Price text without the currency symbols, thousands separators and whitespace it may carry
+PRICE_TEXT_SQL = "regexp_replace(price_cap, '(₹|rs\\.?|inr|\\$|,|\\s)', '', 'gi')"
+
+# Price text -> numeric; anything else left (signs, exponents, other text) makes the price NULL
+PRICE_CAST_SQL = f"""
+    CASE WHEN {PRICE_TEXT_SQL} ~ '^[0-9]+(\\.[0-9]+)?$'
+         THEN {PRICE_TEXT_SQL}::numeric
+    END
+"""
+
+# Catalog entry a price cap links to, per normalized key: approved entries first, then the lowest id.
+# {keys} is the subquery of the keys to link.
+LINK_CANDIDATES_SQL = {
+    PRICE_CAP_TYPE_COMPOSITIONS: """
+        SELECT DISTINCT ON (compositions_striped) id, compositions_striped
+        FROM compositions
+        WHERE compositions_striped IN ({keys})
+        ORDER BY compositions_striped, (status = :approved) DESC, id
+    """,
+    PRICE_CAP_TYPE_IMPLANTS: """
+        SELECT DISTINCT ON (lower(btrim(product_description)))
+            id, lower(btrim(product_description)) AS description
+        FROM implants
+        WHERE lower(btrim(product_description)) IN ({keys})
+        ORDER BY lower(btrim(product_description)), (status = :approved) DESC, id
+    """,
+}
+
+
+def _count_invalid_prices(staging_table, stats):
+    """Count the staged rows whose price could not be read; they are imported without a price."""
+    stats["invalid_prices"] = db.session.execute(
+        text(f"SELECT count(*) FROM {staging_table} WHERE price IS NULL AND price_cap <> ''")
+    ).scalar()
+
+
+def _import_composition_price_caps(rows, stats):
+    """Stage, normalize, upsert and link a composition price cap sheet."""
+    db.session.execute(
+        text(
+            """
+            CREATE TEMP TABLE price_cap_compositions_staging (
+                row_no bigserial,
+                compositions text,
+                strength text,
+                dosage_form text,
+                packing_unit text,
+                price_cap text,
+                price numeric,
+                compositions_striped text
+            ) ON COMMIT DROP
+            """
+        )
+    )
+    _copy_into_staging(
+        "price_cap_compositions_staging",
+        PRICE_CAP_COLUMNS[PRICE_CAP_TYPE_COMPOSITIONS],
+        rows,
+    )
+
+    # Normalize the whole sheet in one pass with the same function used for compositions_striped
+    db.session.execute(
+        text(
+            f"""
+            UPDATE price_cap_compositions_staging
+            SET strength = NULLIF(strength, ''),
+                dosage_form = NULLIF(dosage_form, ''),
+                packing_unit = NULLIF(packing_unit, ''),
+                price = {PRICE_CAST_SQL},
+                compositions_striped = preprocess_composition(compositions)
+            """
+        )
+    )
+    _count_invalid_prices("price_cap_compositions_staging", stats)
+
+    # Later rows of the sheet win over earlier duplicates
+    db.session.execute(
+        text(
+            """
+            CREATE TEMP TABLE price_cap_compositions_import ON COMMIT DROP AS
+            SELECT DISTINCT ON (
+                compositions_striped,
+                lower(coalesce(strength, '')),
+                lower(coalesce(dosage_form, '')),
+                lower(coalesce(packing_unit, ''))
+            ) *
+            FROM price_cap_compositions_staging
+            ORDER BY
+                compositions_striped,
+                lower(coalesce(strength, '')),
+                lower(coalesce(dosage_form, '')),
+                lower(coalesce(packing_unit, '')),
+                row_no DESC
+            """
+        )
+    )
+
+    match_condition = """
+        p.compositions_striped = s.compositions_striped
+        AND lower(coalesce(p.strength, '')) = lower(coalesce(s.strength, ''))
+        AND lower(coalesce(p.dosage_form, '')) = lower(coalesce(s.dosage_form, ''))
+        AND lower(coalesce(p.packing_unit, '')) = lower(coalesce(s.packing_unit, ''))
+    """
+
+    stats["updated"] = db.session.execute(
+        text(
+            f"""
+            UPDATE price_cap_compositions p
+            SET compositions = s.compositions, price_cap = s.price
+            FROM price_cap_compositions_import s
+            WHERE {match_condition}
+            """
+        )
+    ).rowcount
+
+    stats["inserted"] = db.session.execute(
+        text(
+            f"""
+            INSERT INTO price_cap_compositions
+                (compositions, strength, dosage_form, packing_unit, price_cap, compositions_striped)
+            SELECT s.compositions, s.strength, s.dosage_form, s.packing_unit, s.price, s.compositions_striped
+            FROM price_cap_compositions_import s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM price_cap_compositions p WHERE {match_condition}
+            )
+            ORDER BY s.row_no
+            """
+        )
+    ).rowcount
+
+    candidates = LINK_CANDIDATES_SQL[PRICE_CAP_TYPE_COMPOSITIONS].format(
+        keys="SELECT compositions_striped FROM price_cap_compositions_import"
+    )
+    stats["linked"] = db.session.execute(
+        text(
+            f"""
+            UPDATE price_cap_compositions p
+            SET composition_id = c.id
+            FROM ({candidates}) c
+            WHERE p.composition_id IS NULL
+              AND p.compositions_striped = c.compositions_striped
+            """
+        ),
+        {"approved": STATUS_APPROVED},
+    ).rowcount
+
+
+def _import_implant_price_caps(rows, stats):
+    """Stage, normalize, upsert and link an implant price cap sheet."""
+    db.session.execute(
+        text(
+            """
+            CREATE TEMP TABLE price_cap_implants_staging (
+                row_no bigserial,
+                product_description text,
+                variant text,
+                price_cap text,
+                price numeric
+            ) ON COMMIT DROP
+            """
+        )
+    )
+    _copy_into_staging(
+        "price_cap_implants_staging",
+        PRICE_CAP_COLUMNS[PRICE_CAP_TYPE_IMPLANTS],
+        rows,
+    )
+
+    db.session.execute(
+        text(
+            f"""
+            UPDATE price_cap_implants_staging
+            SET variant = NULLIF(variant, ''),
+                price = {PRICE_CAST_SQL}
+            """
+        )
+    )
+    _count_invalid_prices("price_cap_implants_staging", stats)
+
+    db.session.execute(
+        text(
+            """
+            CREATE TEMP TABLE price_cap_implants_import ON COMMIT DROP AS
+            SELECT DISTINCT ON (lower(product_description), lower(coalesce(variant, ''))) *
+            FROM price_cap_implants_staging
+            ORDER BY lower(product_description), lower(coalesce(variant, '')), row_no DESC
+            """
+        )
+    )
+
+    match_condition = """
+        lower(p.product_description) = lower(s.product_description)
+        AND lower(coalesce(p.variant, '')) = lower(coalesce(s.variant, ''))
+    """
+
+    stats["updated"] = db.session.execute(
+        text(
+            f"""
+            UPDATE price_cap_implants p
+            SET product_description = s.product_description, price_cap = s.price
+            FROM price_cap_implants_import s
+            WHERE {match_condition}
+            """
+        )
+    ).rowcount
+
+    stats["inserted"] = db.session.execute(
+        text(
+            f"""
+            INSERT INTO price_cap_implants (product_description, variant, price_cap)
+            SELECT s.product_description, s.variant, s.price
+            FROM price_cap_implants_import s
+            WHERE NOT EXISTS (
+                SELECT 1 FROM price_cap_implants p WHERE {match_condition}
+            )
+            ORDER BY s.row_no
+            """
+        )
+    ).rowcount
+
+    candidates = LINK_CANDIDATES_SQL[PRICE_CAP_TYPE_IMPLANTS].format(
+        keys="SELECT lower(btrim(product_description)) FROM price_cap_implants_import"
+    )
+    stats["linked"] = db.session.execute(
+        text(
+            f"""
+            UPDATE price_cap_implants p
+            SET implant_id = i.id
+            FROM ({candidates}) i
+            WHERE p.implant_id IS NULL
+              AND lower(btrim(p.product_description)) = i.description
+            """
+        ),
+        {"approved": STATUS_APPROVED},
+    ).rowcount
+
+
+def import_price_caps(file, filename: str, price_cap_type: int) -> dict:
+    """
+    Import a price cap sheet (Excel or CSV) in one transaction.
+
+    The sheet is streamed into a temporary staging table with COPY FROM STDIN, normalized
+    with set-based UPDATEs, upserted into the price cap table (rows with the same
+    composition / strength / dosage form / packing unit, or implant description / variant,
+    get the new price) and finally linked to the catalog with the rule of the linking job
+    (LINK_CANDIDATES_SQL). Prices that are not a plain positive number once currency symbols
+    and thousands separators are removed (negative values, exponents, other text) are not
+    guessed at: the row is imported without a price and counted in invalid_prices.
+
+    Args:
+        file: A binary file object of the sheet.
+        filename (str): The original file name, used to pick the reader.
+        price_cap_type (int): PRICE_CAP_TYPE_COMPOSITIONS or PRICE_CAP_TYPE_IMPLANTS.
+
+    Returns:
+        dict: Import summary with rows_read, rows_skipped, invalid_prices, inserted, updated and
+        linked counts.
+
+    Raises:
+        PriceCapImportError: If the sheet or the price cap type is invalid.
+        SQLAlchemyError: If the import failed; nothing is imported in that case.
+    """
+    importers = {
+        PRICE_CAP_TYPE_COMPOSITIONS: _import_composition_price_caps,
+        PRICE_CAP_TYPE_IMPLANTS: _import_implant_price_caps,
+    }
+    importer = importers.get(price_cap_type)
+    if importer is None:
+        raise PriceCapImportError("Invalid price cap type")
+
+    stats = {"rows_read": 0, "rows_skipped": 0, "invalid_prices": 0, "inserted": 0, "updated": 0, "linked": 0}
+    rows = _staging_rows(iter(iter_sheet_rows(file, filename)), price_cap_type, stats)
+
+    try:
+        importer(rows, stats)
+        db.session.commit()
+        price_cap_logger.info(f"Imported price cap sheet {filename}: {stats}")
+        return stats
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+        raise
+    except Exception:
+        db.session.rollback()
+        raise
+
+
+LINK_BATCH_SQL = {
+    PRICE_CAP_TYPE_COMPOSITIONS: f"""
+        WITH batch AS (
+            SELECT id, compositions_striped
+            FROM price_cap_compositions
+            WHERE composition_id IS NULL AND id > :after
+            ORDER BY id
+            LIMIT :batch_size
+        ),
+        candidates AS ({LINK_CANDIDATES_SQL[PRICE_CAP_TYPE_COMPOSITIONS].format(
+            keys="SELECT compositions_striped FROM batch"
+        )}),
+        linked AS (
+            UPDATE price_cap_compositions p
+            SET composition_id = c.id
+            FROM batch b
+            JOIN candidates c ON c.compositions_striped = b.compositions_striped
+            WHERE p.id = b.id
+            RETURNING p.id
+        )
+        SELECT (SELECT max(id) FROM batch), (SELECT count(*) FROM batch), (SELECT count(*) FROM linked)
+    """,
+    PRICE_CAP_TYPE_IMPLANTS: f"""
+        WITH batch AS (
+            SELECT id, lower(btrim(product_description)) AS description
+            FROM price_cap_implants
+            WHERE implant_id IS NULL AND product_description IS NOT NULL AND id > :after
+            ORDER BY id
+            LIMIT :batch_size
+        ),
+        candidates AS ({LINK_CANDIDATES_SQL[PRICE_CAP_TYPE_IMPLANTS].format(
+            keys="SELECT description FROM batch"
+        )}),
+        linked AS (
+            UPDATE price_cap_implants p
+            SET implant_id = i.id
+            FROM batch b
+            JOIN candidates i ON i.description = b.description
+            WHERE p.id = b.id
+            RETURNING p.id
+        )
+        SELECT (SELECT max(id) FROM batch), (SELECT count(*) FROM batch), (SELECT count(*) FROM linked)
+    """,
+}
+
+
+def link_price_cap_batches(price_cap_type: int, batch_size: int = LINK_BATCH_SIZE, start_after: int = 0) -> dict:
+    """
+    Link unlinked price cap rows to the catalog in id-ordered batches, committing each batch.
+
+    Each batch joins up to batch_size unlinked rows with the catalog on compositions_striped
+    (or the lowercased implant description), preferring approved entries. As every batch is
+    committed, an interrupted run can simply be started again (optionally from the last
+    logged id with start_after) and only the rows still unlinked are processed.
+
+    Args:
+        price_cap_type (int): PRICE_CAP_TYPE_COMPOSITIONS or PRICE_CAP_TYPE_IMPLANTS.
+        batch_size (int): Rows per batch. Defaults to LINK_BATCH_SIZE.
+        start_after (int): Only process price cap rows with a greater id. Defaults to 0.
+
+    Returns:
+        dict: Number of batches, rows scanned, rows linked and the last processed id.
+    """
+    stats = {"batches": 0, "scanned": 0, "linked": 0, "last_id": start_after}
+    after = start_after
+
+    while True:
+        try:
+            locked = db.session.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key, :price_cap_type)"),
+                {"key": LINK_ADVISORY_LOCK_KEY, "price_cap_type": price_cap_type},
+            ).scalar()
+            if not locked:
+                db.session.rollback()
+                price_cap_logger.info(
+                    f"Price cap linking (type {price_cap_type}) is running in another process, stopping"
+                )
+                break
+
+            last_id, scanned, linked = db.session.execute(
+                text(LINK_BATCH_SQL[price_cap_type]),
+                {"after": after, "batch_size": batch_size, "approved": STATUS_APPROVED},
+            ).one()
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+            break
+
+        if not scanned:
+            break
+
+        after = last_id
+        stats["batches"] += 1
+        stats["scanned"] += scanned
+        stats["linked"] += linked
+        stats["last_id"] = last_id
+        price_cap_logger.info(
+            f"Linked {linked} of {scanned} price caps (type {price_cap_type}) up to id {last_id}"
+        )
+
+    return stats
+
+
+def link_price_caps(batch_size: int = LINK_BATCH_SIZE) -> dict:
+    """
+    Link both composition and implant price caps to the catalog.
+
+    Args:
+        batch_size (int): Rows per batch. Defaults to LINK_BATCH_SIZE.
+
+    Returns:
+        dict: The linking stats keyed by "compositions" and "implants".
+    """
+    return {
+        "compositions": link_price_cap_batches(PRICE_CAP_TYPE_COMPOSITIONS, batch_size),
+        "implants": link_price_cap_batches(PRICE_CAP_TYPE_IMPLANTS, batch_size),
+    }
+
+
+def start_price_cap_link_scheduler(app, interval: int) -> threading.Thread:
+    """
+    Run link_price_caps every interval seconds in a daemon thread.
+
+    Args:
+        app (Flask): The application, used for the app context of the thread.
+        interval (int): Seconds between two runs.
+
+    Returns:
+        threading.Thread: The started thread.
+    """
+    def run():
+        while True:
+            time.sleep(interval)
+            with app.app_context():
+                try:
+                    link_price_caps()
+                except Exception as e:
+                    price_cap_logger.error(f"Scheduled price cap linking failed: {e}")
+                finally:
+                    db.session.remove()
+
+    thread = threading.Thread(target=run, name="price-cap-linker", daemon=True)
+    thread.start()
+    return thread
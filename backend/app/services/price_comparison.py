@@ -0,0 +1,90 @@
+import logging
+
+price_cap_logger = logging.getLogger("price_cap")
+
+PRICE_STATUS_BELOW = "Below"
+PRICE_STATUS_ABOVE = "Above"
+PRICE_STATUS_NO_VARIANT_MATCH = "No Match on Dosage or Packing Unit"
+PRICE_STATUS_NO_PRICE = "No Price Found"
+PRICE_STATUS_ERROR = "Error while fetching price"
+
+
+def normalize_price_keys(series):
+    """
+    Normalize a column of price cap keys (dosage form, packing unit, variant) for comparison:
+    lowercase with whitespace collapsed, NaN when empty or not a string.
+
+    Args:
+        series (pd.Series): The raw values.
+
+    Returns:
+        pd.Series: The normalized values.
+    """
+    normalized = series.astype(object).str.lower().str.split().str.join(" ")
+    return normalized.mask(normalized.eq("")).astype(object)
+
+
+def compare_prices(item_ids, rates, keys, price_caps):
+    """
+    Compare the unit rates of many rows with their price caps in one vectorized pass.
+
+    Each row takes the first price cap (in the order given) of its item whose keys all equal
+    the row's keys. Its price is the cap, its price difference the cap minus the row's unit
+    rate, and its status "Below" when the difference is positive, "Above" otherwise.
+
+    Args:
+        item_ids (List): The matched composition / implant ID of each row.
+        rates (List): The unit rate (excl. of tax) of each row.
+        keys (dict): Key name to the row values it is matched on, e.g.
+            {"dosage_form": [...], "packing_unit": [...]}.
+        price_caps (List): (item ID, price cap, *key values) tuples in priority order.
+
+    Returns:
+        List: One {'price', 'price_diff', 'status'} dict per row, in row order.
+    """
+    import numpy as np
+    import pandas as pd
+
+    key_names = list(keys)
+    if not len(item_ids):
+        return []
+
+    rows = pd.DataFrame({"item_id": pd.Series(item_ids, dtype="int64")})
+    for name in key_names:
+        rows[name] = normalize_price_keys(pd.Series(keys[name], dtype=object))
+
+    caps = pd.DataFrame.from_records(list(price_caps), columns=["item_id", "price_cap", *key_names])
+    caps["item_id"] = caps["item_id"].astype("int64")
+    caps["price_cap"] = pd.to_numeric(caps["price_cap"], errors="coerce").astype("float64")
+    for name in key_names:
+        caps[name] = normalize_price_keys(caps[name])
+    has_caps = rows["item_id"].isin(caps["item_id"]).to_numpy()
+
+    # Rows never match on a missing key; the first cap per (item, keys) wins
+    caps = caps.dropna(subset=key_names).drop_duplicates(subset=["item_id", *key_names])
+    merged = rows.merge(caps, on=["item_id", *key_names], how="left", indicator=True)
+
+    found = (merged["_merge"] == "both").to_numpy()
+    price = merged["price_cap"].to_numpy(dtype="float64")
+    price_diff = price - pd.to_numeric(
+        pd.Series(rates, dtype=object), errors="coerce"
+    ).to_numpy(dtype="float64")
+    valid = found & ~np.isnan(price_diff)
+
+    status = np.select(
+        [valid & (price_diff > 0), valid, found, has_caps],
+        [PRICE_STATUS_BELOW, PRICE_STATUS_ABOVE, PRICE_STATUS_ERROR, PRICE_STATUS_NO_VARIANT_MATCH],
+        default=PRICE_STATUS_NO_PRICE,
+    )
+    errors = int((found & ~valid).sum())
+    if errors:
+        price_cap_logger.error(f"Error while matching the price: {errors} row(s) without a price cap or unit rate")
+
+    return [
+        {"price": row_price, "price_diff": row_price_diff, "status": row_status}
+        for row_price, row_price_diff, row_status in zip(
+            np.where(valid, price, None).tolist(),
+            np.where(valid, price_diff, None).tolist(),
+            status.tolist(),
+        )
+    ]
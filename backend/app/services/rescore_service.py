@@ -0,0 +1,287 @@
+import logging
+import queue
+import re
+import threading
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import text, update
+from sqlalchemy.exc import SQLAlchemyError
+from ..db import db
+from ..models import Compositions, Implants, MatchRunRow
+from ..constants import (
+    STATUS_APPROVED,
+    CATALOG_COMPOSITIONS,
+    CATALOG_IMPLANTS,
+    BID_FILE_TYPE_COMPOSITIONS,
+    BID_FILE_TYPE_IMPLANTS,
+)
+from ..config import get_match_rescore_days, get_match_candidate_limit, get_match_threshold
+
+server_logger = logging.getLogger(__name__)
+critical_logger = logging.getLogger("critical")
+
+# Re-scoring is a best-effort refresh of stored runs. The queue lives in the memory of the
+# process, so work queued before a restart is lost; only the latest run of each tender within
+# MATCH_RESCORE_DAYS is looked at; and rows are only found through a shared whole word of at
+# least MATCH_TOKEN_MIN_LENGTH letters, so a change of short words or digits triggers nothing.
+# Reuse does not depend on it: load_reusable_rows only reuses unmatched rows of a run matched
+# at the current catalog version, and it leaves the runs' catalog_version untouched.
+
+CATALOG_FILE_TYPES = {
+    CATALOG_COMPOSITIONS: BID_FILE_TYPE_COMPOSITIONS,
+    CATALOG_IMPLANTS: BID_FILE_TYPE_IMPLANTS,
+}
+
+# Bid file column of each key of a stored row's input, to match the row again
+USER_ROW_COLUMNS = {
+    BID_FILE_TYPE_COMPOSITIONS: {
+        "df_sl_no": "sl_no",
+        "df_brand_name": "brand_name",
+        "df_compositions": "composition",
+        "df_name_of_manufacturer": "name_of_manufacturer",
+        "df_UoM": "u_o_m",
+        "df_dosage_form": "dosage_form",
+        "df_packing_unit": "packing_unit",
+        "df_GST": "gst",
+        "df_MRP_incl_tax": "mrp_incl_of_tax",
+        "df_unit_rate_to_hll_excl_of_tax": "unit_rate_to_hll_excl_of_tax",
+        "df_unit_rate_to_hll_incl_of_tax": "unit_rate_to_hll_incl_of_tax",
+        "df_hsn_code": "hsn_code",
+        "df_margin_percent_incl_of_tax": "margin",
+    },
+    BID_FILE_TYPE_IMPLANTS: {
+        "df_sl_no": "sl_no",
+        "df_item_code": "item_code",
+        "df_product_description_with_specification": "product_description_with_specification",
+        "df_name_of_manufacturer": "name_of_manufacturer",
+        "df_GST": "gst",
+        "df_variant": "variants",
+        "df_MRP_incl_tax": "mrp_incl_of_tax",
+        "df_unit_rate_to_hll_excl_of_tax": "unit_rate_to_hll_excl_of_tax",
+        "df_unit_rate_to_hll_incl_of_tax": "unit_rate_to_hll_incl_of_tax",
+        "df_hsn_code": "hsn_code",
+        "df_margin_percent_incl_of_tax": "margin",
+    },
+}
+
+# Words shorter than this (units such as "mg", "ml", sizes) do not make two entries related
+MATCH_TOKEN_MIN_LENGTH = 4
+
+_rescore_queue = queue.Queue()
+_rescore_thread = None
+_rescore_thread_lock = threading.Lock()
+
+
+def match_tokens(value) -> set:
+    """
+    The words of a composition (its molecule names) or of an implant description, used to
+    find the stored unmatched rows a new catalog entry could match.
+
+    Args:
+        value (str): The stripped composition, normalized description or match key.
+
+    Returns:
+        set: The lowercase alphabetic words of at least MATCH_TOKEN_MIN_LENGTH letters.
+    """
+    if not value:
+        return set()
+    return set(re.findall(rf"[a-z]{{{MATCH_TOKEN_MIN_LENGTH},}}", value.lower()))
+
+
+def _approved_entry_tokens(catalog: str, item_ids) -> set:
+    """The match tokens of the approved entries among item_ids."""
+    if catalog == CATALOG_COMPOSITIONS:
+        columns = (Compositions.compositions_striped, Compositions.compositions)
+        model = Compositions
+    else:
+        columns = (Implants.product_description_normalized, Implants.product_description)
+        model = Implants
+
+    tokens = set()
+    for striped, raw in db.session.query(*columns).filter(
+        model.id.in_(list(item_ids)), model.status == STATUS_APPROVED
+    ):
+        tokens |= match_tokens(striped or raw)
+    return tokens
+
+
+def find_affected_rows(file_type: int, tokens: set, days: int) -> list:
+    """
+    Find the unmatched rows of the latest run of every tender of the last days whose match key
+    shares a token with the given ones.
+
+    Args:
+        file_type (int): BID_FILE_TYPE_COMPOSITIONS or BID_FILE_TYPE_IMPLANTS.
+        tokens (set): Match tokens of the new or approved catalog entries.
+        days (int): Only runs created in the last days are considered.
+
+    Returns:
+        list: Rows with 'id', 'run_id', 'match_key', 'result' and the run's 'settings'.
+    """
+    if not tokens:
+        return []
+
+    rows = db.session.execute(
+        text(
+            """
+            SELECT r.id, r.run_id, r.match_key, r.result, runs.settings
+            FROM match_run_rows r
+            JOIN match_runs runs ON runs.id = r.run_id
+            WHERE NOT r.matched
+              AND runs.id IN (
+                  SELECT max(id) FROM match_runs
+                  WHERE file_type = :file_type AND created_at >= :since
+                  GROUP BY tender_ref
+              )
+              AND lower(r.match_key) LIKE ANY(:patterns)
+            """
+        ),
+        {
+            "file_type": file_type,
+            "since": datetime.utcnow() - timedelta(days=days),
+            "patterns": [f"%{token}%" for token in sorted(tokens)],
+        },
+    ).mappings().all()
+    # LIKE also matches inside longer words; keep the rows that share a whole token
+    return [row for row in rows if match_tokens(row["match_key"]) & tokens]
+
+
+def rescore_unmatched_rows(catalog: str, item_ids, days: int = None) -> dict:
+    """
+    Match again the stored unmatched rows that the given (newly approved) catalog entries
+    could match, and update their stored result. Rows that now match are reused by the next
+    upload of their tender (as long as their entry stays approved); rows still unmatched are
+    not, as the run's catalog_version is left as it is.
+
+    Args:
+        catalog (str): CATALOG_COMPOSITIONS or CATALOG_IMPLANTS.
+        item_ids (iterable): IDs of the catalog entries that were added, approved or edited.
+        days (int, optional): Only rows of runs of the last days. Defaults to MATCH_RESCORE_DAYS.
+
+    Returns:
+        dict: Number of rows 'rescored' and of rows 'matched' by the new entries.
+    """
+    from .composition_service import match_single_composition, preprocess_compositions_in_db
+    from .implant_service import match_single_implant
+    from .match_catalog import ensure_fresh_match_catalog
+    from .match_run_service import get_match_key, _stored_result, RUN_ITEMS
+
+    days = get_match_rescore_days() if days is None else days
+    file_type = CATALOG_FILE_TYPES[catalog]
+    rows = find_affected_rows(file_type, _approved_entry_tokens(catalog, item_ids), days)
+    if not rows:
+        return {"rescored": 0, "matched": 0}
+
+    if catalog == CATALOG_COMPOSITIONS:
+        # New compositions only get their compositions_striped here, as in match_compositions
+        preprocess_compositions_in_db("Compositions")
+    ensure_fresh_match_catalog(catalog)
+    _, _, id_key, user_key = RUN_ITEMS[file_type]
+    columns = USER_ROW_COLUMNS[file_type]
+
+    updates = []
+    newly_matched = {}
+    for row in rows:
+        user_row = row["result"].get(user_key) or {}
+        bid_row = {column: user_row.get(key) for key, column in columns.items()}
+        # Rows are matched again with the settings of their run
+        settings = row["settings"] or {}
+        candidate_limit = settings.get("candidate_limit") or get_match_candidate_limit()
+        match_threshold = settings.get("match_threshold") or get_match_threshold()
+        if file_type == BID_FILE_TYPE_COMPOSITIONS:
+            matched, unmatched = match_single_composition(
+                bid_row,
+                settings.get("dosage_form_blocking", False),
+                candidate_limit,
+                match_threshold,
+            )
+        else:
+            matched, unmatched = match_single_implant(bid_row, candidate_limit, match_threshold)
+
+        if matched:
+            newly_matched[row["run_id"]] = newly_matched.get(row["run_id"], 0) + 1
+            updates.append(
+                {
+                    "id": row["id"],
+                    "matched": True,
+                    "item_id": matched.get(id_key),
+                    "match_key": None,
+                    "result": _stored_result(matched),
+                }
+            )
+        else:
+            updates.append(
+                {
+                    "id": row["id"],
+                    "matched": False,
+                    "item_id": None,
+                    "match_key": get_match_key(file_type, unmatched),
+                    "result": _stored_result(unmatched),
+                }
+            )
+
+    db.session.execute(update(MatchRunRow), updates)
+    for run_id, count in newly_matched.items():
+        db.session.execute(
+            text("UPDATE match_runs SET matched_count = matched_count + :count WHERE id = :run_id"),
+            {"count": count, "run_id": run_id},
+        )
+    db.session.commit()
+
+    stats = {"rescored": len(updates), "matched": sum(newly_matched.values())}
+    server_logger.info(f"Rescored {catalog} rows after catalog change: {stats}")
+    return stats
+
+
+def _run_rescore_worker(app):
+    """Process the queued catalog changes, merging the ones queued in the meantime."""
+    while True:
+        pending = {}
+        catalog, item_ids = _rescore_queue.get()
+        pending.setdefault(catalog, set()).update(item_ids)
+        while True:
+            try:
+                catalog, item_ids = _rescore_queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.setdefault(catalog, set()).update(item_ids)
+
+        with app.app_context():
+            for catalog, item_ids in pending.items():
+                try:
+                    rescore_unmatched_rows(catalog, item_ids)
+                except SQLAlchemyError as e:
+                    db.session.rollback()
+                    critical_logger.critical(f"Critical database error: {e}", exc_info=True)
+                except Exception as e:
+                    db.session.rollback()
+                    server_logger.error(f"Rescoring unmatched {catalog} rows failed: {e}")
+            db.session.remove()
+
+
+def schedule_rescore(catalog: str, item_ids) -> None:
+    """
+    Queue the re-scoring of the stored unmatched rows that approved catalog entries could
+    match. Runs in a background thread of the process, started on first use; disabled when
+    MATCH_RESCORE_DAYS is 0. Best effort: queued work is lost when the process exits.
+
+    Args:
+        catalog (str): CATALOG_COMPOSITIONS or CATALOG_IMPLANTS.
+        item_ids (iterable): IDs of the approved catalog entries.
+    """
+    global _rescore_thread
+
+    item_ids = set(item_ids)
+    if not item_ids or not get_match_rescore_days():
+        return
+
+    with _rescore_thread_lock:
+        if _rescore_thread is None or not _rescore_thread.is_alive():
+            _rescore_thread = threading.Thread(
+                target=_run_rescore_worker,
+                args=(current_app._get_current_object(),),
+                name="match-rescorer",
+                daemon=True,
+            )
+            _rescore_thread.start()
+    _rescore_queue.put((catalog, item_ids))
@@ -0,0 +1,234 @@
+import csv
+import io
+import logging
+import tempfile
+from ..constants import BID_FILE_TYPE_COMPOSITIONS, BID_FILE_TYPE_IMPLANTS
+from .result_store import filter_rows
+
+server_logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("xlsx", "csv")
+
+# Similar items exported per unmatched row unless the request asks for another number
+EXPORT_SIMILAR_ITEMS = 3
+
+# CSV rows buffered before a chunk is sent, and size of the chunks an XLSX file is sent in
+CSV_FLUSH_ROWS = 500
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# (header, key) of the bid file columns of each file type, as returned by /match-file
+USER_COLUMNS = {
+    BID_FILE_TYPE_COMPOSITIONS: [
+        ("SL No", "df_sl_no"),
+        ("Brand Name", "df_brand_name"),
+        ("Compositions", "df_compositions"),
+        ("Name of Manufacturer", "df_name_of_manufacturer"),
+        ("UoM", "df_UoM"),
+        ("Dosage Form", "df_dosage_form"),
+        ("Packing Unit", "df_packing_unit"),
+        ("GST", "df_GST"),
+        ("MRP incl tax", "df_MRP_incl_tax"),
+        ("Unit Rate to HLL excl of tax", "df_unit_rate_to_hll_excl_of_tax"),
+        ("Unit Rate to HLL incl of tax", "df_unit_rate_to_hll_incl_of_tax"),
+        ("HSN Code", "df_hsn_code"),
+        ("Margin Percent incl of tax", "df_margin_percent_incl_of_tax"),
+    ],
+    BID_FILE_TYPE_IMPLANTS: [
+        ("SL No", "df_sl_no"),
+        ("Item Code", "df_item_code"),
+        ("Product Description", "df_product_description_with_specification"),
+        ("Name of Manufacturer", "df_name_of_manufacturer"),
+        ("GST", "df_GST"),
+        ("Variant", "df_variant"),
+        ("MRP incl tax", "df_MRP_incl_tax"),
+        ("Unit Rate to HLL excl of tax", "df_unit_rate_to_hll_excl_of_tax"),
+        ("Unit Rate to HLL incl of tax", "df_unit_rate_to_hll_incl_of_tax"),
+        ("HSN Code", "df_hsn_code"),
+        ("Margin Percent incl of tax", "df_margin_percent_incl_of_tax"),
+    ],
+}
+
+# Keys of the matched catalog item, of an unmatched row's input and of its similar items
+ITEM_KEYS = {
+    BID_FILE_TYPE_COMPOSITIONS: ("db_composition_id", "user_composition", "db_composition"),
+    BID_FILE_TYPE_IMPLANTS: ("db_implant_id", "user_implant", "db_implant"),
+}
+
+# Leading characters that make a spreadsheet application read a CSV value as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+PRICE_COLUMNS = [
+    ("Price Cap", "price"),
+    ("Price Difference", "price_diff"),
+    ("Price Status", "status"),
+]
+
+
+def get_export_table(result: dict, section: str, similar_items: int = EXPORT_SIMILAR_ITEMS, price_status: str = None):
+    """
+    Flatten a section of a stored match result into a header and an iterator of rows.
+
+    Matched rows get the matched catalog id and their price comparison, unmatched rows their
+    top similar items with the similarity score and, when it was prefetched, the price status.
+
+    Args:
+        result (dict): A result returned by load_match_result.
+        section (str): "matched" or "unmatched".
+        similar_items (int): Number of similar items exported per unmatched row.
+        price_status (str, optional): Only export matched rows with this price comparison status.
+
+    Returns:
+        Tuple: The header list and an iterator of row lists.
+    """
+    file_type = result.get("file_type", BID_FILE_TYPE_COMPOSITIONS)
+    user_columns = USER_COLUMNS[file_type]
+    id_key, user_key, similar_key = ITEM_KEYS[file_type]
+    rows = filter_rows(result[section], section, price_status)
+
+    if section == "matched":
+        header = [title for title, _ in user_columns] + ["Matched ID"] + [title for title, _ in PRICE_COLUMNS]
+
+        def generate():
+            for row in rows:
+                price_comparison = row.get("price_comparison") or {}
+                yield (
+                    [row.get(key) for _, key in user_columns]
+                    + [row.get(id_key)]
+                    + [price_comparison.get(key) for _, key in PRICE_COLUMNS]
+                )
+
+        return header, generate()
+
+    header = [title for title, _ in user_columns]
+    for rank in range(1, similar_items + 1):
+        header += [f"Similar {rank}", f"Similarity Score {rank}", f"Similar {rank} Price Status"]
+
+    def generate():
+        for row in rows:
+            user_row = row.get(user_key) or {}
+            values = [user_row.get(key) for _, key in user_columns]
+            items = (row.get("similar_items") or [])[:similar_items]
+            for item in items:
+                values += [
+                    item.get(similar_key),
+                    item.get("similarity_score"),
+                    (item.get("price_comparison") or {}).get("status"),
+                ]
+            values += [None] * 3 * (similar_items - len(items))
+            yield values
+
+    return header, generate()
+
+
+def escape_csv_value(value):
+    """
+    Quote a text value that a spreadsheet application would evaluate as a formula, by
+    prefixing it with an apostrophe. Bid file text is vendor supplied and must stay text.
+
+    Args:
+        value: The cell value.
+
+    Returns:
+        The value, prefixed with "'" if it is a string starting with CSV_FORMULA_PREFIXES.
+    """
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def stream_csv(header: list, rows):
+    """
+    Write a table as CSV, yielding it in chunks of CSV_FLUSH_ROWS rows. Text that would be
+    read as a formula is escaped (escape_csv_value).
+
+    Args:
+        header (list): The column titles.
+        rows (iterable): The row lists.
+
+    Yields:
+        str: The next chunk of the CSV file.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([escape_csv_value(value) for value in row])
+        if count % CSV_FLUSH_ROWS == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_xlsx(sheets: list):
+    """
+    Write tables as the sheets of an XLSX workbook and yield the file in chunks.
+
+    The workbook is written in openpyxl's write-only mode to a temporary file, so rows are
+    never held in memory as cells; the file is then sent in EXPORT_CHUNK_SIZE chunks.
+    Text is always written as text, so vendor supplied values starting with "=" are not
+    turned into formulas.
+
+    Args:
+        sheets (list): (title, header, rows) tuples, one per sheet.
+
+    Yields:
+        bytes: The next chunk of the XLSX file.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+    def clean(worksheet, value):
+        if not isinstance(value, str):
+            return value
+        value = ILLEGAL_CHARACTERS_RE.sub("", value)
+        if value.startswith("="):
+            # openpyxl writes strings starting with "=" as formulas; keep them as text
+            cell = WriteOnlyCell(worksheet, value=value)
+            cell.data_type = "s"
+            return cell
+        return value
+
+    with tempfile.TemporaryFile() as file:
+        workbook = Workbook(write_only=True)
+        for title, header, rows in sheets:
+            worksheet = workbook.create_sheet(title)
+            worksheet.append(header)
+            for row in rows:
+                worksheet.append([clean(worksheet, value) for value in row])
+        workbook.save(file)
+
+        file.seek(0)
+        while chunk := file.read(EXPORT_CHUNK_SIZE):
+            yield chunk
+
+
+def stream_match_result_export(result: dict, export_format: str, sections: list, similar_items: int = EXPORT_SIMILAR_ITEMS, price_status: str = None):
+    """
+    Export sections of a stored match result as XLSX (one sheet per section) or CSV (a single
+    section), as a generator of chunks to stream to the client.
+
+    Args:
+        result (dict): A result returned by load_match_result.
+        export_format (str): "xlsx" or "csv".
+        sections (list): The sections to export; CSV exports the first one only.
+        similar_items (int): Number of similar items exported per unmatched row.
+        price_status (str, optional): Only export matched rows with this price comparison status.
+
+    Yields:
+        The chunks of the exported file (str for CSV, bytes for XLSX).
+    """
+    try:
+        if export_format == "csv":
+            yield from stream_csv(*get_export_table(result, sections[0], similar_items, price_status))
+        else:
+            yield from stream_xlsx(
+                [
+                    (section.capitalize(), *get_export_table(result, section, similar_items, price_status))
+                    for section in sections
+                ]
+            )
+    except Exception as e:
+        server_logger.error(f"Error exporting match result {result.get('result_id')}: {e}")
+        raise
@@ -0,0 +1,166 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from ..utils import dumps_json
+from ..config import get_match_results_dir, get_match_result_ttl
+
+server_logger = logging.getLogger(__name__)
+
+# Parsed results kept in memory, so paging through a result does not re-read its file
+RESULT_CACHE_SIZE = 4
+
+RESULT_SECTIONS = ("matched", "unmatched")
+
+_result_id_pattern = re.compile(r"^[0-9a-f]{32}$")
+_result_cache = OrderedDict()
+_result_cache_lock = threading.Lock()
+
+
+def _result_path(result_id: str) -> str:
+    return os.path.join(get_match_results_dir(), f"{result_id}.json")
+
+
+def remove_expired_results() -> None:
+    """
+    Delete the stored match results older than MATCH_RESULT_TTL.
+    """
+    cutoff = time.time() - get_match_result_ttl()
+    try:
+        for entry in os.scandir(get_match_results_dir()):
+            if entry.name.endswith(".json") and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        server_logger.error(f"Error removing expired match results: {e}")
+
+
+def save_match_result(file_type: int, matched: list, unmatched: list) -> str:
+    """
+    Store a match result so that it can be paged through and exported by id.
+
+    Args:
+        file_type (int): The file type the result was matched as.
+        matched (list): The matched rows.
+        unmatched (list): The unmatched rows.
+
+    Returns:
+        str: The result id.
+    """
+    os.makedirs(get_match_results_dir(), exist_ok=True)
+    remove_expired_results()
+
+    result_id = uuid.uuid4().hex
+    path = _result_path(result_id)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write(
+            dumps_json(
+                {
+                    "result_id": result_id,
+                    "file_type": file_type,
+                    "created_at": time.time(),
+                    "matched": matched,
+                    "unmatched": unmatched,
+                }
+            )
+        )
+    os.replace(temp_path, path)
+    return result_id
+
+
+def load_match_result(result_id: str) -> dict | None:
+    """
+    Load a stored match result.
+
+    Args:
+        result_id (str): The id returned by save_match_result.
+
+    Returns:
+        dict: The result with 'file_type', 'matched' and 'unmatched', or None if it does not exist or expired.
+    """
+    if not result_id or not _result_id_pattern.match(result_id):
+        return None
+
+    cutoff = time.time() - get_match_result_ttl()
+    with _result_cache_lock:
+        result = _result_cache.get(result_id)
+        if result is not None:
+            if result.get("created_at", 0) < cutoff:
+                del _result_cache[result_id]
+                return None
+            _result_cache.move_to_end(result_id)
+            return result
+
+    try:
+        with open(_result_path(result_id), encoding="utf-8") as file:
+            result = json.load(file)
+    except FileNotFoundError:
+        return None
+
+    if result.get("created_at", 0) < cutoff:
+        return None
+
+    with _result_cache_lock:
+        _result_cache[result_id] = result
+        while len(_result_cache) > RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    return result
+
+
+def filter_rows(rows: list, section: str, price_status: str = None) -> list:
+    """
+    Filter the rows of a result section by the status of their price comparison.
+
+    Only matched rows carry a price comparison, so the filter leaves unmatched rows as they are.
+
+    Args:
+        rows (list): The rows of the section.
+        section (str): "matched" or "unmatched".
+        price_status (str, optional): Price comparison status to keep, e.g. "Above" or "Below".
+
+    Returns:
+        list: The rows to show.
+    """
+    if not price_status or section != "matched":
+        return rows
+    return [
+        row for row in rows if (row.get("price_comparison") or {}).get("status") == price_status
+    ]
+
+
+def get_match_result_page(
+    result_id: str, section: str, page: int = 1, page_size: int = 50, price_status: str = None
+) -> dict | None:
+    """
+    Return one page of a section of a stored match result.
+
+    Args:
+        result_id (str): The id returned by save_match_result.
+        section (str): "matched" or "unmatched".
+        page (int): The page number, starting at 1.
+        page_size (int): Rows per page.
+        price_status (str, optional): Only keep matched rows with this price comparison status.
+
+    Returns:
+        dict: The page rows with the total number of rows after filtering, or None if the result does not exist.
+    """
+    result = load_match_result(result_id)
+    if result is None:
+        return None
+
+    rows = filter_rows(result[section], section, price_status)
+    start = (page - 1) * page_size
+    return {
+        "result_id": result_id,
+        "section": section,
+        "page": page,
+        "page_size": page_size,
+        "total": len(rows),
+        "items": rows[start : start + page_size],
+    }
@@ -1,6 +1,10 @@
 import os
+import sys
+import json
 import logging
-import numpy as np
+from decimal import Decimal
+import math
+from flask import Response
 from logging.handlers import TimedRotatingFileHandler
 
 
@@ -8,6 +12,7 @@ def setup_logging(log_file_name, logger_name, rotate_logs=True):
     """
     Setup Logging for different modules of the application. Each Log file serving its own purpose.
     Rotates logs weekly unless disabled (e.g., for critical logs).
+    Log files are only opened on the first record, so booting a worker opens none of them.
     
     Args:
         log_file_name (str): The log file name.
@@ -28,24 +33,123 @@ def setup_logging(log_file_name, logger_name, rotate_logs=True):
         os.makedirs(archive_dir, exist_ok=True)
         
         # Log rotation setup: Rotate weekly (on Monday), keeping up to 3 backups
-        handler = TimedRotatingFileHandler(log_file_path, when="W0", interval=1, backupCount=3)
+        handler = TimedRotatingFileHandler(
+            log_file_path, when="W0", interval=1, backupCount=3, delay=True
+        )
         handler.suffix = "%Y-%m-%d"  # Logs will be named with the year and week number
     else:
-        handler = logging.FileHandler(log_file_path)
+        handler = logging.FileHandler(log_file_path, delay=True)
     
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
 
-def replace_nan_with_none(data):
+def parse_id_list(values, max_items):
     """
-    Replace 'nan' to just ''. Done to reduce the errors while decoding the json.
+    Validate a list of ids sent to a bulk endpoint.
+
+    Args:
+        values: The ids from the request payload.
+        max_items (int): Maximum number of ids accepted.
+
+    Returns:
+        Tuple: The de-duplicated ids in request order and an error message (None if valid).
+    """
+    if not isinstance(values, list) or not values:
+        return None, "A non-empty list of ids is required"
+    if len(values) > max_items:
+        return None, f"At most {max_items} ids can be sent in one request"
+
+    ids = []
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            return None, f"Invalid id: {value!r}"
+        ids.append(value)
+    return list(dict.fromkeys(ids)), None
+
+
+def sanitize_dataframe(df):
+    """
+    Replace every NaN / NaT in the DataFrame with None, column by column.
+
+    Done once right after the file is read so that the rows built from it never carry NaN,
+    instead of walking the nested response afterwards.
+
+    Args:
+        df (pd.DataFrame): Data read from the uploaded file.
+
+    Returns:
+        pd.DataFrame: DataFrame with object columns where missing values are None.
     """
+    return df.astype(object).where(df.notna(), None)
+
+
+def _json_default(o):
+    """
+    Convert the non-standard values that can reach the encoder (NumPy scalars, Decimals from
+    Numeric columns, Excel dates) into plain JSON values.
+
+    NumPy is looked up rather than imported: if no module loaded it, no NumPy value can exist.
+    """
+    np = sys.modules.get("numpy")
+    if np is not None:
+        if isinstance(o, np.integer):
+            return int(o)
+        if isinstance(o, np.floating):
+            return None if np.isnan(o) else float(o)
+        if isinstance(o, np.bool_):
+            return bool(o)
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+    if isinstance(o, Decimal):
+        return None if o.is_nan() else float(o)
+    if hasattr(o, "isoformat"):
+        return o.isoformat()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _replace_non_finite(data):
+    """Copy of data where NaN and Infinity floats nested in dicts, lists and tuples are None."""
+    if isinstance(data, float):
+        return data if math.isfinite(data) else None
     if isinstance(data, dict):
-        return {k: replace_nan_with_none(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [replace_nan_with_none(v) for v in data]
-    elif isinstance(data, float) and np.isnan(data):
-        return ""
-    else:
-        return data
+        return {key: _replace_non_finite(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_replace_non_finite(value) for value in data]
+    return data
+
+
+def dumps_json(data):
+    """
+    Encode data as compact JSON, writing NumPy scalars and NaN as null.
+
+    Rows are built from sanitized DataFrames, so NaN floats are not expected here. The payload
+    is encoded with allow_nan=False; if a non-finite float is left anyway, it is replaced with
+    None and the payload encoded again.
+
+    Args:
+        data: The response payload.
+
+    Returns:
+        str: The JSON string.
+    """
+    try:
+        return json.dumps(data, default=_json_default, separators=(",", ":"), allow_nan=False)
+    except ValueError:
+        return json.dumps(
+            _replace_non_finite(data), default=_json_default, separators=(",", ":"), allow_nan=False
+        )
+
+
+def json_response(data, status=200):
+    """
+    Build a compact, NaN-safe JSON Flask response.
+
+    Args:
+        data: The response payload.
+        status (int): HTTP status code. Defaults to 200.
+
+    Returns:
+        Response: The Flask response.
+    """
+    return Response(dumps_json(data), status=status, mimetype="application/json")
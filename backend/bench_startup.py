@@ -0,0 +1,102 @@
+"""
+Measure how long a fresh worker takes to import and build the Flask app.
+
+Every run starts a new interpreter (as gunicorn does on a worker restart) and reports the
+time spent importing the app package and in create_app(), plus the heavy libraries that
+were loaded on the way. Run from backend/:
+
+    python bench_startup.py --runs 10
+    python bench_startup.py --importtime 15   # also list the slowest imports
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+HEAVY_MODULES = ("pandas", "numpy", "fuzzywuzzy", "openpyxl", "rapidfuzz")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+created = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "create_app": created - imported,
+    "heavy_modules": [m for m in %r if m in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def run_probe(env, workdir):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=workdir,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(env, workdir, count):
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from app import create_app; create_app()"],
+        cwd=workdir,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to time.")
+    parser.add_argument(
+        "--importtime", type=int, default=0, metavar="N", help="List the N slowest imports."
+    )
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")]))
+    env["PRICE_CAP_LINK_INTERVAL"] = "0"  # Do not start background jobs while measuring
+
+    # Run in a scratch directory so the log directories are not created in the checkout
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [run_probe(env, workdir) for _ in range(args.runs)]
+        imports = slowest_imports(env, workdir, args.importtime) if args.importtime else []
+
+    for phase in ("import", "create_app"):
+        timings = [result[phase] * 1000 for result in results]
+        print(
+            f"{phase:>10}: median {statistics.median(timings):8.1f} ms, "
+            f"min {min(timings):8.1f} ms, max {max(timings):8.1f} ms"
+        )
+    totals = [(result["import"] + result["create_app"]) * 1000 for result in results]
+    print(f"{'total':>10}: median {statistics.median(totals):8.1f} ms over {args.runs} runs")
+    print(f"heavy modules loaded at startup: {', '.join(results[0]['heavy_modules']) or 'none'}")
+
+    if imports:
+        print("\nslowest imports (cumulative):")
+        for cumulative, name in imports:
+            print(f"{cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
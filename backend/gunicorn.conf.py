@@ -0,0 +1,42 @@
+"""
+Production server configuration. Run from backend/:
+
+    gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) and the in-memory matching catalogs
+are built there before the workers are forked, so every worker shares them copy-on-write
+instead of reading the catalog tables itself.
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.config import get_server_settings  # noqa: E402
+
+_settings = get_server_settings()
+
+wsgi_app = "wsgi:app"
+preload_app = True
+bind = _settings["bind"]
+workers = _settings["workers"]
+threads = _settings["threads"]
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = _settings["timeout"]
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    from app import start_background_jobs
+    from app.config import get_catalog_check_interval
+    from app.db import db
+    from app.services.catalog_listener import start_catalog_listener
+
+    # Connections the master opened while preloading belong to the master: drop them from the
+    # worker's pool without closing them, so the worker opens its own
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+    # Threads do not survive the fork, so every worker starts its own background jobs and
+    # listens for catalog changes itself
+    start_background_jobs(app)
+    start_catalog_listener(app, get_catalog_check_interval())
@@ -0,0 +1,64 @@
+"""Add match_runs and match_run_rows
+
+Revision ID: a8d41c6e3f92
+Revises: f5c2d8e91a47
+Create Date: 2026-10-19 18:21:07.514362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8d41c6e3f92'
+down_revision = 'f5c2d8e91a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'match_runs',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('tender_ref', sa.String(length=255), nullable=True),
+        sa.Column('file_type', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(length=255), nullable=True),
+        sa.Column('catalog_version', sa.Integer(), nullable=False),
+        sa.Column('settings', sa.JSON(), nullable=False),
+        sa.Column('row_count', sa.Integer(), nullable=False),
+        sa.Column('matched_count', sa.Integer(), nullable=False),
+        sa.Column('reused_count', sa.Integer(), nullable=False),
+        sa.Column('result_id', sa.String(length=32), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    # The latest run of a tender is looked up to reuse its rows
+    with op.batch_alter_table('match_runs', schema=None) as batch_op:
+        batch_op.create_index('ix_match_runs_tender_ref_file_type_id', ['tender_ref', 'file_type', 'id'], unique=False)
+
+    op.create_table(
+        'match_run_rows',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('run_id', sa.Integer(), nullable=False),
+        sa.Column('input_hash', sa.String(length=64), nullable=False),
+        sa.Column('matched', sa.Boolean(), nullable=False),
+        sa.Column('item_id', sa.Integer(), nullable=True),
+        sa.Column('match_key', sa.Text(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['run_id'], ['match_runs.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('match_run_rows', schema=None) as batch_op:
+        batch_op.create_index('ix_match_run_rows_run_id', ['run_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('match_run_rows', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_run_rows_run_id')
+
+    op.drop_table('match_run_rows')
+
+    with op.batch_alter_table('match_runs', schema=None) as batch_op:
+        batch_op.drop_index('ix_match_runs_tender_ref_file_type_id')
+
+    op.drop_table('match_runs')
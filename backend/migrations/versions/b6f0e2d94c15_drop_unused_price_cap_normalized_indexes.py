@@ -0,0 +1,39 @@
+"""Drop unused price cap normalized indexes
+
+Revision ID: b6f0e2d94c15
+Revises: a8d41c6e3f92
+Create Date: 2026-10-19 21:04:52.318806
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6f0e2d94c15'
+down_revision = 'a8d41c6e3f92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The dosage form, packing unit and variant of the price caps are compared in pandas
+    # (price_comparison.compare_prices); no query filters on these expressions
+    op.drop_index('ix_price_cap_implants_variant_norm', table_name='price_cap_implants')
+    op.drop_index('ix_price_cap_compositions_packing_unit_norm', table_name='price_cap_compositions')
+    op.drop_index('ix_price_cap_compositions_dosage_form_norm', table_name='price_cap_compositions')
+
+
+def downgrade():
+    op.create_index(
+        'ix_price_cap_compositions_dosage_form_norm', 'price_cap_compositions',
+        [sa.text('lower(trim(dosage_form))')],
+    )
+    op.create_index(
+        'ix_price_cap_compositions_packing_unit_norm', 'price_cap_compositions',
+        [sa.text('lower(trim(packing_unit))')],
+    )
+    op.create_index(
+        'ix_price_cap_implants_variant_norm', 'price_cap_implants',
+        [sa.text('lower(trim(variant))')],
+    )
@@ -0,0 +1,42 @@
+"""Add (status, id) indexes and catalog_versions table
+
+Revision ID: c4e1a9d27f3b
+Revises: 9ba3db91419e
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e1a9d27f3b'
+down_revision = '9ba3db91419e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Backs the per-status keyset pagination of get_all_compositions / get_all_implants
+    with op.batch_alter_table('compositions', schema=None) as batch_op:
+        batch_op.create_index('ix_compositions_status_id', ['status', 'id'], unique=False)
+
+    with op.batch_alter_table('implants', schema=None) as batch_op:
+        batch_op.create_index('ix_implants_status_id', ['status', 'id'], unique=False)
+
+    op.create_table(
+        'catalog_versions',
+        sa.Column('catalog', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('catalog')
+    )
+
+
+def downgrade():
+    op.drop_table('catalog_versions')
+
+    with op.batch_alter_table('implants', schema=None) as batch_op:
+        batch_op.drop_index('ix_implants_status_id')
+
+    with op.batch_alter_table('compositions', schema=None) as batch_op:
+        batch_op.drop_index('ix_compositions_status_id')
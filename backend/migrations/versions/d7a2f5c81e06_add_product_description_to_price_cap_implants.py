@@ -0,0 +1,28 @@
+"""Add product_description to price_cap_implants
+
+Revision ID: d7a2f5c81e06
+Revises: c4e1a9d27f3b
+Create Date: 2026-10-19 11:02:17.544931
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a2f5c81e06'
+down_revision = 'c4e1a9d27f3b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Imported implant price caps keep the sheet's description so they can be linked
+    # to an implant after it is added to the catalog
+    with op.batch_alter_table('price_cap_implants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('product_description', sa.String(length=255), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('price_cap_implants', schema=None) as batch_op:
+        batch_op.drop_column('product_description')
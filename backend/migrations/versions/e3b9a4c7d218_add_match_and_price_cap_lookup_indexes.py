@@ -0,0 +1,63 @@
+"""Add match and price cap lookup indexes
+
+Revision ID: e3b9a4c7d218
+Revises: d7a2f5c81e06
+Create Date: 2026-10-19 14:26:03.871245
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b9a4c7d218'
+down_revision = 'd7a2f5c81e06'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Approved rows only: the catalog load and candidate retrieval never read the others
+    op.create_index(
+        'ix_compositions_approved', 'compositions', ['id'],
+        postgresql_where=sa.text('status = 1'),
+    )
+    op.create_index(
+        'ix_implants_approved', 'implants', ['id'],
+        postgresql_where=sa.text('status = 1'),
+    )
+    # Same expression as the dosage form blocking filter of fetch_similar_compositions
+    op.create_index(
+        'ix_compositions_approved_dosage_form', 'compositions',
+        [sa.text("regexp_replace(lower(trim(dosage_form)), '\\s+', ' ', 'g')")],
+        postgresql_where=sa.text('status = 1'),
+    )
+
+    # Price cap lookups by composition / implant in the match loops
+    op.create_index('ix_price_cap_compositions_composition_id', 'price_cap_compositions', ['composition_id'])
+    op.create_index('ix_price_cap_implants_implant_id', 'price_cap_implants', ['implant_id'])
+
+    # Exact matching on the normalized dosage form, packing unit and variant
+    op.create_index(
+        'ix_price_cap_compositions_dosage_form_norm', 'price_cap_compositions',
+        [sa.text('lower(trim(dosage_form))')],
+    )
+    op.create_index(
+        'ix_price_cap_compositions_packing_unit_norm', 'price_cap_compositions',
+        [sa.text('lower(trim(packing_unit))')],
+    )
+    op.create_index(
+        'ix_price_cap_implants_variant_norm', 'price_cap_implants',
+        [sa.text('lower(trim(variant))')],
+    )
+
+
+def downgrade():
+    op.drop_index('ix_price_cap_implants_variant_norm', table_name='price_cap_implants')
+    op.drop_index('ix_price_cap_compositions_packing_unit_norm', table_name='price_cap_compositions')
+    op.drop_index('ix_price_cap_compositions_dosage_form_norm', table_name='price_cap_compositions')
+    op.drop_index('ix_price_cap_implants_implant_id', table_name='price_cap_implants')
+    op.drop_index('ix_price_cap_compositions_composition_id', table_name='price_cap_compositions')
+    op.drop_index('ix_compositions_approved_dosage_form', table_name='compositions')
+    op.drop_index('ix_implants_approved', table_name='implants')
+    op.drop_index('ix_compositions_approved', table_name='compositions')
@@ -0,0 +1,63 @@
+"""Add product_description_normalized to implants
+
+Revision ID: f5c2d8e91a47
+Revises: e3b9a4c7d218
+Create Date: 2026-10-19 15:48:36.205917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5c2d8e91a47'
+down_revision = 'e3b9a4c7d218'
+branch_labels = None
+depends_on = None
+
+# Rows updated per transaction while backfilling
+BACKFILL_BATCH_SIZE = 5000
+
+# SQL equivalent of implant_service.normalize_implant_description
+NORMALIZE_SQL = (
+    "NULLIF(btrim(regexp_replace(regexp_replace(lower(product_description), "
+    "'[^\\w\\s]', '', 'g'), '\\s+', ' ', 'g')), '')"
+)
+
+
+def upgrade():
+    # A nullable column without default only changes the catalog; IF NOT EXISTS lets an
+    # upgrade interrupted during the backfill below be run again
+    op.execute(
+        "ALTER TABLE implants ADD COLUMN IF NOT EXISTS product_description_normalized VARCHAR(255)"
+    )
+
+    # env.py runs the migrations in one transaction: commit the new column (releasing the
+    # ACCESS EXCLUSIVE lock ADD COLUMN takes) and backfill in autocommit mode, so every batch
+    # is its own short transaction and only locks its own rows
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        last_id = 0
+        while True:
+            last_id = connection.execute(
+                sa.text(
+                    f"""
+                    WITH batch AS (
+                        SELECT id FROM implants WHERE id > :after ORDER BY id LIMIT :batch_size
+                    ), updated AS (
+                        UPDATE implants
+                        SET product_description_normalized = {NORMALIZE_SQL}
+                        WHERE id IN (SELECT id FROM batch)
+                    )
+                    SELECT max(id) FROM batch
+                    """
+                ),
+                {"after": last_id, "batch_size": BACKFILL_BATCH_SIZE},
+            ).scalar()
+            if last_id is None:
+                break
+
+
+def downgrade():
+    with op.batch_alter_table('implants', schema=None) as batch_op:
+        batch_op.drop_column('product_description_normalized')
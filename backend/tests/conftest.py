@@ -0,0 +1,23 @@
+import os
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Postgres database the database tests migrate and run against; they are skipped without it
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture(scope="session")
+def migrated_app():
+    """The app bound to TEST_DATABASE_URL, with every migration applied."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    os.environ["SQLALCHEMY_DATABASE_URI"] = TEST_DATABASE_URL
+    from flask_migrate import upgrade
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=os.path.join(BACKEND_DIR, "migrations"))
+        yield app
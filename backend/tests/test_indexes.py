@@ -0,0 +1,13 @@
+import pytest
+from app.services.index_check import INDEX_CHECKS, check_index_usage
+
+
+@pytest.fixture(scope="module")
+def index_usage(migrated_app):
+    return {result["index"]: result for result in check_index_usage()}
+
+
+@pytest.mark.parametrize("index", [index for index, _, _ in INDEX_CHECKS])
+def test_lookup_uses_its_index(index_usage, index):
+    result = index_usage[index]
+    assert result["used"], f"{index} is not used, the plan scans {result['indexes'] or 'no index'}"
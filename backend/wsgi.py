@@ -0,0 +1,22 @@
+"""
+WSGI entry point for the production server (see gunicorn.conf.py); run.py starts the
+development server.
+"""
+import gc
+from app import create_app
+from app.config import get_server_settings
+from app.db import db
+from app.services.match_catalog import load_match_catalogs
+
+app = create_app()
+
+if get_server_settings()["preload_catalog"]:
+    with app.app_context():
+        load_match_catalogs()
+        # The master does not serve requests: close its connections before forking (the
+        # workers also drop the inherited pool in post_fork)
+        db.engine.dispose()
+
+    # Move the catalogs out of the collector's reach, so garbage collections in the
+    # workers do not write to (and thereby copy) the shared pages
+    gc.freeze()
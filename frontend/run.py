@@ -1,5 +1,7 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context
+import json
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 import os
 
@@ -7,8 +9,84 @@ load_dotenv()
 
 app = Flask(__name__)
 
-backend_url = os.getenv("API_URL")  # Backend server URL
-backend_url = "http://127.0.0.1:5000"  # overwrote because of env error :: CHECK LATER
+backend_url = os.getenv("API_URL", "http://127.0.0.1:5000").strip().rstrip("/")  # Backend server URL
+
+# Keep-alive connections to the backend, shared by all requests of this process.
+# Size the pool to the number of threads serving the frontend.
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", 10))
+BACKEND_TIMEOUT = (
+    float(os.getenv("BACKEND_CONNECT_TIMEOUT", 5)),
+    float(os.getenv("BACKEND_READ_TIMEOUT", 300)),
+)
+PROXY_CHUNK_SIZE = 64 * 1024
+
+# Rows rendered with the results page, the rest is loaded on demand
+RESULTS_PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", 50))
+
+backend = requests.Session()
+_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=BACKEND_POOL_SIZE, pool_block=True)
+backend.mount("http://", _adapter)
+backend.mount("https://", _adapter)
+
+
+def proxy_response(response):
+    """
+    Pass a streamed backend response through to the client chunk by chunk, without buffering it.
+    """
+
+    def generate():
+        try:
+            yield from response.iter_content(PROXY_CHUNK_SIZE)
+        finally:
+            response.close()
+
+    headers = {}
+    if "Content-Disposition" in response.headers:
+        headers["Content-Disposition"] = response.headers["Content-Disposition"]
+    return Response(
+        stream_with_context(generate()),
+        status=response.status_code,
+        content_type=response.headers.get("Content-Type", "application/json"),
+        headers=headers,
+    )
+
+
+class SizedStream:
+    """
+    File-like wrapper that gives the incoming request stream a length, so requests sends it
+    with a Content-Length header (the backend does not accept chunked uploads) while still
+    reading it block by block.
+    """
+
+    def __init__(self, stream, length):
+        self._stream = stream
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        return self._stream.read(size)
+
+    def __iter__(self):
+        return iter(lambda: self._stream.read(PROXY_CHUNK_SIZE), b"")
+
+
+def forward_upload(path, params=None):
+    """
+    Forward the incoming multipart upload to the backend as a streamed body.
+
+    The request body is handed to the backend as it is read instead of being parsed into
+    request.files and re-encoded, so the uploaded file is never held in memory here.
+    """
+    return backend.post(
+        f"{backend_url}{path}",
+        params=params,
+        data=SizedStream(request.stream, request.content_length),
+        headers={"Content-Type": request.content_type},
+        stream=True,
+        timeout=BACKEND_TIMEOUT,
+    )
 
 
 @app.route("/")
@@ -23,36 +101,83 @@ def add_composition():
 
 @app.route("/match-compositions", methods=["POST"])
 def match_compositions():
-    file = request.files.get("file")
-    if not file:
+    if not request.content_length or not (request.content_type or "").startswith("multipart/form-data"):
         return jsonify({"error": "No file uploaded"})
 
-    files = {"file": (file.filename, file.stream, file.mimetype)}
     try:
-        response = requests.post(f"{backend_url}/match-compositions", files=files)
-        response = response.json()
-        matched_compositions = response["matched_compositions"]
-        unmatched_compositions = response["unmatched_compositions"]
+        response = forward_upload(
+            "/match-file", params={"file_type": 1, "page_size": RESULTS_PAGE_SIZE}
+        )
+        if response.status_code != 200:
+            return proxy_response(response)
+
+        # Decode straight from the socket instead of keeping the raw body and the parsed copy
+        response.raw.decode_content = True
+        try:
+            result = json.load(response.raw)
+        finally:
+            response.close()
+
+        matched_compositions = result["matched"]
+        unmatched_compositions = result["unmatched"]
         try:
             return render_template(
                 "results.html",
                 unmatched_compositions=unmatched_compositions,
                 matched_compositions=matched_compositions,
+                result_id=result.get("result_id"),
+                counts=result.get(
+                    "counts",
+                    {"matched": len(matched_compositions), "unmatched": len(unmatched_compositions)},
+                ),
+                page_size=result.get("page_size", RESULTS_PAGE_SIZE),
             )
         except Exception as e:
             return jsonify({"error": "Some issues with the template rendering"})
     except Exception as e:
-        return jsonify({"error": e})
+        return jsonify({"error": str(e)})
+
+
+@app.route("/match-results/<result_id>")
+def match_results(result_id):
+    try:
+        response = backend.get(
+            f"{backend_url}/match-results/{result_id}",
+            params=request.args,
+            stream=True,
+            timeout=BACKEND_TIMEOUT,
+        )
+        return proxy_response(response)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 502
+
+
+@app.route("/match-results/<result_id>/export")
+def export_match_results(result_id):
+    try:
+        response = backend.get(
+            f"{backend_url}/match-results/{result_id}/export",
+            params=request.args,
+            stream=True,
+            timeout=BACKEND_TIMEOUT,
+        )
+        return proxy_response(response)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 502
 
 
 @app.route("/get-all-compositions")
 def get_all_compositions():
     try:
-        response = requests.get(f"{backend_url}/get-all-compositions")
-        return response.json()
+        response = backend.get(
+            f"{backend_url}/get-all-compositions/",
+            params=request.args,
+            stream=True,
+            timeout=BACKEND_TIMEOUT,
+        )
+        return proxy_response(response)
     except Exception as e:
-        print(f"{backend_url}/get-all-compositions")
-        return jsonify({"error": ""})
+        return jsonify({"error": str(e)}), 502
 
 
 @app.route("/add-new-composition", methods=["POST"])
@@ -62,9 +187,11 @@ def add_new_composition():
         "composition_name": request.form.get("composition_name"),
         "dosage_form": request.form.get("dosage_form"),
     }
-    response = requests.post(f"{backend_url}/add-new-composition", data=data)
-    return response.json()
+    response = backend.post(
+        f"{backend_url}/add-new-composition", data=data, stream=True, timeout=BACKEND_TIMEOUT
+    )
+    return proxy_response(response)
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5001)
+    app.run(debug=True, port=5001, threaded=True)